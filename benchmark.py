@@ -0,0 +1,162 @@
+"""
+Banc d'essai reproductible : fait tourner les moteurs sur tous les MOTIFS et sur
+des soupes aléatoires à graine fixe, puis écrit les mesures en JSON pour comparer
+les commits et les moteurs entre eux.
+
+    python benchmark.py --moteurs creux tuiles --sortie bench.json
+    python benchmark.py --soupes 1e3 1e4 --generations 200
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from moteurs import MOTEURS, creer_grille
+from motifs import MOTIFS
+from simuler import simuler
+
+try:
+    import resource
+except ImportError: # Windows : pas de mesure de RSS
+    resource = None
+
+TAILLES_SOUPES = [10**3, 10**4, 10**5, 10**6, 10**7]
+DENSITE_SOUPE = 0.5
+
+
+def soupe(nb_cellules, graine, densite=DENSITE_SOUPE):
+    """
+    Génère une soupe aléatoire carrée contenant environ nb_cellules cellules vivantes.
+    Argument : nb_cellules (int), graine (int), densite (float entre 0 et 1)
+    Return : list de tuples (x, y)
+    """
+    rng = random.Random(graine)
+    cote = max(1, round((nb_cellules / densite) ** 0.5))
+    cellules = []
+    for y in range(cote):
+        for x in range(cote):
+            if rng.random() < densite:
+                cellules.append((x, y))
+    return cellules
+
+
+def rss_max():
+    """
+    Pic de mémoire résidente du processus courant.
+    Argument : Aucun
+    Return : int (octets) ou None si indisponible
+    """
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux compte en kilo-octets, macOS en octets
+    return pic if sys.platform == "darwin" else pic * 1024
+
+
+def mesurer(cas, moteur, nb_generations, duree_max, graine):
+    """
+    Exécute un cas de test ; appelée dans un processus neuf pour isoler le pic de mémoire.
+    Argument : cas (str, nom de motif ou "soupe:N"), moteur (str), nb_generations (int),
+               duree_max (float, secondes), graine (int)
+    Return : dict des mesures
+    """
+    if cas.startswith("soupe:"):
+        cellules = soupe(int(cas.split(":")[1]), graine)
+    else:
+        cellules = list(MOTIFS[cas])
+
+    # Taille de l'état mesurée par tracemalloc (hors chrono) après une première
+    # génération, quand le moteur a converti les cellules dans sa forme native
+    grille = creer_grille(moteur) # Import du moteur (et de NumPy) hors mesure
+    tracemalloc.start()
+    grille.cellules = set(cellules)
+    del cellules
+    grille.evoluer()
+    octets_etat = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    population_initiale = grille.population()
+    resultat = simuler(grille, nb_generations, seuil_stagnation=0, duree_max=duree_max)
+    if hasattr(grille, "fermer"):
+        grille.fermer()
+    duree = resultat["duree"]
+    return {
+        "cas": cas,
+        "moteur": moteur,
+        "generations": resultat["generations"],
+        "duree": duree,
+        "generations_par_s": resultat["generations"] / duree if duree else None,
+        # None pour HashLife, qui avance par sauts sans calculer chaque génération
+        "cellules_par_s": resultat["mises_a_jour"] / duree if duree and resultat["mises_a_jour"] is not None else None,
+        "population_initiale": population_initiale,
+        "population_finale": resultat["population"],
+        "rss_max_octets": rss_max(),
+        "octets_par_cellule": octets_etat / max(population_initiale, 1),
+    }
+
+
+def commit_courant():
+    """
+    Identifiant du commit git courant, pour rattacher les mesures au code mesuré.
+    Argument : Aucun
+    Return : str ou None
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des moteurs du Jeu de la Vie.")
+    parser.add_argument("--moteurs", nargs="+", choices=sorted(MOTEURS), default=["creux"])
+    parser.add_argument("--motifs", nargs="*", choices=list(MOTIFS), default=list(MOTIFS))
+    parser.add_argument("--soupes", nargs="*", type=float, default=TAILLES_SOUPES,
+                        help="tailles des soupes en nombre de cellules vivantes (ex : 1e3 1e5)")
+    parser.add_argument("-n", "--generations", type=int, default=100, help="générations par cas")
+    parser.add_argument("--duree-max", type=float, default=60.0, help="temps maximal par cas (secondes)")
+    parser.add_argument("--graine", type=int, default=0, help="graine des soupes aléatoires")
+    parser.add_argument("--sortie", default="benchmark.json", help="fichier JSON de résultats ('-' = sortie standard)")
+    args = parser.parse_args(argv)
+
+    cas = list(args.motifs) + [f"soupe:{int(n)}" for n in args.soupes]
+    resultats = []
+    # Un processus neuf par cas : le pic de RSS ne mélange pas les mesures
+    contexte = multiprocessing.get_context("spawn")
+    with contexte.Pool(processes=1, maxtasksperchild=1) as pool:
+        for moteur in args.moteurs:
+            for c in cas:
+                mesure = pool.apply(mesurer, (c, moteur, args.generations, args.duree_max, args.graine))
+                resultats.append(mesure)
+                gps = mesure["generations_par_s"] or 0
+                cps = mesure["cellules_par_s"]
+                cps = f"{cps:16,.0f}" if cps is not None else f"{'-':>16}"
+                print(f"{moteur:10} {c:20} {gps:12,.1f} gen/s {cps} cell/s"
+                      f" {mesure['octets_par_cellule']:10,.1f} o/cell", file=sys.stderr)
+
+    rapport = {
+        "commit": commit_courant(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "generations": args.generations,
+        "duree_max": args.duree_max,
+        "graine": args.graine,
+        "resultats": resultats,
+    }
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.sortie == "-":
+        print(texte)
+    else:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            f.write(texte + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import functools
+
+import numpy as np
+
+from grille import GrilleSansSuivi, VueCellules
+
+MARGE_LIGNES = 16 # Lignes vides gardées au-dessus et au-dessous du motif
+UN = np.uint64(1)
+SOIXANTE_TROIS = np.uint64(63)
+
+
+@functools.lru_cache(maxsize=None)
+def _termes(regle):
+    """
+    Compile une règle en termes (total, etat) : une cellule dont le total voisins + soi
+    vaut total est vivante à la génération suivante si son état courant est etat
+    ("morte", "vivante" ou "toutes").
+    Argument : regle (Regle)
+    Return : tuple de tuples (int, str)
+    """
+    termes = []
+    for total in range(10):
+        morte = total <= 8 and regle.naissance[total]
+        vivante = total >= 1 and regle.survie[total - 1]
+        if morte and vivante:
+            termes.append((total, "toutes"))
+        elif morte or vivante:
+            termes.append((total, "morte" if morte else "vivante"))
+    return tuple(termes)
+
+
+class GrilleBits(GrilleSansSuivi):
+    """
+    Moteur compacté en bits : chaque ligne d'une région rectangulaire est
+    rangée dans des mots de 64 bits (1 bit par cellule), et la génération
+    suivante est calculée par additionneurs binaires sur des mots entiers,
+    soit 64 cellules par opération. La région suit le motif automatiquement.
+    """
+
+    def __init__(self):
+        """
+        Initialise un univers vide.
+        Argument : Aucun
+        Return : None (Constructeur)
+        """
+        # Le bit i du mot w de la ligne r représente la cellule (x0 + 64*w + i, y0 + r)
+        self._mots = np.zeros((1, 1), dtype=np.uint64)
+        self._x0 = 0
+        self._y0 = 0
+        self._vue = None
+        self._perimees = False
+        super().__init__()
+
+    # --- Vue ensembliste ---
+    @property
+    def cellules(self):
+        if self._vue is None:
+            self._vue = VueCellules(self._lister(), self._vue_modifiee)
+        return self._vue
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._charger(valeur)
+        self._vue = None
+        self._perimees = False
+
+    def _vue_modifiee(self, cellule=None):
+        self._perimees = True
+
+    def _synchroniser(self):
+        """
+        Recompacte les bits depuis la vue si celle-ci a été modifiée directement.
+        Argument : Aucun
+        Return : None
+        """
+        if self._perimees:
+            self._charger(self._vue)
+            self._perimees = False
+
+    def _charger(self, cellules):
+        """
+        Remplace la région par le plus petit cadre (avec marges) contenant les cellules.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : None
+        """
+        coords = np.array(list(cellules), dtype=np.int64).reshape(-1, 2)
+        if not len(coords):
+            self._mots = np.zeros((1, 1), dtype=np.uint64)
+            self._x0 = self._y0 = 0
+            return
+        xmin, ymin = coords.min(axis=0)
+        xmax, ymax = coords.max(axis=0)
+        nb_mots = int((xmax - xmin) // 64) + 3 # Un mot vide de chaque côté
+        hauteur = int(ymax - ymin) + 1 + 2 * MARGE_LIGNES
+        self._x0 = int(xmin) - 64
+        self._y0 = int(ymin) - MARGE_LIGNES
+        plan = np.zeros((hauteur, nb_mots * 64), dtype=np.uint8)
+        plan[coords[:, 1] - self._y0, coords[:, 0] - self._x0] = 1
+        self._mots = self._compacter(plan)
+
+    @staticmethod
+    def _compacter(plan):
+        """Convertit un tableau de 0/1 (largeur multiple de 64) en mots de 64 bits."""
+        octets = np.packbits(plan, axis=1, bitorder="little")
+        return octets.view("<u8").astype(np.uint64)
+
+    @staticmethod
+    def _decompacter(mots):
+        """Convertit des mots de 64 bits en tableau de 0/1."""
+        return np.unpackbits(mots.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+
+    def _lister(self):
+        """
+        Liste les coordonnées absolues de toutes les cellules vivantes.
+        Argument : Aucun
+        Return : list de tuples (x, y)
+        """
+        ly, lx = np.nonzero(self._decompacter(self._mots))
+        return list(zip((lx + self._x0).tolist(), (ly + self._y0).tolist()))
+
+    def _recadrer(self):
+        """
+        Garantit une bordure vide autour du motif (pour que les naissances restent dans la région)
+        et rogne la région quand le motif s'est éloigné ou a rétréci.
+        Argument : Aucun
+        Return : None
+        """
+        mots = self._mots
+        lignes = np.flatnonzero(mots.any(axis=1))
+        if not len(lignes):
+            return
+        colonnes = np.flatnonzero(mots.any(axis=0))
+        r0, r1, w0, w1 = lignes[0], lignes[-1], colonnes[0], colonnes[-1]
+        hauteur, nb_mots = mots.shape
+        if (1 <= r0 <= 2 * MARGE_LIGNES and 1 <= hauteur - 1 - r1 <= 2 * MARGE_LIGNES
+                and 1 <= w0 <= 2 and 1 <= nb_mots - 1 - w1 <= 2):
+            return
+        nouveau = np.zeros((r1 - r0 + 1 + 2 * MARGE_LIGNES, w1 - w0 + 3), dtype=np.uint64)
+        nouveau[MARGE_LIGNES:-MARGE_LIGNES, 1:-1] = mots[r0:r1 + 1, w0:w1 + 1]
+        self._mots = nouveau
+        self._y0 += int(r0) - MARGE_LIGNES
+        self._x0 += (int(w0) - 1) * 64
+
+    # --- Évolution ---
+    def ajouter_ou_supprimer(self, x, y):
+        self._synchroniser()
+        r, c = y - self._y0, x - self._x0
+        if not (0 <= r < self._mots.shape[0] and 0 <= c < self._mots.shape[1] * 64):
+            # Hors de la région : on repasse par un rechargement complet
+            cellules = set(self._lister())
+            cellules.symmetric_difference_update({(x, y)})
+            self._charger(cellules)
+        else:
+            self._mots[r, c // 64] ^= UN << np.uint64(c % 64)
+        self._vue = None
+
+    def evoluer(self):
+        """
+        Calcule la génération suivante par logique d'additionneurs sur des mots de 64 bits.
+        Argument : Aucun
+        Return : bool (True si l'état a changé)
+        """
+        self._synchroniser()
+        self._recadrer()
+        self.generation += 1
+        m = self._mots
+
+        # Voisins ouest/est : décalage d'un bit avec retenue du mot adjacent
+        ouest = m << UN
+        ouest[:, 1:] |= m[:, :-1] >> SOIXANTE_TROIS
+        est = m >> UN
+        est[:, :-1] |= m[:, 1:] << SOIXANTE_TROIS
+
+        # --- PHASE A : RECENSEMENT (additionneurs complets bit à bit) ---
+        # Somme horizontale des 3 cellules (ouest, centre, est) de chaque ligne, sur 2 bits
+        x = ouest ^ m
+        s0 = x ^ est
+        s1 = (ouest & m) | (est & x)
+
+        # Somme verticale des 3 lignes : le total inclut la cellule elle-même (0 à 9)
+        h0 = np.zeros_like(m)
+        b0 = np.zeros_like(m)
+        h1 = np.zeros_like(m)
+        b1 = np.zeros_like(m)
+        h0[1:], b0[:-1] = s0[:-1], s0[1:]
+        h1[1:], b1[:-1] = s1[:-1], s1[1:]
+
+        x = h0 ^ s0
+        bit1 = x ^ b0 # Bit de poids 1
+        retenue = (h0 & s0) | (b0 & x) # Retenue de poids 2
+        x = h1 ^ s1
+        t0 = x ^ b1
+        t1 = (h1 & s1) | (b1 & x)
+        bit2 = t0 ^ retenue # Bit de poids 2
+        u = t0 & retenue
+        bit4 = t1 ^ u # Bit de poids 4
+        bit8 = t1 & u # Bit de poids 8
+
+        # --- PHASE B : SÉLECTION ---
+        # Un terme par total (voisins + soi) retenu par la règle ; pour B3/S23 :
+        # total 3 (naissance ou survie à 2 voisins) et total 4 pour une cellule vivante
+        nouveaux = np.zeros_like(m)
+        for total, etat in _termes(self.regle):
+            if total >= 8:
+                # 8 et 9 sont les seuls totaux où bit8 vaut 1 (bit2 et bit4 y sont nuls)
+                chiffres = ((bit8, 1), (bit1, total & 1))
+            else:
+                chiffres = ((bit1, total & 1), (bit2, total >> 1 & 1), (bit4, total >> 2 & 1), (bit8, 0))
+            terme = m if etat == "vivante" else ~m if etat == "morte" else None
+            for chiffre, valeur in chiffres:
+                litteral = chiffre if valeur else ~chiffre
+                terme = litteral if terme is None else terme & litteral
+            nouveaux |= terme
+
+        a_change = not np.array_equal(nouveaux, m)
+        self._mots = nouveaux
+        if a_change:
+            self._vue = None
+        return a_change
+
+    def population(self):
+        """
+        Nombre de cellules vivantes (somme des popcounts des mots).
+        Argument : Aucun
+        Return : int
+        """
+        self._synchroniser()
+        return int(np.bitwise_count(self._mots).sum())
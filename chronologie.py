@@ -0,0 +1,335 @@
+"""
+Journal des générations passées, pour revenir en arrière ou sauter à une génération.
+Chaque génération est enregistrée comme un delta binaire compressé (naissances et morts),
+et une image complète (« image clé ») ouvre chaque segment : un état passé se reconstruit
+avec une image clé puis un nombre borné de deltas. Les budgets mémoire et disque sont
+tenus en espaçant les images clés anciennes, puis en déplaçant les vieux segments sur
+le disque, puis en oubliant les plus anciens.
+"""
+import array
+import os
+import pickle
+import weakref
+import zlib
+
+DECALAGE_X = 1 << 31
+MASQUE_X = (1 << 32) - 1
+INTERVALLE_CLES = 256 # Générations entre deux images clés
+BUDGET_MEMOIRE = 256 * 1024 * 1024 # Octets de journal gardés en mémoire
+BUDGET_DISQUE = 1024 * 1024 * 1024 # Octets de journal gardés sur le disque
+PART_MAX_CLES = 0.5 # Au-delà de cette part du budget mémoire, les images clés anciennes sont espacées
+ESPACEMENT_MAX = 16 # Un segment fusionné couvre au plus ESPACEMENT_MAX * intervalle_cles générations
+
+
+def _encoder(*groupes):
+    """
+    Encode des ensembles de cellules en un bloc compressé : clés 64 bits triées,
+    écrites en différences successives (petites valeurs, bien compressées).
+    Argument : groupes (itérables de tuples (x, y))
+    Return : bytes
+    """
+    valeurs = array.array("q")
+    for cellules in groupes:
+        cles = sorted((y << 32) + (x + DECALAGE_X) for (x, y) in cellules)
+        valeurs.append(len(cles))
+        precedente = 0
+        for cle in cles:
+            valeurs.append(cle - precedente)
+            precedente = cle
+    return zlib.compress(valeurs.tobytes(), 1)
+
+
+def _decoder(bloc):
+    """
+    Inverse de _encoder.
+    Argument : bloc (bytes)
+    Return : list de list de tuples (x, y), un par groupe encodé
+    """
+    valeurs = array.array("q")
+    valeurs.frombytes(zlib.decompress(bloc))
+    groupes = []
+    i = 0
+    while i < len(valeurs):
+        n = valeurs[i]
+        cle = 0
+        cellules = []
+        for d in valeurs[i + 1:i + 1 + n]:
+            cle += d
+            cellules.append(((cle & MASQUE_X) - DECALAGE_X, cle >> 32))
+        groupes.append(cellules)
+        i += n + 1
+    return groupes
+
+
+def _effacer(chemins):
+    """Supprime les fichiers de segments qui restent (fermeture ou destruction du journal)."""
+    for chemin in list(chemins):
+        if os.path.exists(chemin):
+            os.remove(chemin)
+    chemins.clear()
+
+
+class Segment:
+    """
+    Image clé d'une génération suivie des deltas des générations suivantes.
+    Le contenu est en mémoire (cle, deltas) ou dans un fichier (chemin).
+    """
+    __slots__ = ("debut", "longueur", "cle", "deltas", "chemin", "taille")
+
+    def __init__(self, debut, cle):
+        self.debut = debut # Génération de l'image clé
+        self.longueur = 1 # Nombre de générations couvertes (image clé comprise)
+        self.cle = cle
+        self.deltas = [] # deltas[i] fait passer de debut + i à debut + i + 1
+        self.chemin = None
+        self.taille = len(cle)
+
+    @property
+    def fin(self):
+        return self.debut + self.longueur - 1
+
+
+class Chronologie:
+    """
+    Journal des états passés d'une Grille, avec budgets mémoire et disque.
+    """
+
+    def __init__(self, intervalle_cles=INTERVALLE_CLES, budget_memoire=BUDGET_MEMOIRE,
+                 dossier=None, budget_disque=BUDGET_DISQUE):
+        """
+        Prépare un journal vide.
+        Argument : intervalle_cles (int, générations entre deux images clés),
+                   budget_memoire (int, octets), dossier (str ou None, où déplacer les vieux segments),
+                   budget_disque (int, octets)
+        Return : None (Constructeur)
+        """
+        self.intervalle_cles = intervalle_cles
+        self.budget_memoire = budget_memoire
+        self.dossier = dossier
+        self.budget_disque = budget_disque
+        self._segments = [] # Du plus ancien au plus récent, générations contiguës
+        self._rompue = False # L'état courant a été modifié hors évolution
+        self.octets_memoire = 0
+        self.octets_disque = 0
+        self._fichiers = set() # Chemins des segments déplacés sur le disque
+        # Filet de sécurité si fermer() n'est pas appelée : les fichiers partent avec le journal
+        self._finaliseur = weakref.finalize(self, _effacer, self._fichiers)
+
+    # --- Bornes ---
+    @property
+    def debut(self):
+        """Plus ancienne génération restaurable (None si le journal est vide)."""
+        return self._segments[0].debut if self._segments else None
+
+    @property
+    def fin(self):
+        """Génération la plus récente enregistrée (None si le journal est vide)."""
+        return self._segments[-1].fin if self._segments else None
+
+    def contient(self, generation):
+        return bool(self._segments) and self.debut <= generation <= self.fin
+
+    # --- Enregistrement ---
+    def rompre(self):
+        """
+        Signale que l'état courant a été modifié à la main (édition, règle, génération...) :
+        au prochain enregistrement, ce qui suit est oublié et une image clé est prise.
+        Argument : Aucun
+        Return : None
+        """
+        self._rompue = True
+
+    def preparer(self, generation, cellules):
+        """
+        Appelée avant une évolution : ouvre un segment si l'état courant n'est pas déjà connu
+        (journal vide, ou état modifié depuis le dernier enregistrement).
+        Argument : generation (int), cellules (ensemble de tuples, état à cette génération)
+        Return : None
+        """
+        if self._rompue:
+            self.invalider(generation)
+            self._rompue = False
+        if not self._segments or generation > self.fin:
+            self._ouvrir_segment(generation, cellules)
+
+    def enregistrer(self, generation, naissances, morts, cellules):
+        """
+        Enregistre le passage de generation - 1 à generation. Une génération déjà connue
+        (on rejoue le passé après un retour en arrière) n'est pas réenregistrée.
+        Argument : generation (int), naissances (set), morts (set), cellules (ensemble, nouvel état)
+        Return : None
+        """
+        if generation <= self.fin:
+            return # Déjà connue : on rejoue le passé après un retour en arrière
+        segment = self._segments[-1]
+        if segment.longueur >= self.intervalle_cles:
+            self._ouvrir_segment(generation, cellules)
+            return
+        bloc = _encoder(naissances, morts)
+        segment.deltas.append(bloc)
+        segment.longueur += 1
+        segment.taille += len(bloc)
+        self.octets_memoire += len(bloc)
+        if self.octets_memoire > self.budget_memoire:
+            self._respecter_budgets()
+
+    def _ouvrir_segment(self, generation, cellules):
+        cle = _encoder(cellules)
+        self._segments.append(Segment(generation, cle))
+        self.octets_memoire += len(cle)
+        self._espacer_cles()
+        self._respecter_budgets()
+
+    def invalider(self, generation):
+        """
+        Oublie tout ce qui a été enregistré à partir de generation (l'état a été modifié à la main).
+        Argument : generation (int)
+        Return : None
+        """
+        while self._segments and self._segments[-1].debut >= generation:
+            self._supprimer(self._segments.pop())
+        if self._segments and self._segments[-1].fin >= generation:
+            segment = self._segments[-1]
+            self._ramener(segment)
+            garder = generation - segment.debut - 1 # Deltas menant aux générations < generation
+            retires = segment.deltas[garder:]
+            del segment.deltas[garder:]
+            octets = sum(len(b) for b in retires)
+            segment.longueur -= len(retires)
+            segment.taille -= octets
+            self.octets_memoire -= octets
+
+    def vider(self):
+        """Oublie tout le journal (et supprime ses fichiers)."""
+        self.invalider(-float("inf"))
+
+    def fermer(self):
+        """
+        Oublie le journal et supprime ses fichiers de segments ; à appeler en quittant.
+        Argument : Aucun
+        Return : None
+        """
+        self.vider()
+        self._finaliseur()
+
+    # --- Restauration ---
+    def etat(self, generation, courant=None):
+        """
+        Reconstruit l'ensemble des cellules vivantes d'une génération du journal.
+        Si l'état courant est fourni et plus proche que l'image clé, on part de lui
+        en appliquant les deltas à l'envers (retour en arrière pas à pas) ou à l'endroit.
+        Argument : generation (int), courant (tuple (génération, ensemble de cellules) ou None)
+        Return : set de tuples (x, y)
+        """
+        if not self.contient(generation):
+            raise ValueError(f"Génération {generation} absente du journal ({self.debut} à {self.fin})")
+        segment = self._segment(generation)
+        cle, deltas = self._contenu(segment)
+        if (courant is not None and segment.debut <= courant[0] <= segment.fin
+                and abs(courant[0] - generation) < generation - segment.debut):
+            g, cellules = courant[0], set(courant[1])
+        else:
+            g, cellules = segment.debut, set(_decoder(cle)[0])
+
+        # deltas[i] fait passer de debut + i à debut + i + 1
+        while g < generation:
+            naissances, morts = _decoder(deltas[g - segment.debut])
+            cellules.difference_update(morts)
+            cellules.update(naissances)
+            g += 1
+        while g > generation:
+            naissances, morts = _decoder(deltas[g - 1 - segment.debut])
+            cellules.difference_update(naissances)
+            cellules.update(morts)
+            g -= 1
+        return cellules
+
+    def _segment(self, generation):
+        for segment in reversed(self._segments):
+            if segment.debut <= generation:
+                return segment
+        raise ValueError(f"Génération {generation} absente du journal")
+
+    # --- Budgets ---
+    def _contenu(self, segment):
+        """Image clé et deltas d'un segment, lus sur le disque s'il y a été déplacé."""
+        if segment.chemin is None:
+            return segment.cle, segment.deltas
+        with open(segment.chemin, "rb") as f:
+            return pickle.load(f)
+
+    def _ramener(self, segment):
+        """Ramène définitivement en mémoire un segment déplacé sur le disque (pour le modifier)."""
+        if segment.chemin is not None:
+            segment.cle, segment.deltas = self._contenu(segment)
+            os.remove(segment.chemin)
+            self._fichiers.discard(segment.chemin)
+            segment.chemin = None
+            self.octets_disque -= segment.taille
+            self.octets_memoire += segment.taille
+
+    def _supprimer(self, segment):
+        if segment.chemin is not None:
+            os.remove(segment.chemin)
+            self._fichiers.discard(segment.chemin)
+            self.octets_disque -= segment.taille
+        else:
+            self.octets_memoire -= segment.taille
+
+    def _respecter_budgets(self):
+        """
+        Ramène le journal sous ses budgets : espacement des images clés anciennes,
+        puis déplacement des vieux segments sur le disque, puis oubli des plus anciens.
+        Le segment en cours d'écriture est toujours gardé.
+        """
+        en_memoire = [s for s in self._segments[:-1] if s.chemin is None]
+        while self.octets_memoire > self.budget_memoire and en_memoire:
+            segment = en_memoire.pop(0)
+            if self.dossier is not None and segment.taille <= self.budget_disque:
+                self._deplacer_sur_disque(segment)
+            else:
+                self._segments.remove(segment)
+                self._supprimer(segment)
+        while self.octets_disque > self.budget_disque and self._segments[0].chemin is not None:
+            self._supprimer(self._segments.pop(0))
+
+    def _espacer_cles(self):
+        """
+        Quand les images clés dépassent PART_MAX_CLES du budget mémoire, fusionne les deux
+        segments voisins les plus courts (les plus anciens à égalité) : les images clés
+        s'espacent progressivement vers le passé, tous les deltas étant conservés.
+        Un segment ne dépasse jamais ESPACEMENT_MAX * intervalle_cles générations, ce qui borne
+        le nombre de deltas rejoués par etat() ; une fois cette limite atteinte partout, c'est
+        _respecter_budgets qui déplace ou oublie les segments les plus anciens.
+        """
+        longueur_max = ESPACEMENT_MAX * self.intervalle_cles
+        octets_cles = sum(len(s.cle) for s in self._segments if s.chemin is None)
+        while octets_cles > PART_MAX_CLES * self.budget_memoire:
+            paires = [(a.longueur + b.longueur, i) for i, (a, b) in enumerate(zip(self._segments, self._segments[1:-1]))
+                      if a.chemin is None and b.chemin is None and a.longueur + b.longueur <= longueur_max]
+            if not paires:
+                return
+            i = min(paires)[1]
+            a, b = self._segments[i], self._segments[i + 1]
+            # Le delta de a.fin vers b.debut se déduit des deux états
+            etat_a = self.etat(a.fin)
+            etat_b = set(_decoder(b.cle)[0])
+            pont = _encoder(etat_b - etat_a, etat_a - etat_b)
+            a.deltas.append(pont)
+            a.deltas.extend(b.deltas)
+            a.longueur += b.longueur
+            a.taille += len(pont) + b.taille - len(b.cle)
+            self.octets_memoire += len(pont) - len(b.cle)
+            octets_cles -= len(b.cle)
+            self._segments.remove(b)
+
+    def _deplacer_sur_disque(self, segment):
+        os.makedirs(self.dossier, exist_ok=True)
+        segment.chemin = os.path.join(self.dossier, f"segment_{id(self):x}_{segment.debut}.bin")
+        with open(segment.chemin, "wb") as f:
+            pickle.dump((segment.cle, segment.deltas), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._fichiers.add(segment.chemin)
+        segment.cle = None
+        segment.deltas = None
+        self.octets_memoire -= segment.taille
+        self.octets_disque += segment.taille
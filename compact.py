@@ -0,0 +1,253 @@
+import itertools
+
+import numpy as np
+
+from grille import GrilleSansSuivi, VOISINS, VueCellules
+
+# Une cellule (x, y) est rangée dans un seul entier de 64 bits : y * 2^32 + (x + 2^31).
+# L'ordre des clés est donc l'ordre des lignes puis des colonnes, et un décalage
+# (dx, dy) vers une voisine est une simple addition de dy * 2^32 + dx.
+DECALAGE_X = 1 << 31
+MASQUE_X = (1 << 32) - 1
+LIMITE = DECALAGE_X - 2 # |x| et |y| maximaux (une voisine doit rester codable)
+DELTAS = np.array([(dy << 32) + dx for (dx, dy) in VOISINS], dtype=np.int64)
+TAILLE_BLOC = 1 << 20 # Cellules recensées à la fois (borne la mémoire temporaire)
+
+
+def empaqueter(x, y):
+    """Clé entière 64 bits de la cellule (x, y)."""
+    return (y << 32) + (x + DECALAGE_X)
+
+
+def depaqueter(cle):
+    """Coordonnées (x, y) d'une clé produite par empaqueter."""
+    return ((cle & MASQUE_X) - DECALAGE_X, cle >> 32)
+
+
+def _coordonnees(cles):
+    """Tuples (x, y) d'un tableau de clés, produits au fil de l'eau."""
+    xs, ys = depaqueter(cles)
+    return zip(xs.tolist(), ys.tolist())
+
+
+def _debut_ligne(y):
+    """Plus petite clé possible sur la ligne y."""
+    return y << 32
+
+
+class GrilleCompacte(GrilleSansSuivi):
+    """
+    Moteur compact : les cellules vivantes sont des clés de 64 bits dans un tableau
+    NumPy trié (8 octets par cellule au lieu d'environ 150 pour un tuple dans un set).
+    Naissances, morts, tests d'appartenance et recensement des voisins travaillent
+    directement sur les clés, par blocs de lignes pour borner la mémoire temporaire.
+    Population, boîte englobante et index spatial sont eux aussi tirés des clés :
+    seule la lecture de self.cellules crée un tuple par cellule.
+    """
+
+    def __init__(self):
+        """
+        Initialise un univers vide.
+        Argument : Aucun
+        Return : None (Constructeur)
+        """
+        self._cles = np.zeros(0, dtype=np.int64) # Triées, sans doublon ; remplacées, jamais modifiées en place
+        self._basculees = set() # Clés éditées depuis la dernière fusion (une double édition s'annule)
+        self._vue = None
+        self._perimees = False
+        self._cles_index = self._cles # Clés reportées dans l'index spatial
+        self._cles_boite, self._boite = None, None # Clés de la dernière boîte englobante calculée
+        super().__init__()
+
+    # --- Vue ensembliste ---
+    @property
+    def cellules(self):
+        if self._vue is None:
+            self._synchroniser()
+            self._vue = VueCellules(self._lister(), self._vue_modifiee)
+        return self._vue
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._charger(valeur)
+        self._basculees.clear()
+        self._vue = None
+        self._perimees = False
+
+    def _vue_modifiee(self, cellule=None):
+        self._perimees = True
+
+    def _synchroniser(self):
+        """
+        Reconstruit les clés depuis la vue si celle-ci a été modifiée directement,
+        et fusionne en une seule passe les éditions faites par ajouter_ou_supprimer.
+        Argument : Aucun
+        Return : None
+        """
+        if self._perimees:
+            self._charger(self._vue)
+            self._perimees = False
+        if self._basculees:
+            basculees = np.fromiter(self._basculees, dtype=np.int64, count=len(self._basculees))
+            self._cles = np.setxor1d(self._cles, basculees, assume_unique=True)
+            self._basculees.clear()
+
+    def _charger(self, cellules):
+        """
+        Remplace le contenu par les cellules données, sans créer de tuple intermédiaire.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : None
+        """
+        coords = np.fromiter(itertools.chain.from_iterable(cellules), dtype=np.int64).reshape(-1, 2)
+        if len(coords) and np.abs(coords).max() > LIMITE:
+            raise ValueError(f"Coordonnée hors des limites du moteur compact (±{LIMITE})")
+        self._cles = np.unique((coords[:, 1] << 32) + (coords[:, 0] + DECALAGE_X))
+
+    def _lister(self):
+        """
+        Liste les coordonnées absolues de toutes les cellules vivantes.
+        Argument : Aucun
+        Return : list de tuples (x, y)
+        """
+        return list(_coordonnees(self._cles))
+
+    # --- Index spatial et boîte englobante, tirés des clés ---
+    def index_spatial(self):
+        """
+        Index des cellules vivantes par tuiles. Seules les clés apparues ou disparues depuis
+        la mise à jour précédente (différence de deux tableaux triés) deviennent des tuples.
+        Argument : Aucun
+        Return : IndexTuiles
+        """
+        self._synchroniser()
+        cles, anciennes = self._cles, self._cles_index
+        if cles is not anciennes:
+            self._index.appliquer(_coordonnees(np.setdiff1d(cles, anciennes, assume_unique=True)),
+                                  _coordonnees(np.setdiff1d(anciennes, cles, assume_unique=True)))
+            self._cles_index = cles
+        return self._index
+
+    def boite_englobante(self):
+        """
+        Plus petit rectangle contenant les cellules vivantes : lignes extrêmes lues aux deux bouts
+        du tableau trié, colonnes extrêmes par un minimum et un maximum vectorisés.
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max) bornes incluses, ou None si la grille est vide
+        """
+        self._synchroniser()
+        cles = self._cles
+        if cles is not self._cles_boite:
+            if len(cles):
+                xs = cles & MASQUE_X
+                self._boite = (int(xs.min()) - DECALAGE_X, int(cles[0] >> 32),
+                               int(xs.max()) - DECALAGE_X, int(cles[-1] >> 32))
+            else:
+                self._boite = None
+            self._cles_boite = cles
+        return self._boite
+
+    # --- Évolution ---
+    def ajouter_ou_supprimer(self, x, y):
+        """
+        Bascule une cellule. L'édition est mise en attente et fusionnée avec les autres
+        au prochain calcul ou à la prochaine lecture : une édition coûte O(1), pas une copie du tableau.
+        Argument : x (int), y (int)
+        Return : None
+        """
+        if max(abs(x), abs(y)) > LIMITE:
+            raise ValueError(f"Coordonnée hors des limites du moteur compact (±{LIMITE})")
+        if self._perimees:
+            self._synchroniser() # La vue modifiée reste la référence des éditions précédentes
+        cle = empaqueter(x, y)
+        if cle in self._basculees:
+            self._basculees.remove(cle)
+        else:
+            self._basculees.add(cle)
+        self._vue = None
+
+    def _recenser(self, cles, y_min, y_max):
+        """
+        Calcule les cellules vivantes des lignes y_min à y_max à la génération suivante.
+        Argument : cles (np.ndarray trié), y_min (int), y_max (int)
+        Return : np.ndarray trié des clés vivantes de ces lignes
+        """
+        # Seules les cellules des lignes y_min - 1 à y_max + 1 ont des voisines dans la bande
+        bornes = np.searchsorted(cles, [_debut_ligne(y_min - 1), _debut_ligne(y_min),
+                                        _debut_ligne(y_max + 1), _debut_ligne(y_max + 2)])
+        contexte = cles[bornes[0]:bornes[3]]
+        vivantes = cles[bornes[1]:bornes[2]]
+
+        # --- PHASE A : RECENSEMENT (chaque voisine reçoit une contribution par cellule) ---
+        candidates = (contexte[None, :] + DELTAS[:, None]).ravel()
+        candidates = candidates[(candidates >= _debut_ligne(y_min)) & (candidates < _debut_ligne(y_max + 1))]
+        candidates, nb_voisins = np.unique(candidates, return_counts=True)
+
+        # --- PHASE B : SÉLECTION (bit 9 * vivante + nb_voisins du masque de la règle) ---
+        if len(vivantes):
+            position = np.minimum(np.searchsorted(vivantes, candidates), len(vivantes) - 1)
+            est_vivante = vivantes[position] == candidates
+        else:
+            est_vivante = np.zeros(len(candidates), dtype=bool)
+        garde = (self.regle.masque >> (nb_voisins + 9 * est_vivante)) & 1
+        nouvelles = candidates[garde.astype(bool)]
+        if self.regle.survie[0]:
+            # Les cellules sans voisine ne sont pas candidates mais survivent sous cette règle
+            isolees = vivantes[~np.isin(vivantes, candidates, assume_unique=True)]
+            nouvelles = np.union1d(nouvelles, isolees)
+        return nouvelles
+
+    def evoluer(self):
+        """
+        Calcule la génération suivante, bande de lignes par bande de lignes.
+        Lève ValueError, sans rien changer, si une naissance sort des limites du moteur.
+        Argument : Aucun
+        Return : bool (True si l'état a changé)
+        """
+        self._synchroniser()
+        cles = self._cles
+        if not len(cles):
+            self.generation += 1
+            return False
+
+        morceaux = []
+        debut = 0
+        y_min = int(cles[0] >> 32) - 1
+        while debut < len(cles):
+            fin = debut + TAILLE_BLOC
+            if fin < len(cles):
+                # La bande s'arrête au début d'une ligne (au moins une ligne entière par bande)
+                y_suivante = int(cles[fin] >> 32)
+                fin = int(np.searchsorted(cles, _debut_ligne(y_suivante)))
+                if fin == debut:
+                    y_suivante += 1
+                    fin = int(np.searchsorted(cles, _debut_ligne(y_suivante)))
+            if fin >= len(cles):
+                y_max = int(cles[-1] >> 32) + 1
+            else:
+                y_max = int(cles[fin] >> 32) - 1
+            morceaux.append(self._recenser(cles, y_min, y_max))
+            y_min = y_max + 1
+            debut = fin
+
+        # Les bandes se suivent dans l'ordre des lignes : la concaténation reste triée
+        nouvelles = np.concatenate(morceaux)
+        # Une naissance à LIMITE + 1 est encore codable, mais ses voisines ne le seraient plus
+        if len(nouvelles):
+            xs, ys = depaqueter(nouvelles)
+            if max(abs(int(ys[0])), abs(int(ys[-1])), int(np.abs(xs).max())) > LIMITE:
+                raise ValueError(f"La génération {self.generation + 1} sort des limites du moteur compact (±{LIMITE})")
+        self.generation += 1
+        a_change = not np.array_equal(nouvelles, cles)
+        self._cles = nouvelles
+        if a_change:
+            self._vue = None
+        return a_change
+
+    def population(self):
+        """
+        Nombre de cellules vivantes (taille du tableau de clés).
+        Argument : Aucun
+        Return : int
+        """
+        self._synchroniser()
+        return len(self._cles)
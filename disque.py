@@ -0,0 +1,307 @@
+"""
+Moteur par tuiles dont seules les tuiles récemment utilisées restent en mémoire :
+les autres sont déversées, compactées à 1 bit par cellule, dans un fichier projeté
+en mémoire (mmap). La taille de l'univers n'est plus bornée par la RAM mais par le disque.
+"""
+import collections
+import collections.abc
+import mmap
+import tempfile
+
+import numpy as np
+
+from formats import enregistrements_depuis_feuilles
+from tuiles import TAILLE_TUILE, GrilleTuiles
+
+OCTETS_RESIDENTE = TAILLE_TUILE * TAILLE_TUILE # Tuile en mémoire : un octet par cellule
+OCTETS_DEVERSEE = OCTETS_RESIDENTE // 8 # Tuile sur disque : un bit par cellule
+MEMOIRE_MAX = 256 << 20 # Plafond par défaut des tuiles résidentes (256 Mo)
+PART_TAMPON = 4 # Le tampon de la génération en cours reçoit 1/PART_TAMPON du plafond
+RESIDENTES_MIN = 64 # Au moins de quoi calculer une tuile et ses voisines
+EMPLACEMENTS_INITIAUX = 1024
+
+
+class StockageTuiles(collections.abc.MutableMapping):
+    """
+    Dictionnaire (tx, ty) -> tableau uint8 de 0 et de 1 qui garde en mémoire au plus
+    `capacite` tuiles, les moins récemment utilisées étant déversées dans un fichier
+    temporaire d'emplacements de OCTETS_DEVERSEE octets.
+    Une tuile lue sur le disque y garde sa copie tant qu'elle n'est pas réécrite :
+    l'évincer à nouveau ne coûte alors aucune écriture.
+    """
+
+    def __init__(self, memoire_max=MEMOIRE_MAX, dossier=None):
+        """
+        Crée un stockage vide et son fichier temporaire (supprimé à la fermeture).
+        Argument : memoire_max (int, octets de tuiles résidentes), dossier (str ou None, emplacement du fichier)
+        Return : None (Constructeur)
+        """
+        self.capacite = max(RESIDENTES_MIN, memoire_max // OCTETS_RESIDENTE)
+        self._residentes = collections.OrderedDict() # De la moins à la plus récemment utilisée
+        self._emplacements = {} # cle -> emplacement de la copie sur disque
+        self._comptes = {} # cle -> cellules vivantes de la tuile (toutes les tuiles, résidentes ou non)
+        self._libres = [] # Emplacements libérés, réutilisés avant d'agrandir le fichier
+        self._suivant = 0 # Premier emplacement jamais utilisé
+        self.population = 0
+        self.lectures = 0 # Tuiles relues depuis le disque
+        self.ecritures = 0 # Tuiles écrites sur le disque
+        self._fichier = tempfile.TemporaryFile(prefix="tuiles_", dir=dossier)
+        self._fichier.truncate(EMPLACEMENTS_INITIAUX * OCTETS_DEVERSEE)
+        self._carte = mmap.mmap(self._fichier.fileno(), EMPLACEMENTS_INITIAUX * OCTETS_DEVERSEE)
+
+    # --- Interface de dictionnaire ---
+    def __len__(self):
+        return len(self._comptes)
+
+    def __iter__(self):
+        return iter(self._comptes)
+
+    def __contains__(self, cle):
+        return cle in self._comptes
+
+    def __getitem__(self, cle):
+        tuile = self._residentes.get(cle)
+        if tuile is not None:
+            self._residentes.move_to_end(cle)
+            return tuile
+        if cle not in self._emplacements:
+            raise KeyError(cle)
+        tuile = self._lire(cle)
+        self._residentes[cle] = tuile
+        self._evincer()
+        return tuile
+
+    def __setitem__(self, cle, tuile):
+        compte = int(np.count_nonzero(tuile))
+        self.population += compte - self._comptes.get(cle, 0)
+        self._comptes[cle] = compte
+        self._liberer(cle) # La copie sur disque n'est plus à jour
+        self._residentes[cle] = tuile
+        self._residentes.move_to_end(cle)
+        self._evincer()
+
+    def __delitem__(self, cle):
+        self.population -= self._comptes.pop(cle)
+        self._residentes.pop(cle, None)
+        self._liberer(cle)
+
+    def items(self):
+        """Parcourt toutes les tuiles sans les ramener en mémoire (une lecture complète ne chasse pas les tuiles chaudes)."""
+        for cle in self._comptes:
+            yield cle, self.consulter(cle)
+
+    def consulter(self, cle):
+        """
+        Lit une tuile sans la ramener parmi les résidentes ni changer l'ordre d'éviction.
+        Argument : cle (tuple (tx, ty))
+        Return : np.ndarray uint8 (TAILLE_TUILE, TAILLE_TUILE)
+        """
+        tuile = self._residentes.get(cle)
+        return self._lire(cle) if tuile is None else tuile
+
+    def values(self):
+        return (tuile for _, tuile in self.items())
+
+    def clear(self):
+        self._residentes.clear()
+        self._emplacements.clear()
+        self._comptes.clear()
+        self._libres.clear()
+        self._suivant = 0
+        self.population = 0
+
+    # --- Déversement ---
+    @property
+    def nb_residentes(self):
+        return len(self._residentes)
+
+    @property
+    def nb_deversees(self):
+        return len(self._comptes) - len(self._residentes)
+
+    @property
+    def octets_disque(self):
+        return (self._suivant - len(self._libres)) * OCTETS_DEVERSEE
+
+    def _evincer(self):
+        """
+        Déverse les tuiles les moins récemment utilisées jusqu'à revenir sous la capacité.
+        Argument : Aucun
+        Return : None
+        """
+        while len(self._residentes) > self.capacite:
+            cle, tuile = self._residentes.popitem(last=False)
+            if cle not in self._emplacements:
+                self._ecrire(cle, tuile)
+
+    def _lire(self, cle):
+        """
+        Relit une tuile déversée.
+        Argument : cle (tuple (tx, ty))
+        Return : np.ndarray uint8 (TAILLE_TUILE, TAILLE_TUILE)
+        """
+        debut = self._emplacements[cle] * OCTETS_DEVERSEE
+        self.lectures += 1
+        bits = np.frombuffer(self._carte[debut:debut + OCTETS_DEVERSEE], dtype=np.uint8)
+        return np.unpackbits(bits).reshape(TAILLE_TUILE, TAILLE_TUILE)
+
+    def _ecrire(self, cle, tuile):
+        """
+        Écrit une tuile sur le disque, dans un emplacement libre ou à la fin du fichier.
+        Argument : cle (tuple (tx, ty)), tuile (np.ndarray de 0 et de 1)
+        Return : None
+        """
+        if self._libres:
+            emplacement = self._libres.pop()
+        else:
+            emplacement = self._suivant
+            self._suivant += 1
+            if self._suivant * OCTETS_DEVERSEE > len(self._carte):
+                # Fichier plein : sa taille double, et la projection est refaite
+                taille = 2 * len(self._carte)
+                self._carte.close()
+                self._fichier.truncate(taille)
+                self._carte = mmap.mmap(self._fichier.fileno(), taille)
+        debut = emplacement * OCTETS_DEVERSEE
+        self._carte[debut:debut + OCTETS_DEVERSEE] = np.packbits(tuile).tobytes()
+        self._emplacements[cle] = emplacement
+        self.ecritures += 1
+
+    def _liberer(self, cle):
+        emplacement = self._emplacements.pop(cle, None)
+        if emplacement is not None:
+            self._libres.append(emplacement)
+
+    def fermer(self):
+        """
+        Libère la projection et supprime le fichier temporaire.
+        Argument : Aucun
+        Return : None
+        """
+        if not self._fichier.closed:
+            self._carte.close()
+            self._fichier.close()
+
+
+class GrilleDisque(GrilleTuiles):
+    """
+    Moteur par tuiles NumPy hors mémoire : mêmes calculs que GrilleTuiles (donc mêmes
+    résultats), mais au-delà de memoire_max octets les tuiles froides partent sur le disque
+    et ne reviennent qu'au moment où leur voisinage se remet à bouger.
+    """
+
+    def __init__(self, memoire_max=MEMOIRE_MAX, dossier=None):
+        """
+        Initialise un univers vide.
+        Argument : memoire_max (int, octets de tuiles gardées en mémoire),
+                   dossier (str ou None, dossier du fichier de déversement ; par défaut celui du système)
+        Return : None (Constructeur)
+        """
+        self._memoire_max = memoire_max
+        self._dossier = dossier
+        super().__init__()
+
+    def _creer_tuiles(self):
+        return StockageTuiles(self._memoire_max - self._memoire_max // PART_TAMPON, self._dossier)
+
+    def _creer_tampon(self):
+        # Les tuiles calculées pendant une génération déversent elles aussi : la mémoire
+        # reste bornée même quand une génération modifie plus de tuiles que le plafond
+        return StockageTuiles(self._memoire_max // PART_TAMPON, self._dossier)
+
+    def population(self):
+        """
+        Nombre de cellules vivantes, tenu à jour tuile par tuile (sans relire le disque).
+        Argument : Aucun
+        Return : int
+        """
+        self._synchroniser()
+        return self._tuiles.population
+
+    def boite_englobante(self):
+        """
+        Plus petit rectangle contenant les cellules vivantes, sans lister les cellules :
+        une tuile gardée n'est jamais vide, chaque borne se trouve donc dans la rangée de tuiles
+        extrême correspondante, et seules ces tuiles sont lues.
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max) bornes incluses, ou None si la grille est vide
+        """
+        self._synchroniser()
+        cles = list(self._tuiles)
+        if not cles:
+            return None
+        t, consulter = TAILLE_TUILE, self._tuiles.consulter
+        tx_min, tx_max = min(tx for tx, _ in cles), max(tx for tx, _ in cles)
+        ty_min, ty_max = min(ty for _, ty in cles), max(ty for _, ty in cles)
+        return (
+            tx_min * t + min(int(np.flatnonzero(consulter(c).any(axis=0))[0]) for c in cles if c[0] == tx_min),
+            ty_min * t + min(int(np.flatnonzero(consulter(c).any(axis=1))[0]) for c in cles if c[1] == ty_min),
+            tx_max * t + max(int(np.flatnonzero(consulter(c).any(axis=0))[-1]) for c in cles if c[0] == tx_max),
+            ty_max * t + max(int(np.flatnonzero(consulter(c).any(axis=1))[-1]) for c in cles if c[1] == ty_max),
+        )
+
+    def cellules_par_ligne(self):
+        """
+        Cellules vivantes triées par y puis par x (l'ordre du format RLE), produites bande de
+        tuiles par bande de tuiles : seule une rangée de tuiles est lue à la fois.
+        Argument : Aucun
+        Return : générateur de tuples (x, y)
+        """
+        self._synchroniser()
+        t, consulter = TAILLE_TUILE, self._tuiles.consulter
+        bandes = {}
+        for (tx, ty) in self._tuiles:
+            bandes.setdefault(ty, []).append(tx)
+        for ty in sorted(bandes):
+            rangee = [(tx * t, consulter((tx, ty))) for tx in sorted(bandes[ty])]
+            for ly in range(t):
+                y = ty * t + ly
+                for x0, tuile in rangee:
+                    for lx in np.flatnonzero(tuile[ly]).tolist():
+                        yield (x0 + lx, y)
+
+    def enregistrements_macrocell(self):
+        """
+        Quadtree Macrocell construit directement depuis les tuiles (une feuille 8x8 par bloc non vide),
+        sans ensemble de cellules intermédiaire.
+        Argument : Aucun
+        Return : list de tuples (voir formats.lire_enregistrements_macrocell)
+        """
+        boite = self.boite_englobante()
+        if boite is None:
+            return []
+        return enregistrements_depuis_feuilles(self._feuilles(), max(abs(b) for b in boite))
+
+    def _feuilles(self):
+        # Tuile [y, x] -> blocs [by, ly, bx, lx] ; chaque ligne d'un bloc devient un octet (bit lx)
+        blocs_par_cote = TAILLE_TUILE // 8
+        for (tx, ty), tuile in self._tuiles.items():
+            octets = np.packbits(tuile.reshape(blocs_par_cote, 8, blocs_par_cote, 8), axis=3, bitorder="little")
+            octets = octets.reshape(blocs_par_cote, 8, blocs_par_cote).transpose(0, 2, 1) # [by, bx, ly]
+            for by, bx in zip(*np.nonzero(octets.any(axis=2))):
+                yield ((tx * blocs_par_cote + int(bx), ty * blocs_par_cote + int(by)), tuple(octets[by, bx].tolist()))
+
+    def statistiques_stockage(self):
+        """
+        État du stockage pour le HUD et simuler.py.
+        Argument : Aucun
+        Return : dict (residentes, deversees, octets_memoire, octets_disque, lectures, ecritures)
+        """
+        stockage, tampon = self._tuiles, self._calculees
+        return {
+            "residentes": stockage.nb_residentes,
+            "deversees": stockage.nb_deversees,
+            "octets_memoire": (stockage.nb_residentes + tampon.nb_residentes) * OCTETS_RESIDENTE,
+            "octets_disque": stockage.octets_disque + tampon.octets_disque,
+            "lectures": stockage.lectures + tampon.lectures,
+            "ecritures": stockage.ecritures + tampon.ecritures,
+        }
+
+    def fermer(self):
+        """
+        Supprime les fichiers de déversement ; la grille n'est plus utilisable ensuite.
+        Argument : Aucun
+        Return : None
+        """
+        self._tuiles.fermer()
+        self._calculees.fermer()
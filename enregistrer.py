@@ -0,0 +1,297 @@
+"""
+Enregistrement d'une longue simulation sans fenêtre : chaque image est dessinée sur une
+pygame.Surface en mémoire (pilote vidéo factice), puis encodée en PNG par un pool de
+processus (séquence numérotée) ou ajoutée à un flux d'images brutes RGB par un fil
+d'écriture. Le calcul n'attend jamais l'encodage, sauf si la file d'attente est pleine.
+
+    python enregistrer.py "Canon de Gosper" -n 100000 --pas 10 --sortie images/
+    python enregistrer.py soupe.rle -n 5000 --camera cadrer --sortie film.rgb
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 900x700 -r 60 -i film.rgb film.mp4
+"""
+import argparse
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Aucune fenêtre, même sans serveur graphique
+import numpy as np
+import pygame
+
+from moteurs import MOTEURS, creer_grille
+from rendu import BLANC, GRIS_CLAIR, GRIS_FONCE, NOIR, dessiner_grillage, rasteriser
+from simuler import charger_motif
+
+LARGEUR, HAUTEUR = 900, 700
+TAILLE_CELLULE = 4
+EXTENSIONS_BRUTES = (".rgb", ".raw") # Flux d'images RGB24 mises bout à bout
+IMAGES_EN_ATTENTE = 4 # Images en cours d'encodage par processus avant que le calcul attende
+SUIVI = 0.2 # Part de l'écart au motif rattrapée par la caméra à chaque image
+MARGE_CADRAGE = 0.9 # Part de l'image occupée par le motif en mode "cadrer"
+
+
+class Camera:
+    """
+    Cadrage des images : fixe, centrée en douceur sur le motif ("suivre"),
+    ou centrée avec un zoom qui fait tenir tout le motif dans l'image ("cadrer").
+    """
+
+    def __init__(self, largeur, hauteur, taille_cellule, mode="fixe", centre=(0.0, 0.0)):
+        """
+        Place la caméra sur une cellule.
+        Argument : largeur, hauteur (int, pixels), taille_cellule (float, pixels par cellule),
+                   mode (str : "fixe", "suivre" ou "cadrer"), centre (tuple, cellule au centre de l'image)
+        Return : None (Constructeur)
+        """
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.taille_cellule = taille_cellule
+        self.mode = mode
+        self.centre = centre
+
+    @property
+    def offsets(self):
+        """Décalage (offset_x, offset_y) en pixels, comme la caméra du jeu."""
+        cx, cy = self.centre
+        return (round(self.largeur / 2 - cx * self.taille_cellule),
+                round(self.hauteur / 2 - cy * self.taille_cellule))
+
+    def rectangle(self):
+        """
+        Cellules couvertes par l'image.
+        Return : tuple (x_min, y_min, x_max, y_max)
+        """
+        ox, oy = self.offsets
+        t = self.taille_cellule
+        return (math.floor(-ox / t), math.floor(-oy / t),
+                math.floor((self.largeur - 1 - ox) / t), math.floor((self.hauteur - 1 - oy) / t))
+
+    def suivre(self, x_min, y_min, x_max, y_max):
+        """
+        Rapproche la caméra de la boîte englobante du motif (modes "suivre" et "cadrer").
+        Argument : x_min, y_min, x_max, y_max (bornes du motif)
+        Return : None
+        """
+        cible = ((x_min + x_max + 1) / 2, (y_min + y_max + 1) / 2)
+        cx, cy = self.centre
+        self.centre = (cx + SUIVI * (cible[0] - cx), cy + SUIVI * (cible[1] - cy))
+        if self.mode == "cadrer":
+            # Zoom par puissances de 2 pour garder des cellules nettes
+            ajuste = MARGE_CADRAGE * min(self.largeur / (x_max - x_min + 1), self.hauteur / (y_max - y_min + 1))
+            self.taille_cellule = 2.0 ** math.floor(math.log2(max(min(ajuste, 64), 1 / 64)))
+
+
+class Rendu:
+    """
+    Dessine les images hors écran ; le fond (blanc et grillage) est gardé tant que
+    la caméra ne change pas de zoom ni de décalage modulo une cellule.
+    """
+
+    def __init__(self, largeur, hauteur, legende=True):
+        """
+        Prépare les surfaces hors écran.
+        Argument : largeur, hauteur (int, pixels), legende (bool, écrire le numéro de génération)
+        Return : None (Constructeur)
+        """
+        self.image = pygame.Surface((largeur, hauteur))
+        self.calque = pygame.Surface((largeur, hauteur), pygame.SRCALPHA)
+        self.calque.fill((*NOIR, 0))
+        self.fond = pygame.Surface((largeur, hauteur))
+        self.cle_fond = None
+        self.police = pygame.font.Font(None, 22) if legende else None
+
+    def dessiner(self, coords, camera, generation):
+        """
+        Dessine une image.
+        Argument : coords (np.ndarray int64 (n, 2), cellules à dessiner), camera (Camera), generation (int)
+        Return : pygame.Surface (réutilisée à l'image suivante)
+        """
+        t = camera.taille_cellule
+        ox, oy = camera.offsets
+        cle = (t, ox % t, oy % t)
+        if cle != self.cle_fond:
+            self.fond.fill(BLANC)
+            dessiner_grillage(self.fond, t, ox, oy, GRIS_CLAIR)
+            self.cle_fond = cle
+        self.image.blit(self.fond, (0, 0))
+
+        alpha = pygame.surfarray.pixels_alpha(self.calque)
+        rasteriser(alpha, coords, t, ox, oy)
+        del alpha # Libère le verrou sur la surface avant le blit
+        self.image.blit(self.calque, (0, 0))
+
+        if self.police is not None:
+            texte = self.police.render(f"Génération {generation}", True, GRIS_FONCE)
+            self.image.blit(texte, (10, 10))
+        return self.image
+
+
+def _encoder_png(chemin, taille, octets):
+    # Exécutée dans un processus du pool : pygame sait écrire un PNG sans affichage
+    pygame.image.save(pygame.image.frombytes(octets, taille, "RGB"), chemin)
+
+
+class Enregistreur:
+    """
+    Écrit les images dans l'ordre : séquence de PNG numérotés encodés par un pool
+    de processus, ou flux brut RGB24 écrit par un fil dédié.
+    """
+
+    def __init__(self, sortie, processus=None):
+        """
+        Ouvre la sortie et démarre les encodeurs.
+        Argument : sortie (str, dossier des PNG, ou fichier .rgb / .raw pour un flux brut),
+                   processus (int ou None, encodeurs PNG ; par défaut un par cœur)
+        Return : None (Constructeur)
+        """
+        self.sortie = sortie
+        self.brut = sortie.lower().endswith(EXTENSIONS_BRUTES)
+        self.nb_images = 0
+        self.attente = 0.0 # Secondes passées par le calcul à attendre l'encodage
+        if self.brut:
+            self._fichier = open(sortie, "wb")
+            self._file = queue.Queue(maxsize=IMAGES_EN_ATTENTE)
+            self._ecrivain = threading.Thread(target=self._ecrire_flux, daemon=True)
+            self._ecrivain.start()
+        else:
+            os.makedirs(sortie, exist_ok=True)
+            self._processus = processus or os.cpu_count()
+            self._pool = multiprocessing.Pool(self._processus)
+            self._en_cours = []
+
+    def ajouter(self, image):
+        """
+        Confie une image à l'encodage ; ne bloque que si trop d'images sont déjà en attente.
+        Argument : image (pygame.Surface, copiée : elle peut être redessinée aussitôt)
+        Return : None
+        """
+        octets = pygame.image.tobytes(image, "RGB")
+        debut = time.perf_counter()
+        if self.brut:
+            self._file.put(octets)
+        else:
+            if len(self._en_cours) >= IMAGES_EN_ATTENTE * self._processus:
+                self._en_cours.pop(0).get() # Propage aussi une éventuelle erreur d'encodage
+            chemin = os.path.join(self.sortie, f"image_{self.nb_images:06d}.png")
+            self._en_cours.append(self._pool.apply_async(_encoder_png, (chemin, image.get_size(), octets)))
+        self.attente += time.perf_counter() - debut
+        self.nb_images += 1
+
+    def _ecrire_flux(self):
+        while True:
+            octets = self._file.get()
+            if octets is None:
+                return
+            self._fichier.write(octets)
+
+    def fermer(self):
+        """
+        Attend la fin de l'encodage de toutes les images.
+        Argument : Aucun
+        Return : None
+        """
+        if self.brut:
+            self._file.put(None)
+            self._ecrivain.join()
+            self._fichier.close()
+        else:
+            for resultat in self._en_cours:
+                resultat.get()
+            self._pool.close()
+            self._pool.join()
+
+
+def coordonnees(cellules):
+    """
+    Tableau numpy des coordonnées d'un ensemble de cellules.
+    Argument : cellules (ensemble ou liste de tuples (x, y))
+    Return : np.ndarray int64 de forme (n, 2)
+    """
+    n = len(cellules)
+    return np.fromiter(itertools.chain.from_iterable(cellules), dtype=np.int64, count=2 * n).reshape(n, 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enregistre une simulation image par image, sans fenêtre.")
+    parser.add_argument("motif", help="nom d'un motif de MOTIFS ou chemin d'un fichier (.cells, Life 1.06, .rle, .mc)")
+    parser.add_argument("-n", "--generations", type=int, default=1000, help="nombre de générations simulées")
+    parser.add_argument("--pas", type=int, default=1, help="générations entre deux images")
+    parser.add_argument("--moteur", choices=sorted(MOTEURS), default="creux", help="moteur d'évolution")
+    parser.add_argument("--regle", help="règle B/S ou nom connu (par défaut celle du fichier, sinon B3/S23)")
+    parser.add_argument("--sortie", default="images", help="dossier de la séquence PNG, ou fichier .rgb / .raw")
+    parser.add_argument("--taille", type=int, nargs=2, default=[LARGEUR, HAUTEUR], metavar=("LARGEUR", "HAUTEUR"))
+    parser.add_argument("--zoom", type=float, default=TAILLE_CELLULE, help="pixels par cellule (moins de 1 : densité)")
+    parser.add_argument("--camera", choices=["fixe", "suivre", "cadrer"], default="fixe",
+                        help="caméra fixe sur le motif de départ, qui suit le motif, ou qui le cadre en entier")
+    parser.add_argument("--processus", type=int, help="processus d'encodage PNG (par défaut un par cœur)")
+    parser.add_argument("--sans-legende", action="store_true", help="n'écrit pas le numéro de génération")
+    args = parser.parse_args(argv)
+
+    grille = creer_grille(args.moteur)
+    try:
+        charger_motif(grille, args.motif)
+        if args.regle:
+            grille.regle = args.regle
+    except (ValueError, OSError) as e:
+        if hasattr(grille, "fermer"):
+            grille.fermer()
+        parser.error(str(e))
+
+    pygame.init()
+    largeur, hauteur = args.taille
+    boite = grille.boite_englobante()
+    centre = ((boite[0] + boite[2] + 1) / 2, (boite[1] + boite[3] + 1) / 2) if boite is not None else (0.0, 0.0)
+    camera = Camera(largeur, hauteur, args.zoom, args.camera, centre)
+    if args.camera == "cadrer" and boite is not None:
+        camera.suivre(*boite)
+    rendu = Rendu(largeur, hauteur, legende=not args.sans_legende)
+    enregistreur = Enregistreur(args.sortie, args.processus)
+
+    duree_calcul = duree_rendu = 0.0
+    debut = time.perf_counter()
+    generations = 0
+    while True:
+        t0 = time.perf_counter()
+        if args.camera != "fixe":
+            # Boîte englobante tenue à jour par la grille : la caméra suit sans parcourir les cellules
+            boite = grille.boite_englobante()
+            if boite is not None:
+                camera.suivre(*boite)
+        # Seules les cellules de l'image sont lues, grâce à l'index spatial
+        coords = coordonnees(grille.index_spatial().dans(*camera.rectangle()))
+        enregistreur.ajouter(rendu.dessiner(coords, camera, grille.generation))
+        t1 = time.perf_counter()
+        duree_rendu += t1 - t0
+        if generations >= args.generations:
+            break
+        for _ in range(min(args.pas, args.generations - generations)):
+            grille.evoluer()
+            generations += 1
+        duree_calcul += time.perf_counter() - t1
+
+    enregistreur.fermer()
+    if hasattr(grille, "fermer"):
+        grille.fermer()
+    duree = time.perf_counter() - debut
+
+    print(f"Générations      : {generations}")
+    print(f"Images           : {enregistreur.nb_images} ({largeur}x{hauteur})")
+    print(f"Temps écoulé     : {duree:.3f} s (calcul {duree_calcul:.3f} s, rendu {duree_rendu:.3f} s, "
+          f"attente de l'encodage {enregistreur.attente:.3f} s)")
+    if duree > 0:
+        print(f"Générations/s    : {generations / duree:,.1f}")
+        print(f"Images/s         : {enregistreur.nb_images / duree:,.1f}")
+    if enregistreur.brut:
+        print(f"Flux brut        : ffmpeg -f rawvideo -pix_fmt rgb24 -s {largeur}x{hauteur} -r 60 "
+              f"-i {args.sortie} film.mp4")
+    else:
+        print(f"Images PNG       : {os.path.join(args.sortie, 'image_XXXXXX.png')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+"""
+Lecture et écriture de motifs dans des fichiers, sans dépendance à pygame.
+Formats reconnus : texte brut (.cells, 'O' = vivante), Life 1.06 (une paire "x y" par ligne),
+RLE (.rle) et Macrocell (.mc, quadtree de Golly). Les lecteurs sont des générateurs : les
+cellules sont produites au fil de l'analyse, sans liste intermédiaire, et les gros fichiers
+sont projetés en mémoire (mmap) au lieu d'être lus d'un bloc.
+"""
+import contextlib
+import mmap
+import os
+import re
+
+from regles import CONWAY
+
+REGLE_VIE = CONWAY.texte
+SEUIL_MMAP = 64 * 1024 * 1024 # Au-delà (en octets), le fichier est projeté en mémoire
+LARGEUR_LIGNE_RLE = 70
+EXTENSIONS = (".rle", ".mc", ".cells", ".txt", ".lif", ".life")
+
+_ENTETE_RLE = re.compile(rb"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?", re.I)
+_JETON_RLE = re.compile(rb"(\d*)\s*([^\d\s])")
+_POSITION_RLE = re.compile(rb"Pos\s*=\s*(-?\d+)\s*,\s*(-?\d+)")
+_GENERATION_RLE = re.compile(rb"Gen\s*=\s*(\d+)")
+
+
+def lire_cells(lignes):
+    """
+    Lit un motif au format texte brut (.cells) : '!' en début de ligne = commentaire,
+    'O' ou '*' = cellule vivante, tout autre caractère = cellule morte.
+    Argument : lignes (itérable de str)
+    Return : générateur de tuples (x, y)
+    """
+    y = 0
+    for ligne in lignes:
+        if ligne.startswith("!"):
+            continue
+        for x, car in enumerate(ligne.rstrip("\r\n")):
+            if car in "O*":
+                yield (x, y)
+        y += 1
+
+
+def lire_life106(lignes):
+    """
+    Lit un motif au format Life 1.06 : lignes '#' ignorées, puis "x y" par cellule vivante.
+    Argument : lignes (itérable de str)
+    Return : générateur de tuples (x, y)
+    """
+    for ligne in lignes:
+        ligne = ligne.strip()
+        if not ligne or ligne.startswith("#"):
+            continue
+        x, y = ligne.split()
+        yield (int(x), int(y))
+
+
+def _lignes(donnees, debut=0):
+    """
+    Parcourt les lignes d'un tampon d'octets (bytes ou mmap) sans le copier en entier.
+    Argument : donnees (bytes ou mmap), debut (int, position de départ)
+    Return : générateur de tuples (ligne sans fin de ligne, position de la ligne suivante)
+    """
+    taille = len(donnees)
+    while debut < taille:
+        fin = donnees.find(b"\n", debut)
+        if fin < 0:
+            fin = taille
+        yield donnees[debut:fin].rstrip(b"\r"), fin + 1
+        debut = fin + 1
+
+
+def lire_rle(donnees, infos=None):
+    """
+    Lit un motif RLE : commentaires '#', ligne d'en-tête "x = .., y = .., rule = ..",
+    puis des séquences <nombre><état> ('b' ou '.' = morte, autre lettre = vivante,
+    '$' = fin de ligne, '!' = fin du motif). Sans position "#CXRLE Pos=x,y",
+    le motif est centré sur l'origine comme le fait Golly.
+    Argument : donnees (bytes ou mmap), infos (dict ou None, reçoit largeur, hauteur, regle, generation)
+    Return : générateur de tuples (x, y)
+    """
+    infos = {} if infos is None else infos
+    position = None
+    debut = len(donnees)
+    for ligne, suivante in _lignes(donnees):
+        if ligne.startswith(b"#"):
+            if ligne.startswith(b"#CXRLE"):
+                m = _POSITION_RLE.search(ligne)
+                if m:
+                    position = (int(m[1]), int(m[2]))
+                m = _GENERATION_RLE.search(ligne)
+                if m:
+                    infos["generation"] = int(m[1])
+            elif ligne[:2] in (b"#r", b"#R"):
+                infos["regle"] = ligne[2:].strip().decode("ascii")
+            continue
+        entete = _ENTETE_RLE.match(ligne)
+        if entete is None:
+            if ligne.strip():
+                raise ValueError("Fichier RLE invalide : en-tête 'x = .., y = ..' manquant")
+            continue
+        infos["largeur"], infos["hauteur"] = int(entete[1]), int(entete[2])
+        if entete[3]:
+            infos["regle"] = entete[3].decode("ascii")
+        debut = suivante
+        break
+    else:
+        return
+
+    if position is None:
+        position = (-(infos["largeur"] // 2), -(infos["hauteur"] // 2))
+    x0, y0 = position
+    x = y = 0
+    for m in _JETON_RLE.finditer(donnees, debut):
+        n = int(m[1]) if m[1] else 1
+        etat = m[2]
+        if etat in b"b.":
+            x += n
+        elif etat == b"$":
+            y += n
+            x = 0
+        elif etat == b"!":
+            break
+        else:
+            for i in range(x0 + x, x0 + x + n):
+                yield (i, y0 + y)
+            x += n
+
+
+def ecrire_rle(f, cellules, generation=0, regle=REGLE_VIE, bornes=None):
+    """
+    Écrit les cellules au format RLE, avec leur position exacte ("#CXRLE Pos=..")
+    pour qu'une relecture redonne les mêmes coordonnées.
+    Avec leurs bornes, les cellules doivent déjà venir ligne par ligne (tri par y puis x) :
+    elles sont alors écrites au fil de l'eau, sans liste complète en mémoire.
+    Argument : f (fichier texte ouvert en écriture), cellules (itérable de tuples (x, y)),
+               generation (int), regle (str), bornes (tuple (x_min, y_min, x_max, y_max) ou None)
+    Return : None
+    """
+    if bornes is None:
+        # Tri par ligne puis par colonne : l'ordre de lecture du format
+        points = sorted(cellules, key=lambda c: (c[1], c[0]))
+        if not points:
+            f.write(f"x = 0, y = 0, rule = {regle}\n!\n")
+            return
+        bornes = (min(x for (x, _) in points), points[0][1], max(x for (x, _) in points), points[-1][1])
+    else:
+        points = cellules
+    xmin, ymin, xmax, ymax = bornes
+    f.write(f"#CXRLE Pos={xmin},{ymin} Gen={generation}\n")
+    f.write(f"x = {xmax - xmin + 1}, y = {ymax - ymin + 1}, rule = {regle}\n")
+
+    ligne = []
+    longueur = 0
+
+    def emettre(n, etat):
+        nonlocal longueur
+        jeton = f"{n}{etat}" if n > 1 else etat
+        if longueur + len(jeton) > LARGEUR_LIGNE_RLE:
+            f.write("".join(ligne) + "\n")
+            ligne.clear()
+            longueur = 0
+        ligne.append(jeton)
+        longueur += len(jeton)
+
+    y_courant, x_courant = ymin, xmin
+    serie = 0 # Nombre de cellules vivantes consécutives en attente
+    for (x, y) in points:
+        if y != y_courant or x != x_courant + serie:
+            if serie:
+                emettre(serie, "o")
+                x_courant += serie
+                serie = 0
+            if y != y_courant:
+                emettre(y - y_courant, "$")
+                y_courant, x_courant = y, xmin
+            if x > x_courant:
+                emettre(x - x_courant, "b")
+                x_courant = x
+        serie += 1
+    emettre(serie, "o")
+    f.write("".join(ligne) + "!\n")
+
+
+def lire_enregistrements_macrocell(donnees, infos=None):
+    """
+    Lit les noeuds d'un fichier Macrocell ("[M2]") dans l'ordre du fichier, la racine en dernier.
+    Un enregistrement est soit une feuille 8x8 (tuple de 8 entiers, le bit x de l'entier y
+    valant 1 si la cellule (x, y) est vivante), soit un noeud (niveau, nw, ne, sw, se) dont
+    les enfants sont des numéros de lignes (à partir de 1, 0 = noeud vide).
+    Argument : donnees (bytes ou mmap), infos (dict ou None, reçoit regle et generation)
+    Return : générateur de tuples
+    """
+    infos = {} if infos is None else infos
+    for ligne, _ in _lignes(donnees):
+        ligne = ligne.strip()
+        if not ligne or ligne.startswith(b"[M2]"):
+            continue
+        if ligne.startswith(b"#"):
+            if ligne[:2] in (b"#R", b"#r"):
+                infos["regle"] = ligne[2:].strip().decode("ascii")
+            elif ligne[:2] in (b"#G", b"#g"):
+                infos["generation"] = int(ligne[2:])
+            continue
+        if ligne[:1] in b".*$":
+            lignes = [0] * 8
+            x = y = 0
+            for car in ligne:
+                if car == 0x24: # '$'
+                    y += 1
+                    x = 0
+                else:
+                    if car == 0x2A: # '*'
+                        lignes[y] |= 1 << x
+                    x += 1
+            yield tuple(lignes)
+        else:
+            niveau, nw, ne, sw, se = map(int, ligne.split())
+            if niveau < 4:
+                raise ValueError("Macrocell : seules les feuilles 8x8 (deux états) sont prises en charge")
+            yield (niveau, nw, ne, sw, se)
+
+
+def lire_macrocell(donnees, infos=None):
+    """
+    Lit un motif Macrocell et produit ses cellules. La racine de niveau k couvre
+    le carré [-2^(k-1), 2^(k-1)[ centré sur l'origine (convention de Golly).
+    Argument : donnees (bytes ou mmap), infos (dict ou None)
+    Return : générateur de tuples (x, y)
+    """
+    noeuds = [None]
+    noeuds.extend(lire_enregistrements_macrocell(donnees, infos))
+    if len(noeuds) == 1:
+        return
+    racine = noeuds[-1]
+    m = 1 << ((racine[0] if len(racine) == 5 else 3) - 1)
+    a_visiter = [(len(noeuds) - 1, -m, -m)]
+    while a_visiter:
+        i, x0, y0 = a_visiter.pop()
+        noeud = noeuds[i]
+        if len(noeud) == 8:
+            for y, lignes in enumerate(noeud):
+                x = 0
+                while lignes:
+                    if lignes & 1:
+                        yield (x0 + x, y0 + y)
+                    lignes >>= 1
+                    x += 1
+            continue
+        m = 1 << (noeud[0] - 1)
+        for enfant, dx, dy in zip(noeud[1:], (0, m, 0, m), (0, 0, m, m)):
+            if enfant:
+                a_visiter.append((enfant, x0 + dx, y0 + dy))
+
+
+def enregistrements_depuis_cellules(cellules):
+    """
+    Construit le quadtree Macrocell d'un ensemble de cellules (noeuds identiques partagés),
+    centré sur l'origine, enfants avant parents.
+    Argument : cellules (itérable de tuples (x, y))
+    Return : list de tuples (voir lire_enregistrements_macrocell)
+    """
+    feuilles = {} # (x // 8, y // 8) -> lignes de la feuille
+    etendue = 0
+    for (x, y) in cellules:
+        cle = (x >> 3, y >> 3)
+        lignes = feuilles.get(cle)
+        if lignes is None:
+            lignes = feuilles[cle] = [0] * 8
+        lignes[y & 7] |= 1 << (x & 7)
+        etendue = max(etendue, abs(x), abs(y))
+    return enregistrements_depuis_feuilles(((cle, tuple(lignes)) for cle, lignes in feuilles.items()), etendue)
+
+
+def enregistrements_depuis_feuilles(feuilles, etendue):
+    """
+    Construit le quadtree Macrocell à partir de ses feuilles 8x8, produites dans n'importe quel ordre
+    (un moteur peut les tirer de ses propres blocs sans passer par des tuples de cellules).
+    Argument : feuilles (itérable de ((x // 8, y // 8), tuple de 8 lignes, bit x & 7 de chaque ligne)),
+               etendue (int, plus grande valeur absolue des coordonnées des cellules)
+    Return : list de tuples (voir lire_enregistrements_macrocell)
+    """
+    niveau = 4 # Au moins 16x16 : le décalage de la racine reste un multiple de 8
+    while (1 << (niveau - 1)) <= etendue:
+        niveau += 1
+    decalage = 1 << (niveau - 4) # Demi-côté de la racine, en feuilles
+
+    enregistrements = []
+    index = {} # Enregistrement -> numéro de ligne (les noeuds identiques ne sont écrits qu'une fois)
+
+    def numero(enregistrement):
+        i = index.get(enregistrement)
+        if i is None:
+            enregistrements.append(enregistrement)
+            i = index[enregistrement] = len(enregistrements)
+        return i
+
+    # Clés décalées pour que la racine soit le bloc (0, 0) du dernier niveau
+    blocs = {(bx + decalage, by + decalage): numero(lignes) for (bx, by), lignes in feuilles}
+    if not blocs:
+        return []
+    for n in range(4, niveau + 1):
+        parents = {}
+        for (bx, by), i in blocs.items():
+            parents.setdefault((bx >> 1, by >> 1), [0, 0, 0, 0])[(by & 1) * 2 + (bx & 1)] = i
+        blocs = {cle: numero((n, *enfants)) for cle, enfants in parents.items()}
+    return enregistrements
+
+
+def ecrire_macrocell(f, enregistrements, generation=0, regle=REGLE_VIE):
+    """
+    Écrit un quadtree au format Macrocell (lisible par Golly).
+    Argument : f (fichier texte ouvert en écriture), enregistrements (itérable de tuples,
+               racine en dernier), generation (int), regle (str)
+    Return : None
+    """
+    f.write("[M2] (jeu-de-la-vie)\n")
+    f.write(f"#R {regle}\n")
+    if generation:
+        f.write(f"#G {generation}\n")
+    for enregistrement in enregistrements:
+        if len(enregistrement) == 8:
+            lignes = ["".join("*" if l >> x & 1 else "." for x in range(l.bit_length())) for l in enregistrement]
+            while lignes and not lignes[-1]:
+                lignes.pop()
+            f.write("".join(l + "$" for l in lignes) + "\n")
+        else:
+            f.write(" ".join(map(str, enregistrement)) + "\n")
+
+
+@contextlib.contextmanager
+def ouvrir_donnees(chemin):
+    """
+    Ouvre un fichier en lecture binaire : contenu en mémoire s'il est petit,
+    projection mmap au-delà de SEUIL_MMAP (le système ne charge que les pages lues).
+    Argument : chemin (str)
+    Return : gestionnaire de contexte donnant des bytes ou un mmap
+    """
+    with open(chemin, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= SEUIL_MMAP:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+                yield donnees
+        else:
+            yield f.read()
+
+
+def lire_fichier(chemin, infos=None):
+    """
+    Lit toutes les cellules d'un fichier motif, le format étant déduit de l'extension.
+    Argument : chemin (str), infos (dict ou None, reçoit la règle et la génération si le format les donne)
+    Return : générateur de tuples (x, y)
+    """
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension in (".rle", ".mc"):
+        with ouvrir_donnees(chemin) as donnees:
+            yield from (lire_rle if extension == ".rle" else lire_macrocell)(donnees, infos)
+        return
+    with open(chemin, encoding="utf-8") as f:
+        yield from (lire_cells if extension in (".cells", ".txt") else lire_life106)(f)
+
+
+def charger_fichier(grille, chemin, decalage=None):
+    """
+    Charge un fichier motif dans une grille, en insérant les cellules en bloc.
+    Sans décalage, le contenu du fichier remplace l'univers (génération comprise) ;
+    avec un décalage (dx, dy), le motif est ajouté aux cellules déjà présentes.
+    Un moteur qui sait lire un quadtree (HashLife) reçoit les noeuds Macrocell directement.
+    En remplacement, la règle indiquée par le fichier (en-tête RLE, "#R" Macrocell) devient celle de la grille.
+    Argument : grille (Grille), chemin (str), decalage (tuple (dx, dy) ou None)
+    Return : dict (informations lues : regle, generation, largeur, hauteur)
+    """
+    infos = {}
+    if decalage is None:
+        if chemin.lower().endswith(".mc") and hasattr(grille, "charger_macrocell"):
+            with ouvrir_donnees(chemin) as donnees:
+                grille.charger_macrocell(lire_enregistrements_macrocell(donnees, infos))
+        else:
+            grille.cellules = lire_fichier(chemin, infos)
+        grille.generation = infos.get("generation", 0)
+        if "regle" in infos:
+            grille.regle = infos["regle"]
+    else:
+        dx, dy = decalage
+        grille.cellules.update((x + dx, y + dy) for (x, y) in lire_fichier(chemin, infos))
+    return infos
+
+
+def enregistrer_fichier(grille, chemin):
+    """
+    Sauvegarde l'état courant de la grille (cellules, génération et règle) en RLE ou en Macrocell,
+    selon l'extension, pour pouvoir reprendre le calcul plus tard.
+    Argument : grille (Grille), chemin (str, se terminant par .rle ou .mc)
+    Return : None
+    """
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension not in (".rle", ".mc"):
+        raise ValueError(f"Format de sauvegarde inconnu : {extension} (attendu .rle ou .mc)")
+    with open(chemin, "w", encoding="utf-8", newline="\n") as f:
+        regle = grille.regle.texte
+        if extension == ".rle":
+            if hasattr(grille, "cellules_par_ligne"):
+                # Moteur hors mémoire : cellules produites dans l'ordre du format, tuile par tuile
+                ecrire_rle(f, grille.cellules_par_ligne(), grille.generation, regle, grille.boite_englobante())
+            else:
+                ecrire_rle(f, grille.cellules, grille.generation, regle)
+        elif hasattr(grille, "enregistrements_macrocell"):
+            ecrire_macrocell(f, grille.enregistrements_macrocell(), grille.generation, regle)
+        else:
+            ecrire_macrocell(f, enregistrements_depuis_cellules(grille.cellules), grille.generation, regle)
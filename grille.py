@@ -1,49 +1,509 @@
-import collections
-
-class Grille:
-    def __init__(self):
-        self.cellules = set()
-        self.generation = 0
-
-    def ajouter_ou_supprimer(self, x, y):
-        if (x, y) in self.cellules:
-            self.cellules.remove((x, y))
-        else:
-            self.cellules.add((x, y))
-
-    def evoluer(self):
-        compteur_voisins = collections.defaultdict(int)
-        self.generation +=1
-        offsets = [(-1, -1), (0, -1), (1, -1),
-                   (-1,  0),          (1,  0),
-                   (-1,  1), (0,  1), (1,  1)]
-
-        # --- PHASE A : RECENSEMENT ---
-        for (x, y) in self.cellules:
-            for dx, dy in offsets:
-                # On remplit le dictionnaire
-                compteur_voisins[(x + dx, y + dy)] += 1
-
-        # --- PHASE B : SÉLECTION ---
-        nouvelles_cellules = set()
-
-        # On parcourt toutes les cases qui ont au moins 1 voisin
-        for coord, nb_voisins in compteur_voisins.items():
-            
-            # Règle 1 : Naissance (Une case vide ou pleine avec 3 voisins vit)
-            if nb_voisins == 3:
-                nouvelles_cellules.add(coord)
-            
-            # Règle 2 : Survie (Une case DEJA vivante avec 2 voisins reste en vie)
-            elif nb_voisins == 2 and coord in self.cellules:
-                nouvelles_cellules.add(coord)
-            
-            # Toutes les autres (nb < 2 ou nb > 3) ne sont pas ajoutées
-            # donc elles seront mortes dans la nouvelle grille.
-
-        # On vérifie si le nouvel état est différent de l'ancien
-        a_change = (nouvelles_cellules != self.cellules)
-        
-        self.cellules = nouvelles_cellules
-        
-        return a_change
\ No newline at end of file
+import collections
+import functools
+import itertools
+
+from index_spatial import BoiteEnglobante, IndexTuiles
+from profilage import profileur
+from regles import CONWAY, Regle, compiler_regle
+
+VOISINS = [(-1, -1), (0, -1), (1, -1),
+           (-1,  0),          (1,  0),
+           (-1,  1), (0,  1), (1,  1)]
+VOISINAGE = VOISINS + [(0, 0)] # La case elle-même et ses 8 voisines
+
+# Empreinte du motif : somme des BASE_X^x * BASE_Y^y des cellules vivantes modulo
+# un premier de Mersenne. Comme un hachage de Zobrist, elle se met à jour en O(1)
+# par naissance/mort, et une translation (dx, dy) la multiplie par BASE_X^dx * BASE_Y^dy,
+# ce qui permet de reconnaître un motif déplacé (vaisseaux).
+MODULE_EMPREINTE = (1 << 61) - 1
+BASE_X = 0x9E3779B97F4A7C15 % MODULE_EMPREINTE
+BASE_Y = 0xC2B2AE3D27D4EB4F % MODULE_EMPREINTE
+TAILLE_HISTORIQUE = 1024 # Période maximale détectable
+_versions = itertools.count() # Numéros des états successifs des VueCellules, uniques entre toutes les vues
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _puissance_x(x):
+    return pow(BASE_X, x, MODULE_EMPREINTE)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _puissance_y(y):
+    return pow(BASE_Y, y, MODULE_EMPREINTE)
+
+
+def poids_cellule(x, y):
+    """Contribution d'une cellule vivante à l'empreinte du motif."""
+    return _puissance_x(x) * _puissance_y(y) % MODULE_EMPREINTE
+
+
+class VueCellules(set):
+    """
+    Ensemble de cellules qui prévient son moteur à chaque modification en place.
+    Pour un ajout ou un retrait unitaire, le rappel reçoit la cellule qui a changé
+    d'état ; pour une opération en bloc il reçoit None (tout est à resynchroniser).
+    self.version change à chaque modification : deux lectures de même version voient le même contenu.
+    """
+    def __init__(self, cellules, au_changement):
+        super().__init__(cellules)
+        self._au_changement = au_changement
+        self.version = next(_versions)
+
+    def add(self, cellule):
+        if cellule not in self:
+            set.add(self, cellule)
+            self.version = next(_versions)
+            self._au_changement(cellule)
+
+    def remove(self, cellule):
+        set.remove(self, cellule)
+        self.version = next(_versions)
+        self._au_changement(cellule)
+
+    def discard(self, cellule):
+        if cellule in self:
+            self.remove(cellule)
+
+    def _modifie(methode):
+        def enveloppe(self, *args):
+            resultat = methode(self, *args)
+            self.version = next(_versions)
+            self._au_changement(None)
+            return resultat
+        enveloppe.__name__ = methode.__name__
+        return enveloppe
+
+    pop = _modifie(set.pop)
+    clear = _modifie(set.clear)
+    update = _modifie(set.update)
+    difference_update = _modifie(set.difference_update)
+    intersection_update = _modifie(set.intersection_update)
+    symmetric_difference_update = _modifie(set.symmetric_difference_update)
+    __ior__ = _modifie(set.__ior__)
+    __isub__ = _modifie(set.__isub__)
+    __iand__ = _modifie(set.__iand__)
+    __ixor__ = _modifie(set.__ixor__)
+    del _modifie
+
+
+class Grille:
+    # self.cycle n'est tenu à jour que par Grille.evoluer : les moteurs qui la remplacent le signalent
+    detection_cycles = True
+
+    def __init__(self, mode="incremental", chronologie=None):
+        # "incremental" : ne recalcule que le voisinage des cellules qui ont changé
+        # "reference" : recensement complet à chaque génération (sert de vérification)
+        self.mode = mode
+        # Journal des générations passées (chronologie.Chronologie) pour reculer / sauter
+        self.chronologie = chronologie
+        self._generation = 0
+        self.naissances = set() # Cellules nées à la dernière génération
+        self.morts = set() # Cellules mortes à la dernière génération
+        self.cycle = None # (période, dx, dy) si l'état courant a déjà été vu
+        self._historique = {} # clé invariante par translation -> (génération, ox, oy)
+        self._regle = CONWAY
+        self.cellules = set()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @generation.setter
+    def generation(self, valeur):
+        # Changer le numéro de génération à la main rompt le fil du journal
+        self._generation = valeur
+        self._rompre_chronologie()
+
+    def _rompre_chronologie(self):
+        if self.chronologie is not None:
+            self.chronologie.rompre()
+
+    @property
+    def regle(self):
+        return self._regle
+
+    @regle.setter
+    def regle(self, valeur):
+        # Accepte une Regle déjà compilée ou sa notation ("B36/S23", "HighLife"...)
+        self._regle = valeur if isinstance(valeur, Regle) else compiler_regle(valeur)
+        self._regle_changee()
+
+    def _regle_changee(self):
+        # Sous une autre règle, même les zones figées peuvent bouger : tout est à recalculer
+        self._a_recalculer = True
+        self._oublier_cycles()
+        self._rompre_chronologie()
+
+    @property
+    def cellules(self):
+        return self._vivantes
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._remplacer(valeur)
+        self._empreinte = None # Recalculée à la demande
+        self._index = None # Idem
+        self._boite = None # Idem
+        self._oublier_cycles()
+        self._rompre_chronologie()
+
+    def _remplacer(self, valeur):
+        self._vivantes = VueCellules(valeur, self._cellule_modifiee)
+        self._voisins = collections.defaultdict(int) # Nombre de voisins vivants de chaque case
+        self._changees = set() # Cellules qui ont changé d'état depuis le dernier calcul
+        self._a_recalculer = True
+
+    def _cellule_modifiee(self, cellule):
+        # Une édition à la main rompt tout cycle en cours
+        self._oublier_cycles()
+        self._rompre_chronologie()
+        if cellule is None:
+            self._empreinte = None
+            self._index = None
+            self._boite = None
+        else:
+            if self._empreinte is not None:
+                if cellule in self._vivantes:
+                    self._appliquer_empreinte((cellule,), ())
+                else:
+                    self._appliquer_empreinte((), (cellule,))
+            if self._index is not None:
+                if cellule in self._vivantes:
+                    self._index.ajouter(cellule)
+                else:
+                    self._index.retirer(cellule)
+            if self._boite is not None:
+                if cellule in self._vivantes:
+                    self._boite.ajouter(cellule)
+                else:
+                    self._boite.retirer(cellule)
+
+        # Édition hors évolution : on tient les compteurs à jour au lieu de tout recompter
+        if cellule is None or self._a_recalculer:
+            self._a_recalculer = True
+            return
+        delta = 1 if cellule in self._vivantes else -1
+        self._deplacer_voisins(cellule, delta)
+        self._changees.add(cellule)
+
+    # --- Empreinte et détection de cycles ---
+    def _appliquer_empreinte(self, naissances, morts):
+        h, sx, sy = self._empreinte
+        for (x, y) in naissances:
+            h += poids_cellule(x, y)
+            sx += x
+            sy += y
+        for (x, y) in morts:
+            h -= poids_cellule(x, y)
+            sx -= x
+            sy -= y
+        self._empreinte = (h % MODULE_EMPREINTE, sx, sy)
+
+    def empreinte(self):
+        """
+        Empreinte du motif et sommes des coordonnées, tenues à jour en O(changements).
+        Argument : Aucun
+        Return : tuple (empreinte, somme des x, somme des y)
+        """
+        if self._empreinte is None:
+            self._empreinte = (0, 0, 0)
+            self._appliquer_empreinte(self._vivantes, ())
+        return self._empreinte
+
+    def _cle_cycle(self):
+        # Le motif est ramené à l'origine (ox, oy) = partie entière de son barycentre,
+        # qui se déplace exactement de (dx, dy) quand le motif est translaté
+        h, sx, sy = self.empreinte()
+        n = len(self._vivantes)
+        if not n:
+            return (0, 0, 0, 0), 0, 0
+        ox, rx = divmod(sx, n)
+        oy, ry = divmod(sy, n)
+        h = h * pow(BASE_X, -ox, MODULE_EMPREINTE) * pow(BASE_Y, -oy, MODULE_EMPREINTE) % MODULE_EMPREINTE
+        return (n, rx, ry, h), ox, oy
+
+    def _enregistrer_cycle(self):
+        cle, ox, oy = self._cle_cycle()
+        deja_vu = self._historique.pop(cle, None)
+        if deja_vu is None:
+            self.cycle = None
+        else:
+            generation, ox0, oy0 = deja_vu
+            self.cycle = (self.generation - generation, ox - ox0, oy - oy0)
+        self._historique[cle] = (self.generation, ox, oy)
+        if len(self._historique) > TAILLE_HISTORIQUE:
+            del self._historique[next(iter(self._historique))]
+
+    def _oublier_cycles(self):
+        self._historique.clear()
+        self.cycle = None
+
+    def _deplacer_voisins(self, cellule, delta):
+        x, y = cellule
+        voisins = self._voisins
+        for dx, dy in VOISINS:
+            voisin = (x + dx, y + dy)
+            voisins[voisin] += delta
+            if not voisins[voisin]:
+                del voisins[voisin]
+
+    # --- Index spatial ---
+    def index_spatial(self):
+        """
+        Index des cellules vivantes par tuiles, tenu à jour à chaque génération une fois créé.
+        Les moteurs qui ne tiennent pas naissances et morts le redéfinissent (GrilleSansSuivi).
+        Argument : Aucun
+        Return : IndexTuiles
+        """
+        if self._index is None:
+            self._index = IndexTuiles(self._vivantes)
+        return self._index
+
+    def boite_englobante(self):
+        """
+        Plus petit rectangle contenant les cellules vivantes, tenu à jour à chaque génération une fois demandé.
+        Les moteurs qui ne tiennent pas naissances et morts le redéfinissent (GrilleSansSuivi).
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max) bornes incluses, ou None si la grille est vide
+        """
+        if self._boite is None:
+            self._boite = BoiteEnglobante(self._vivantes)
+        return self._boite.bornes()
+
+    def statistiques(self):
+        """
+        Chiffres de la génération courante, sans parcourir les cellules : population,
+        naissances et morts de la dernière génération, boîte englobante.
+        Argument : Aucun
+        Return : dict (generation, population, naissances, morts, x_min, y_min, x_max, y_max)
+        """
+        x_min, y_min, x_max, y_max = self.boite_englobante() or (None, None, None, None)
+        return {
+            "generation": self.generation,
+            "population": self.population(),
+            "naissances": len(self.naissances),
+            "morts": len(self.morts),
+            "x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max,
+        }
+
+    def ajouter_ou_supprimer(self, x, y):
+        if (x, y) in self.cellules:
+            self.cellules.remove((x, y))
+        else:
+            self.cellules.add((x, y))
+
+    def population(self):
+        return len(self.cellules)
+
+    def evoluer(self):
+        if not self._historique:
+            self._enregistrer_cycle() # État de départ
+        if self.chronologie is not None:
+            self.chronologie.preparer(self._generation, self._vivantes)
+        if self.mode == "reference":
+            a_change = self._evoluer_reference()
+        else:
+            a_change = self._evoluer_incremental()
+        if self._empreinte is not None:
+            self._appliquer_empreinte(self.naissances, self.morts)
+        if self._index is not None:
+            self._index.appliquer(self.naissances, self.morts)
+        if self._boite is not None:
+            self._boite.appliquer(self.naissances, self.morts)
+        self._enregistrer_cycle()
+        if self.chronologie is not None:
+            with profileur.mesurer("journal"):
+                self.chronologie.enregistrer(self._generation, self.naissances, self.morts, self._vivantes)
+        return a_change
+
+    # --- Voyage dans le temps ---
+    def aller_a(self, generation):
+        """
+        Ramène la grille à une génération passée du journal, ou avance jusqu'à une
+        génération future (en rejouant le journal puis en calculant la suite).
+        Argument : generation (int, au moins chronologie.debut)
+        Return : None
+        """
+        chronologie = self.chronologie
+        if chronologie is None:
+            raise ValueError("Aucune chronologie : créer la grille avec Grille(chronologie=Chronologie())")
+        chronologie.preparer(self._generation, self._vivantes) # L'état courant fait partie du journal
+        cible = min(generation, chronologie.fin)
+        if cible != self._generation:
+            cellules = chronologie.etat(cible, (self._generation, self._vivantes))
+            self._remplacer(cellules)
+            self._empreinte = None
+            self._index = None
+            self._boite = None
+            self._oublier_cycles()
+            self._generation = cible
+            self.naissances, self.morts = set(), set()
+        while self._generation < generation:
+            self.evoluer()
+
+    def reculer(self, nb_generations=1):
+        """
+        Revient nb_generations en arrière, sans dépasser le début du journal.
+        Argument : nb_generations (int)
+        Return : bool (False si on était déjà au début du journal)
+        """
+        if self.chronologie is None or self.chronologie.debut is None:
+            return False
+        cible = max(self.chronologie.debut, self._generation - nb_generations)
+        if cible >= self._generation:
+            return False
+        self.aller_a(cible)
+        return True
+
+    def _evoluer_incremental(self):
+        self._generation += 1
+        vivantes = self._vivantes
+        voisins = self._voisins
+
+        # --- PHASE A : RECENSEMENT ---
+        with profileur.mesurer("recensement"):
+            if self._a_recalculer:
+                # Premier calcul (ou grille remplacée) : recensement complet
+                voisins.clear()
+                for (x, y) in vivantes:
+                    for dx, dy in VOISINS:
+                        voisins[(x + dx, y + dy)] += 1
+                candidates = set(voisins)
+                candidates.update(vivantes)
+                self._a_recalculer = False
+            else:
+                # Seules les cases autour d'un changement peuvent changer à leur tour
+                candidates = {(x + dx, y + dy) for (x, y) in self._changees for dx, dy in VOISINAGE}
+
+        # --- PHASE B : SÉLECTION ---
+        with profileur.mesurer("selection"):
+            # Toutes les décisions sont prises avant d'appliquer le moindre changement
+            naissance, survie = self._regle.naissance, self._regle.survie
+            naissances = []
+            morts = []
+            for coord in candidates:
+                if coord in vivantes:
+                    if not survie[voisins.get(coord, 0)]:
+                        morts.append(coord)
+                elif naissance[voisins.get(coord, 0)]:
+                    naissances.append(coord)
+
+        # Application des changements et mise à jour des compteurs de leurs voisins
+        with profileur.mesurer("application"):
+            for coord in naissances:
+                set.add(vivantes, coord)
+                x, y = coord
+                for dx, dy in VOISINS:
+                    voisins[(x + dx, y + dy)] += 1
+            for coord in morts:
+                set.remove(vivantes, coord)
+                x, y = coord
+                for dx, dy in VOISINS:
+                    voisin = (x + dx, y + dy)
+                    voisins[voisin] -= 1
+                    if not voisins[voisin]:
+                        del voisins[voisin]
+
+        self.naissances = set(naissances)
+        self.morts = set(morts)
+        self._changees = self.naissances | self.morts
+        return bool(self._changees)
+
+    def _evoluer_reference(self):
+        compteur_voisins = collections.defaultdict(int)
+        self._generation +=1
+        offsets = [(-1, -1), (0, -1), (1, -1),
+                   (-1,  0),          (1,  0),
+                   (-1,  1), (0,  1), (1,  1)]
+
+        # --- PHASE A : RECENSEMENT ---
+        with profileur.mesurer("recensement"):
+            for (x, y) in self.cellules:
+                for dx, dy in offsets:
+                    # On remplit le dictionnaire
+                    compteur_voisins[(x + dx, y + dy)] += 1
+
+        # --- PHASE B : SÉLECTION ---
+        with profileur.mesurer("selection"):
+            nouvelles_cellules = set()
+            vivantes = self._vivantes
+            naissance, survie = self._regle.naissance, self._regle.survie
+
+            # On parcourt toutes les cases qui ont au moins 1 voisin
+            for coord, nb_voisins in compteur_voisins.items():
+            
+                # Règle 1 : Survie (Une case DEJA vivante reste en vie si la règle l'autorise, ex : 2 ou 3 voisins)
+                if coord in vivantes:
+                    if survie[nb_voisins]:
+                        nouvelles_cellules.add(coord)
+            
+                # Règle 2 : Naissance (Une case vide avec le bon nombre de voisins naît, ex : 3)
+                elif naissance[nb_voisins]:
+                    nouvelles_cellules.add(coord)
+            
+                # Toutes les autres ne sont pas ajoutées
+                # donc elles seront mortes dans la nouvelle grille.
+
+            # Les cellules isolées (0 voisin) ne sont pas dans le dictionnaire
+            if survie[0]:
+                nouvelles_cellules.update(c for c in vivantes if c not in compteur_voisins)
+
+        # On vérifie si le nouvel état est différent de l'ancien
+        a_change = (nouvelles_cellules != self.cellules)
+        self.naissances = nouvelles_cellules - self.cellules
+        self.morts = self.cellules - nouvelles_cellules
+
+        self._remplacer(nouvelles_cellules)
+        
+        return a_change
+
+
+class GrilleSansSuivi(Grille):
+    """
+    Base des moteurs qui remplacent Grille.evoluer et rangent leurs cellules à leur façon :
+    ils ne tiennent ni naissances et morts, ni cycle. Leur propriété cellules est une
+    VueCellules gardée tant que l'état ne change pas ; l'index spatial et la boîte englobante
+    sont remis au niveau une fois par version de cette vue, et non à chaque appel.
+    """
+    detection_cycles = False # evoluer ne tient pas self.cycle à jour
+
+    def __init__(self):
+        self._index = IndexTuiles()
+        self._version_index = None # Version de la vue reportée dans self._index
+        self._boite = None
+        self._version_boite = None
+        super().__init__()
+
+    def index_spatial(self):
+        """
+        Index des cellules vivantes par tuiles, remis au niveau de la vue cellules quand elle a changé.
+        Les tuiles inchangées gardent leur ensemble (IndexTuiles.remplacer) : entre deux copies
+        figées, IndexFige.differences les écarte par identité comme avec Grille.
+        Argument : Aucun
+        Return : IndexTuiles
+        """
+        vue = self.cellules
+        if vue.version != self._version_index:
+            self._index.remplacer(vue)
+            self._version_index = vue.version
+        return self._index
+
+    def boite_englobante(self):
+        """
+        Plus petit rectangle contenant les cellules vivantes, recalculé quand la vue cellules a changé.
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max) bornes incluses, ou None si la grille est vide
+        """
+        vue = self.cellules
+        if vue.version != self._version_boite:
+            self._boite = BoiteEnglobante(vue).bornes()
+            self._version_boite = vue.version
+        return self._boite
+
+    def statistiques(self):
+        """
+        Comme Grille.statistiques, mais naissances et morts valent None : ces moteurs ne les tiennent pas.
+        Argument : Aucun
+        Return : dict (generation, population, naissances, morts, x_min, y_min, x_max, y_max)
+        """
+        return dict(super().statistiques(), naissances=None, morts=None)
@@ -0,0 +1,377 @@
+from grille import GrilleSansSuivi, VueCellules
+
+
+class Noeud:
+    """
+    Noeud du quadtree HashLife. Chaque noeud est unique (hash-consing) :
+    deux régions identiques partagent le même objet, ce qui permet de
+    mémoriser leur évolution une seule fois.
+    """
+    __slots__ = ("niveau", "nw", "ne", "sw", "se", "population", "resultats")
+
+    def __init__(self, niveau, nw, ne, sw, se, population):
+        self.niveau = niveau # Un noeud de niveau k couvre un carré de 2^k x 2^k cellules
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.population = population
+        self.resultats = {} # j -> centre du noeud après 2^j générations
+
+
+# Les deux feuilles (niveau 0) sont partagées par tous les arbres
+MORT = Noeud(0, None, None, None, None, 0)
+VIVANT = Noeud(0, None, None, None, None, 1)
+
+
+class GrilleHashLife(GrilleSansSuivi):
+    """
+    Moteur HashLife : même interface que Grille, mais l'univers est stocké dans
+    un quadtree à noeuds uniques et mémorisés. sauter(k) avance de 2^k
+    générations d'un coup, ce qui rend quasi gratuites les longues simulations
+    de motifs réguliers (canons, vaisseaux...).
+    """
+
+    def __init__(self, max_noeuds=500_000):
+        """
+        Initialise un univers vide et le cache de noeuds.
+        Argument : max_noeuds (int, taille du cache au-delà de laquelle on lance un ramasse-miettes)
+        Return : None (Constructeur)
+        """
+        self.max_noeuds = max_noeuds
+        self._seuil_ramassage = max_noeuds # Relevé si l'arbre vivant dépasse à lui seul max_noeuds
+        self._table = {} # (nw, ne, sw, se) -> Noeud unique
+        self._vides = [MORT] # _vides[k] = noeud vide de niveau k
+        self._pile = [] # Noeuds des calculs en cours (un list par appel de _successeur), à garder
+        self._racine = None
+        self._cellules = None
+        super().__init__()
+
+    def _regle_changee(self):
+        # Les évolutions mémorisées ont été calculées avec l'ancienne règle
+        super()._regle_changee()
+        for n in self._table.values():
+            n.resultats.clear()
+
+    # --- Vue ensembliste ---
+    # L'ensemble est une vue reconstruite à la demande et gardée tant que l'arbre ne bouge pas.
+    # Si l'appelant la modifie, c'est elle qui fait foi et l'arbre sera reconstruit.
+    @property
+    def cellules(self):
+        if self._cellules is None:
+            cellules = set()
+            self._lister(self._racine, -(1 << (self._racine.niveau - 1)), -(1 << (self._racine.niveau - 1)), cellules)
+            self._cellules = VueCellules(cellules, self._vue_modifiee)
+        return self._cellules
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._cellules = VueCellules(valeur, self._vue_modifiee)
+        self._racine = None
+
+    def _vue_modifiee(self, cellule=None):
+        # Une vue périmée (antérieure au dernier calcul) ne fait plus foi : on l'ignore
+        if self._cellules is not None:
+            self._racine = None
+
+    def _arbre(self):
+        """
+        Retourne la racine de l'univers, en la reconstruisant depuis l'ensemble si besoin.
+        Argument : Aucun
+        Return : Noeud
+        """
+        if self._racine is None:
+            self._racine = self._construire_depuis(self._cellules)
+        return self._racine
+
+    # --- Construction des noeuds ---
+    def _noeud(self, nw, ne, sw, se):
+        """
+        Retourne l'unique noeud ayant ces quatre enfants (création si absent du cache).
+        Argument : nw, ne, sw, se (Noeud, de même niveau)
+        Return : Noeud
+        """
+        cle = (nw, ne, sw, se)
+        noeud = self._table.get(cle)
+        if noeud is None:
+            noeud = Noeud(nw.niveau + 1, nw, ne, sw, se,
+                          nw.population + ne.population + sw.population + se.population)
+            self._table[cle] = noeud
+        return noeud
+
+    def _vide(self, niveau):
+        """
+        Retourne le noeud vide du niveau demandé.
+        Argument : niveau (int)
+        Return : Noeud
+        """
+        while len(self._vides) <= niveau:
+            v = self._vides[-1]
+            self._vides.append(self._noeud(v, v, v, v))
+        return self._vides[niveau]
+
+    def _construire_depuis(self, cellules):
+        """
+        Construit le plus petit arbre centré sur (0,0) contenant toutes les cellules.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : Noeud
+        """
+        points = list(cellules)
+        etendue = max((max(abs(x), abs(y)) for (x, y) in points), default=0)
+        niveau = 3
+        while (1 << (niveau - 1)) <= etendue:
+            niveau += 1
+        m = 1 << (niveau - 1)
+        return self._construire(points, niveau, -m, -m)
+
+    def _construire(self, points, niveau, x0, y0):
+        """
+        Construit récursivement le noeud couvrant le carré de coin (x0, y0).
+        Argument : points (list de tuples), niveau (int), x0 (int), y0 (int)
+        Return : Noeud
+        """
+        if not points:
+            return self._vide(niveau)
+        if niveau == 0:
+            return VIVANT
+        m = 1 << (niveau - 1)
+        cx, cy = x0 + m, y0 + m
+        nw, ne, sw, se = [], [], [], []
+        for p in points:
+            if p[1] < cy:
+                (nw if p[0] < cx else ne).append(p)
+            else:
+                (sw if p[0] < cx else se).append(p)
+        return self._noeud(self._construire(nw, niveau - 1, x0, y0),
+                           self._construire(ne, niveau - 1, cx, y0),
+                           self._construire(sw, niveau - 1, x0, cy),
+                           self._construire(se, niveau - 1, cx, cy))
+
+    def _lister(self, noeud, x0, y0, sortie):
+        """
+        Ajoute à sortie les coordonnées des cellules vivantes du noeud de coin (x0, y0).
+        Argument : noeud (Noeud), x0 (int), y0 (int), sortie (set)
+        Return : None
+        """
+        if noeud.population == 0:
+            return
+        if noeud.niveau == 0:
+            sortie.add((x0, y0))
+            return
+        m = 1 << (noeud.niveau - 1)
+        self._lister(noeud.nw, x0, y0, sortie)
+        self._lister(noeud.ne, x0 + m, y0, sortie)
+        self._lister(noeud.sw, x0, y0 + m, sortie)
+        self._lister(noeud.se, x0 + m, y0 + m, sortie)
+
+    # --- Échange au format Macrocell ---
+    def charger_macrocell(self, enregistrements):
+        """
+        Remplace l'univers par un quadtree Macrocell, sans passer par l'ensemble des cellules :
+        les motifs très répétitifs (métacellules) restent compacts.
+        Argument : enregistrements (itérable de tuples, voir formats.lire_enregistrements_macrocell)
+        Return : None
+        """
+        noeuds = [None] # noeuds[i] = Noeud de la ligne i ; 0 = vide (son niveau dépend du parent)
+        for e in enregistrements:
+            if len(e) == 8:
+                points = [(x, y) for y, lignes in enumerate(e) for x in range(8) if lignes >> x & 1]
+                noeuds.append(self._construire(points, 3, 0, 0))
+            else:
+                niveau = e[0]
+                enfants = [noeuds[i] if i else self._vide(niveau - 1) for i in e[1:]]
+                noeuds.append(self._noeud(*enfants))
+        self._racine = noeuds[-1] if len(noeuds) > 1 else self._vide(3)
+        self._cellules = None
+
+    def enregistrements_macrocell(self):
+        """
+        Décrit l'arbre courant au format Macrocell (feuilles 8x8, enfants avant parents).
+        Argument : Aucun
+        Return : list de tuples (voir formats.lire_enregistrements_macrocell)
+        """
+        racine = self._arbre()
+        while racine.niveau < 4:
+            racine = self._agrandir(racine)
+        enregistrements = []
+        index = {} # Noeud -> numéro de ligne
+
+        def visiter(n):
+            if n.population == 0:
+                return 0
+            i = index.get(n)
+            if i is None:
+                if n.niveau == 3:
+                    cellules = set()
+                    self._lister(n, 0, 0, cellules)
+                    lignes = [0] * 8
+                    for (x, y) in cellules:
+                        lignes[y] |= 1 << x
+                    enregistrements.append(tuple(lignes))
+                else:
+                    enfants = [visiter(c) for c in (n.nw, n.ne, n.sw, n.se)]
+                    enregistrements.append((n.niveau, *enfants))
+                i = index[n] = len(enregistrements)
+            return i
+
+        visiter(racine)
+        return enregistrements
+
+    # --- Manipulation de l'arbre ---
+    def _centre(self, n):
+        """Noeud de niveau k-1 formé par le centre du noeud n."""
+        return self._noeud(n.nw.se, n.ne.sw, n.sw.ne, n.se.nw)
+
+    def _agrandir(self, n):
+        """Entoure n de vide : noeud de niveau k+1 ayant n pour centre."""
+        e = self._vide(n.niveau - 1)
+        return self._noeud(self._noeud(e, e, e, n.nw), self._noeud(e, e, n.ne, e),
+                           self._noeud(e, n.sw, e, e), self._noeud(n.se, e, e, e))
+
+    def _reduire(self, n):
+        """Retire les bordures vides : forme canonique servant aux comparaisons."""
+        while n.niveau > 3:
+            c = self._centre(n)
+            if c.population != n.population:
+                break
+            n = c
+        return n
+
+    def _evoluer_4x4(self, n):
+        """
+        Cas de base : calcule le centre 2x2 d'un noeud 4x4 après une génération.
+        Argument : n (Noeud de niveau 2)
+        Return : Noeud de niveau 1
+        """
+        lignes = (
+            (n.nw.nw, n.nw.ne, n.ne.nw, n.ne.ne),
+            (n.nw.sw, n.nw.se, n.ne.sw, n.ne.se),
+            (n.sw.nw, n.sw.ne, n.se.nw, n.se.ne),
+            (n.sw.sw, n.sw.se, n.se.sw, n.se.se),
+        )
+        bits = [[f.population for f in ligne] for ligne in lignes]
+        masque = self.regle.masque # Bit (9 * vivante + nb_voisins) = état suivant
+        nouveaux = []
+        for y in (1, 2):
+            for x in (1, 2):
+                nb_voisins = sum(bits[y + dy][x + dx] for dy in (-1, 0, 1) for dx in (-1, 0, 1)) - bits[y][x]
+                vivante = masque >> (nb_voisins + 9 * bits[y][x]) & 1
+                nouveaux.append(VIVANT if vivante else MORT)
+        return self._noeud(*nouveaux)
+
+    def _successeur(self, n, j):
+        """
+        Calcule le centre de n (niveau k-1) après 2^j générations, avec j <= k-2.
+        Argument : n (Noeud de niveau k >= 2), j (int)
+        Return : Noeud
+        """
+        if n.population == 0:
+            return n.nw
+        j = min(j, n.niveau - 2)
+        resultat = n.resultats.get(j)
+        if resultat is not None:
+            return resultat
+
+        if n.niveau == 2:
+            resultat = self._evoluer_4x4(n)
+        else:
+            nw, ne, sw, se = n.nw, n.ne, n.sw, n.se
+            noeud = self._noeud
+            # Les 9 sous-carrés de niveau k-1 qui se chevauchent, puis leurs résultats : tous
+            # restent dans gardes pour survivre à un ramasse-miettes lancé plus bas dans la récursion
+            gardes = [n, nw, noeud(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                      noeud(nw.sw, nw.se, sw.nw, sw.ne), noeud(nw.se, ne.sw, sw.ne, se.nw),
+                      noeud(ne.sw, ne.se, se.nw, se.ne), sw, noeud(sw.ne, se.nw, sw.se, se.sw), se]
+            self._pile.append(gardes)
+            if len(self._table) > self._seuil_ramassage:
+                self._ramasser()
+            for carre in gardes[1:10]:
+                gardes.append(self._successeur(carre, j))
+            c00, c01, c02, c10, c11, c12, c20, c21, c22 = gardes[10:]
+
+            if j < n.niveau - 2:
+                # Saut partiel : les 9 résultats sont déjà à la bonne génération
+                resultat = noeud(noeud(c00.se, c01.sw, c10.ne, c11.nw),
+                                 noeud(c01.se, c02.sw, c11.ne, c12.nw),
+                                 noeud(c10.se, c11.sw, c20.ne, c21.nw),
+                                 noeud(c11.se, c12.sw, c21.ne, c22.nw))
+            else:
+                # Saut complet : deuxième moitié du trajet sur les 4 quadrants
+                gardes += [noeud(c00, c01, c10, c11), noeud(c01, c02, c11, c12),
+                           noeud(c10, c11, c20, c21), noeud(c11, c12, c21, c22)]
+                for quadrant in gardes[19:23]:
+                    gardes.append(self._successeur(quadrant, j))
+                resultat = noeud(*gardes[23:])
+            self._pile.pop()
+
+        n.resultats[j] = resultat
+        return resultat
+
+    # --- Ramasse-miettes ---
+    def _ramasser(self):
+        """
+        Vide le cache de tous les noeuds inaccessibles depuis la racine et depuis les calculs
+        en cours. Les noeuds gardés conservent ceux de leurs résultats mémorisés qui ont survécu.
+        Argument : Aucun
+        Return : None
+        """
+        vivants = {}
+        a_visiter = list(self._vides[1:])
+        if self._racine is not None:
+            a_visiter.append(self._racine)
+        for gardes in self._pile:
+            a_visiter.extend(gardes)
+        while a_visiter:
+            n = a_visiter.pop()
+            if n.niveau == 0:
+                continue
+            cle = (n.nw, n.ne, n.sw, n.se)
+            if cle in vivants:
+                continue
+            vivants[cle] = n
+            a_visiter.extend(cle)
+        for n in vivants.values():
+            perimes = [j for j, r in n.resultats.items()
+                       if r.niveau and vivants.get((r.nw, r.ne, r.sw, r.se)) is not r]
+            for j in perimes:
+                del n.resultats[j]
+        self._table = vivants
+        # Si l'arbre vivant remplit déjà presque tout le cache, on le laisse grandir
+        # plutôt que de relancer un ramassage à chaque génération
+        self._seuil_ramassage = max(self.max_noeuds, 2 * len(vivants))
+
+    # --- Interface publique ---
+    def sauter(self, k):
+        """
+        Fait avancer l'univers de 2^k générations d'un coup.
+        Argument : k (int >= 0)
+        Return : bool (True si l'état a changé)
+        """
+        avant = self._arbre()
+        self._pile.clear() # Reste d'un calcul interrompu
+        racine = avant
+        # La racine doit être assez grande pour le saut, et le motif doit tenir
+        # dans son quart central pour ne pas sortir pendant 2^k générations
+        while racine.niveau < k + 2 or self._centre(racine).population != racine.population:
+            racine = self._agrandir(racine)
+        racine = self._successeur(self._agrandir(racine), k)
+
+        self._racine = self._reduire(racine)
+        self._cellules = None
+        self.generation += 1 << k
+        return self._racine is not self._reduire(avant)
+
+    def evoluer(self):
+        """
+        Calcule la génération suivante (équivalent de Grille.evoluer).
+        Argument : Aucun
+        Return : bool (True si l'état a changé)
+        """
+        return self.sauter(0)
+
+    def population(self):
+        """
+        Nombre de cellules vivantes, lu directement à la racine (sans matérialiser l'ensemble).
+        Argument : Aucun
+        Return : int
+        """
+        if self._cellules is not None:
+            return len(self._cellules)
+        return self._racine.population
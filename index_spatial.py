@@ -0,0 +1,294 @@
+"""
+Index spatial des cellules vivantes : les cellules sont rangées par tuiles carrées de
+TAILLE_TUILE cases, ce qui permet de lister celles d'un rectangle (la zone visible à l'écran)
+en un temps proportionnel aux cellules de ce rectangle, et non à toute la population.
+La boîte englobante du motif est tenue à jour de la même façon, changement par changement.
+"""
+import collections
+import heapq
+import itertools
+
+BITS_TUILE = 6
+TAILLE_TUILE = 1 << BITS_TUILE # 64 x 64 cases par tuile
+_VIDE = frozenset()
+RECONSTRUCTION_TAS = 64 # Entrées périmées tolérées dans un tas au-delà du double des entrées utiles
+
+
+def tuile(x, y):
+    """Coordonnées de la tuile contenant la case (x, y)."""
+    return (x >> BITS_TUILE, y >> BITS_TUILE)
+
+
+class _Tuiles:
+    """Requêtes communes aux index modifiable et figé (self._tuiles : tuile -> ensemble de cellules)."""
+
+    def __len__(self):
+        return self._population
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._tuiles.values())
+
+    def __contains__(self, cellule):
+        cellules = self._tuiles.get(tuile(*cellule))
+        return cellules is not None and cellule in cellules
+
+    def dans(self, x_min, y_min, x_max, y_max):
+        """
+        Liste les cellules vivantes du rectangle [x_min, x_max] x [y_min, y_max] (bornes incluses).
+        Seules les tuiles qui touchent le rectangle sont examinées, et seules celles
+        du bord sont filtrées cellule par cellule.
+        Argument : x_min, y_min, x_max, y_max (int)
+        Return : list de tuples (x, y)
+        """
+        tx0, ty0 = tuile(x_min, y_min)
+        tx1, ty1 = tuile(x_max, y_max)
+        tuiles = self._tuiles
+        resultat = []
+        for t in self._tuiles_dans(tx0, ty0, tx1, ty1):
+            cellules = tuiles[t]
+            if tx0 < t[0] < tx1 and ty0 < t[1] < ty1:
+                resultat.extend(cellules) # Tuile intérieure : entièrement dans le rectangle
+            else:
+                resultat.extend((x, y) for (x, y) in cellules if x_min <= x <= x_max and y_min <= y <= y_max)
+        return resultat
+
+    def differences(self, ancien, x_min, y_min, x_max, y_max):
+        """
+        Cellules apparues et disparues dans un rectangle depuis un index plus ancien.
+        Entre deux copies figées, une tuile inchangée est le même frozenset : elle est
+        écartée par un simple test d'identité, sans regarder ses cellules.
+        Argument : ancien (IndexFige ou IndexTuiles), x_min, y_min, x_max, y_max (int, bornes incluses)
+        Return : tuple (list des apparues, list des disparues)
+        """
+        tx0, ty0 = tuile(x_min, y_min)
+        tx1, ty1 = tuile(x_max, y_max)
+        cles = set(self._tuiles_dans(tx0, ty0, tx1, ty1))
+        cles.update(ancien._tuiles_dans(tx0, ty0, tx1, ty1))
+        apparues, disparues = [], []
+        for t in cles:
+            avant = ancien._tuiles.get(t, _VIDE)
+            apres = self._tuiles.get(t, _VIDE)
+            if avant is apres:
+                continue
+            apparues.extend((x, y) for (x, y) in apres - avant if x_min <= x <= x_max and y_min <= y <= y_max)
+            disparues.extend((x, y) for (x, y) in avant - apres if x_min <= x <= x_max and y_min <= y <= y_max)
+        return apparues, disparues
+
+    def _tuiles_dans(self, tx0, ty0, tx1, ty1):
+        """Clés des tuiles occupées entre les tuiles (tx0, ty0) et (tx1, ty1) incluses."""
+        tuiles = self._tuiles
+        if tx0 > tx1 or ty0 > ty1:
+            return []
+        if (tx1 - tx0 + 1) * (ty1 - ty0 + 1) <= len(tuiles):
+            return [t for t in itertools.product(range(tx0, tx1 + 1), range(ty0, ty1 + 1)) if t in tuiles]
+        # Vue très dézoomée : moins de tuiles occupées que de tuiles dans le rectangle
+        return [t for t in tuiles if tx0 <= t[0] <= tx1 and ty0 <= t[1] <= ty1]
+
+
+class IndexFige(_Tuiles):
+    """
+    Copie immuable d'un IndexTuiles, lisible sans verrou depuis un autre fil.
+    S'utilise comme un ensemble de cellules (len, in, itération).
+    """
+
+    def __init__(self, tuiles, population):
+        self._tuiles = tuiles # tuile -> frozenset, partagés avec les copies précédentes
+        self._population = population
+
+
+class IndexTuiles(_Tuiles):
+    """
+    Index modifiable, tenu à jour naissance par naissance et mort par mort.
+    """
+
+    def __init__(self, cellules=()):
+        """
+        Range les cellules données par tuiles.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : None (Constructeur)
+        """
+        self._tuiles = {}
+        self._population = 0
+        self._figees = {} # Dernière copie figée de chaque tuile
+        self._sales = set() # Tuiles modifiées depuis la dernière copie figée
+        self.appliquer(cellules, ())
+
+    def ajouter(self, cellule):
+        t = tuile(*cellule)
+        cellules = self._tuiles.get(t)
+        if cellules is None:
+            cellules = self._tuiles[t] = set()
+        if cellule not in cellules:
+            cellules.add(cellule)
+            self._population += 1
+            self._sales.add(t)
+
+    def retirer(self, cellule):
+        t = tuile(*cellule)
+        cellules = self._tuiles.get(t)
+        if cellules is not None and cellule in cellules:
+            cellules.remove(cellule)
+            self._population -= 1
+            self._sales.add(t)
+            if not cellules:
+                del self._tuiles[t]
+
+    def appliquer(self, naissances, morts):
+        """
+        Reporte les changements d'une génération.
+        Argument : naissances (itérable de tuples), morts (itérable de tuples)
+        Return : None
+        """
+        # Version déroulée de retirer / ajouter : appelée à chaque génération
+        tuiles, sales = self._tuiles, self._sales
+        population = self._population
+        for cellule in morts:
+            t = (cellule[0] >> BITS_TUILE, cellule[1] >> BITS_TUILE)
+            cellules = tuiles.get(t)
+            if cellules is not None and cellule in cellules:
+                cellules.remove(cellule)
+                population -= 1
+                sales.add(t)
+                if not cellules:
+                    del tuiles[t]
+        for cellule in naissances:
+            t = (cellule[0] >> BITS_TUILE, cellule[1] >> BITS_TUILE)
+            cellules = tuiles.get(t)
+            if cellules is None:
+                cellules = tuiles[t] = set()
+            if cellule not in cellules:
+                cellules.add(cellule)
+                population += 1
+                sales.add(t)
+        self._population = population
+
+    def remplacer(self, cellules):
+        """
+        Remplace tout le contenu de l'index, pour les moteurs qui ne fournissent pas naissances
+        et morts. Une tuile dont les cellules n'ont pas changé garde son ensemble : sa copie
+        figée reste la même et differences l'écarte toujours par un test d'identité.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : None
+        """
+        nouvelles = collections.defaultdict(set)
+        for cellule in cellules:
+            nouvelles[(cellule[0] >> BITS_TUILE, cellule[1] >> BITS_TUILE)].add(cellule)
+        tuiles, sales = self._tuiles, self._sales
+        for t in tuiles.keys() - nouvelles.keys():
+            del tuiles[t]
+            sales.add(t)
+        for t, cellules_tuile in nouvelles.items():
+            if tuiles.get(t) != cellules_tuile:
+                tuiles[t] = cellules_tuile
+                sales.add(t)
+        self._population = sum(len(c) for c in tuiles.values())
+
+    def figer(self):
+        """
+        Copie immuable de l'index. Seules les tuiles modifiées depuis la copie précédente
+        sont recopiées : le coût suit les changements et le nombre de tuiles, pas la population.
+        Argument : Aucun
+        Return : IndexFige
+        """
+        figees = self._figees
+        for t in self._sales:
+            cellules = self._tuiles.get(t)
+            if cellules is None:
+                figees.pop(t, None)
+            else:
+                figees[t] = frozenset(cellules)
+        self._sales.clear()
+        return IndexFige(dict(figees), self._population)
+
+
+class _Axe:
+    """
+    Nombre de cellules par colonne (ou par ligne) et tas des colonnes occupées, l'un pour
+    le minimum, l'autre pour le maximum. Une colonne qui se vide reste dans les tas ; elle
+    n'en sort que lorsqu'elle arrive au sommet (suppression paresseuse), et les tas sont
+    reconstruits quand les entrées périmées deviennent majoritaires.
+    """
+
+    def __init__(self, valeurs=()):
+        self.comptes = collections.Counter(valeurs)
+        self._reconstruire()
+
+    def _reconstruire(self):
+        self._bas = list(self.comptes)
+        self._haut = [-v for v in self.comptes]
+        heapq.heapify(self._bas)
+        heapq.heapify(self._haut)
+
+    def ajouter(self, v):
+        n = self.comptes[v]
+        self.comptes[v] = n + 1
+        if not n:
+            heapq.heappush(self._bas, v)
+            heapq.heappush(self._haut, -v)
+            # Les deux tas se purgent chacun par leur sommet : un motif qui dérive vers les grandes
+            # valeurs ne vide jamais le tas du maximum, il faut donc surveiller les deux
+            if max(len(self._bas), len(self._haut)) > 2 * len(self.comptes) + RECONSTRUCTION_TAS:
+                self._reconstruire()
+
+    def retirer(self, v):
+        n = self.comptes[v] - 1
+        if n:
+            self.comptes[v] = n
+        else:
+            del self.comptes[v]
+
+    def bornes(self):
+        """Plus petite et plus grande valeur occupées (l'axe ne doit pas être vide)."""
+        comptes, bas, haut = self.comptes, self._bas, self._haut
+        while bas[0] not in comptes:
+            heapq.heappop(bas)
+        while -haut[0] not in comptes:
+            heapq.heappop(haut)
+        return bas[0], -haut[0]
+
+
+class BoiteEnglobante:
+    """
+    Plus petit rectangle contenant les cellules vivantes, tenu à jour naissance par naissance
+    et mort par mort. La mort d'une cellule du bord ne force aucun parcours : la nouvelle borne
+    est lue au sommet d'un tas, en O(log n) amorti par changement.
+    """
+
+    def __init__(self, cellules=()):
+        """
+        Argument : cellules (ensemble de tuples (x, y), parcouru deux fois)
+        Return : None (Constructeur)
+        """
+        self._x = _Axe(x for (x, _) in cellules)
+        self._y = _Axe(y for (_, y) in cellules)
+
+    def ajouter(self, cellule):
+        self._x.ajouter(cellule[0])
+        self._y.ajouter(cellule[1])
+
+    def retirer(self, cellule):
+        self._x.retirer(cellule[0])
+        self._y.retirer(cellule[1])
+
+    def appliquer(self, naissances, morts):
+        """
+        Reporte les changements d'une génération.
+        Argument : naissances (itérable de tuples), morts (itérable de tuples)
+        Return : None
+        """
+        for cellule in morts:
+            self.retirer(cellule)
+        for cellule in naissances:
+            self.ajouter(cellule)
+
+    def bornes(self):
+        """
+        Bornes incluses du motif.
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max), ou None s'il n'y a aucune cellule
+        """
+        if not self._x.comptes:
+            return None
+        x_min, x_max = self._x.bornes()
+        y_min, y_max = self._y.bornes()
+        return (x_min, y_min, x_max, y_max)
@@ -1,35 +1,43 @@
+import argparse
+import math
+import os
 import pygame
 import sys
-from grille import Grille
+from formats import EXTENSIONS, charger_fichier, enregistrer_fichier
+from chronologie import Chronologie
+from motifs import MOTIFS
+from moteurs import MOTEURS, creer_grille
+from profilage import profileur
+from regles import REGLES_CONNUES
+from releve import Releve
+from rendu import (BLANC, GRIS_CLAIR, GRIS_FONCE, NOIR, TAILLE_CELLULE_MAX, TAILLE_CELLULE_MIN, dessiner_cellules,
+                   dessiner_grillage, rectangle_visible, zoomer_autour)
+from simulation import Simulateur
+
+try:
+    import numpy as np # Optionnel : la vue de densité (dézoom sous 1 pixel par cellule) nécessite numpy
+except ImportError:
+    np = None
 
 # CONSTANTES
 LARGEUR_INIT, HAUTEUR_INIT = 900, 700
 FPS = 60
-
-# Couleurs
-BLANC = (255, 255, 255)
-NOIR = (0, 0, 0)
-GRIS_CLAIR = (230, 230, 230)
-GRIS_FONCE = (50, 50, 50)
+VITESSE_MAX = 11 # Niveau de vitesse sans limite : autant de générations par image que possible
+DOSSIER_FICHIERS = "fichiers" # Motifs (.rle, .mc, .cells...) proposés dans le menu, et sauvegardes
+NB_FICHIERS_MENU = 6
+BUDGET_CHRONOLOGIE = 64 * 1024 * 1024 # Octets de journal (retour en arrière) gardés en mémoire
+SAUT_TEMPS = 100 # Générations parcourues par PAGE PRÉC. / PAGE SUIV.
+SEUIL_RENDU_PARTIEL = 5000 # Au-delà de ce nombre de cellules changées, la scène est redessinée en entier
+HAUTEUR_HUD = 95 # Bandeau du haut de l'écran réservé aux textes du HUD
+MARGE_CADRAGE = 0.9 # Part de l'écran (sous le HUD) occupée par le motif après un cadrage
+PHASES_PROFIL = ["evenements", "update", "grillage", "cellules", "hud", "menu", "flip",
+                 "recensement", "selection", "application", "journal", "publication"] # Ordre de l'overlay F3
+
+# Couleurs (les autres viennent de rendu.py, communes avec spectateur.py)
 BLEU_MENU = (50, 50, 150)
 BOUTON_COULEUR = (100, 100, 200)
 BOUTON_HOVER = (150, 150, 250)
 
-# motifs connus
-MOTIFS = {
-    "Planeur": [(0, -1), (1, 0), (-1, 1), (0, 1), (1, 1)],
-    "Vaisseau (LWSS)": [(1, -1), (4, -1), (0, 0), (0, 1), (4, 1), (0, 2), (1, 2), (2, 2), (3, 2)],
-    "R-Pentomino": [(1, 0), (2, 0), (0, 1), (1, 1), (1, 2)],
-    "Le Gland (Chaos)": [(1, 0), (3, 1), (0, 2), (1, 2), (4, 2), (5, 2), (6, 2)],
-    "Ligne de 10": [(x, 0) for x in range(10)], # Génère une liste de coordonnées horizontales automatiquement
-    "Canon de Gosper": [
-        (0, 4), (0, 5), (1, 4), (1, 5), (10, 4), (10, 5), (10, 6), (11, 3), (11, 7),
-        (12, 2), (12, 8), (13, 2), (13, 8), (14, 5), (15, 3), (15, 7), (16, 4), (16, 5),
-        (16, 6), (17, 5), (20, 2), (20, 3), (20, 4), (21, 2), (21, 3), (21, 4), (22, 1),
-        (22, 5), (24, 0), (24, 1), (24, 5), (24, 6), (34, 2), (34, 3), (35, 2), (35, 3)
-    ]
-}
-
 # classe des boutons
 class Bouton:
     def __init__(self, x, y, w, h, texte, action_callback):
@@ -79,10 +87,10 @@ class Bouton:
 
 # Classe du jeu
 class Jeu:
-    def __init__(self):
+    def __init__(self, moteur="creux", **options):
         """
         Initialise l'environnement Pygame, la fenêtre, les polices et les variables d'état du jeu.
-        Argument : Aucun
+        Argument : moteur (str, clé de MOTEURS), options (arguments du constructeur du moteur)
         Return : None (Constructeur)
         """
         pygame.init()
@@ -96,7 +104,9 @@ class Jeu:
         self.font_titre = pygame.font.Font("assets/font.ttf", 18)
         self.font_info = pygame.font.SysFont("consolas", 14)
         
-        self.grille = Grille()
+        if moteur == "creux": # Seule Grille tient le journal du retour en arrière
+            options["chronologie"] = Chronologie(budget_memoire=BUDGET_CHRONOLOGIE)
+        self.grille = creer_grille(moteur, **options)
         
         # États
         self.en_pause = True
@@ -109,13 +119,29 @@ class Jeu:
         self.SEUIL_STAGNATION = 10 
         
         self.taille_cellule = 20
+        self.suivi_camera = False # Recadre le motif à chaque image (MAJ + F)
+        self.calque_cellules = None # Surface transparente où les cellules sont rastérisées
+        # Rendu partiel : la scène (fond, grillage, cellules) persiste d'une image à l'autre
+        # et seules les cases nées ou mortes sont redessinées, puis envoyées à l'écran
+        self.rendu_partiel = True
+        self.calque_grillage = None # Fond blanc et lignes de la grille, pré-rendus
+        self.cle_grillage = None # Caméra pour laquelle calque_grillage a été dessiné
+        self.scene = None
+        self.camera_scene = None # Caméra de la scène ; si elle change, la scène est redessinée
+        self.instantane_scene = None # Instantané que la scène représente
+        self.zones_hud = [] # Zones de l'écran recouvertes par le HUD à l'image précédente
+        self.zone_profil = None
         self.largeur_ecran = LARGEUR_INIT
         self.hauteur_ecran = HAUTEUR_INIT
         self.recentrer_camera()
 
         self.speed_level = 5 
         self.update_speed_delay() 
-        self.dernier_update = 0
+
+        # Les générations sont calculées dans un fil séparé ; l'affichage lit ses instantanés
+        self.simulation = Simulateur(self.grille, self.SEUIL_STAGNATION)
+        self.simulation.start()
+        self.instantane = self.simulation.instantane()
 
         self.boutons = []
         self.refresh_boutons() 
@@ -127,7 +153,18 @@ class Jeu:
         Return : None (Met à jour self.vitesse_simulation)
         """
         # Plus speed_level est haut, plus le délai est court (donc ça va vite)
-        self.vitesse_simulation = 120 - (self.speed_level * 10)
+        if self.speed_level >= VITESSE_MAX:
+            self.vitesse_simulation = 0 # Aucune attente entre deux générations
+        else:
+            self.vitesse_simulation = 120 - (self.speed_level * 10)
+
+    def libelle_vitesse(self):
+        """
+        Texte du niveau de vitesse pour l'interface.
+        Argument : Aucun
+        Return : str
+        """
+        return "MAX" if self.speed_level >= VITESSE_MAX else str(self.speed_level)
 
     def change_speed(self, delta):
         """
@@ -135,14 +172,14 @@ class Jeu:
         Argument : delta (int, positif ou négatif)
         Return : None
         """
-        # Maintient la vitesse entre 0 et 10
-        self.speed_level = max(0, min(10, self.speed_level + delta))
+        # Maintient la vitesse entre 0 et VITESSE_MAX
+        self.speed_level = max(0, min(VITESSE_MAX, self.speed_level + delta))
         self.update_speed_delay()
 
     # gestion menus et boutons
     def refresh_boutons(self):
         """
-        Recharge la liste des boutons en fonction de la page de menu active (principal ou motifs).
+        Recharge la liste des boutons en fonction de la page de menu active (principal, motifs ou fichiers).
         Argument : Aucun
         Return : None
         """
@@ -150,6 +187,8 @@ class Jeu:
             self.charger_boutons_principal()
         elif self.page_menu == "motifs":
             self.charger_boutons_motifs()
+        elif self.page_menu == "fichiers":
+            self.charger_boutons_fichiers()
 
     def changer_page(self, nom_page):
         """
@@ -172,10 +211,12 @@ class Jeu:
         
         self.boutons = [
             # Lambda permet de retarder l'appel de la fonction jusqu'au clic
+            Bouton(cx - w - 10, cy - 100, w, h, f"Règle : {self.nom_regle()}", self.action_regle_suivante),
             Bouton(cx - w - 10, cy - 40, w, h, "Figures Usuelles >", lambda: self.changer_page("motifs")),
             
             # Actions principales
             Bouton(cx - w - 10, cy + 20, w, h, "Effacer Grille", self.action_clear),
+            Bouton(cx - w - 10, cy + 80, w, h, "Fichiers >", lambda: self.changer_page("fichiers")),
             
             # Vitesse
             Bouton(cx - 100, cy + 160, 40, 40, "-", lambda: self.change_speed(-1)),
@@ -204,6 +245,39 @@ class Jeu:
             btn = Bouton(cx - w//2, y_pos, w, h, nom_motif, lambda v=nom_motif: self.action_load_motif(v))
             self.boutons.append(btn)
 
+    def charger_boutons_fichiers(self):
+        """
+        Crée les boutons de la page fichiers : sauvegarde de l'état courant et liste des
+        motifs présents dans DOSSIER_FICHIERS (les plus récents d'abord).
+        Argument : Aucun
+        Return : None (Remplit self.boutons)
+        """
+        cx = self.largeur_ecran // 2
+        cy = self.hauteur_ecran // 2
+        w, h = 240, 40
+
+        self.boutons = [
+            Bouton(cx - w//2, cy - 170, w, h, "< Retour Menu", lambda: self.changer_page("principal")),
+            Bouton(cx - w//2, cy - 120, w, h, "Sauvegarder (.mc)", self.action_sauvegarder),
+        ]
+
+        y_start = cy - 50
+        for i, nom_fichier in enumerate(self.lister_fichiers()[:NB_FICHIERS_MENU]):
+            y_pos = y_start + (i * 50)
+            btn = Bouton(cx - w//2, y_pos, w, h, nom_fichier, lambda v=nom_fichier: self.action_load_fichier(v))
+            self.boutons.append(btn)
+
+    def lister_fichiers(self):
+        """
+        Liste les fichiers motifs de DOSSIER_FICHIERS, du plus récent au plus ancien.
+        Argument : Aucun
+        Return : list de str (noms de fichiers)
+        """
+        if not os.path.isdir(DOSSIER_FICHIERS):
+            return []
+        noms = [n for n in os.listdir(DOSSIER_FICHIERS) if n.lower().endswith(EXTENSIONS)]
+        return sorted(noms, key=lambda n: os.path.getmtime(os.path.join(DOSSIER_FICHIERS, n)), reverse=True)
+
     # actions
     def action_clear(self):
         """
@@ -214,6 +288,31 @@ class Jeu:
         self.reset_jeu()
         self.en_menu = False # Ferme le menu
 
+    def nom_regle(self):
+        """
+        Nom de la règle active s'il est connu, sinon sa notation B/S.
+        Argument : Aucun
+        Return : str
+        """
+        texte = self.grille.regle.texte
+        for nom, notation in REGLES_CONNUES.items():
+            if notation == texte:
+                return nom
+        return texte
+
+    def action_regle_suivante(self):
+        """
+        Passe à la règle suivante de REGLES_CONNUES (Conway, HighLife, Day & Night...).
+        Argument : Aucun
+        Return : None
+        """
+        notations = list(REGLES_CONNUES.values())
+        texte = self.grille.regle.texte
+        suivante = notations[(notations.index(texte) + 1) % len(notations)] if texte in notations else notations[0]
+        with self.simulation.verrou:
+            self.grille.regle = suivante
+        self.refresh_boutons()
+
     def action_load_motif(self, nom_motif):
         """
         Charge un motif spécifique au centre de l'écran et lance la simulation.
@@ -226,14 +325,65 @@ class Jeu:
         gx, gy = self.ecran_vers_grille(cx_ecran, cy_ecran)
         
         motif = MOTIFS[nom_motif]
-        for (dx, dy) in motif:
-            # Ajoute chaque point du motif par rapport au centre calculé (gx, gy)
-            self.grille.cellules.add((gx + dx, gy + dy))
+        with self.simulation.verrou:
+            for (dx, dy) in motif:
+                # Ajoute chaque point du motif par rapport au centre calculé (gx, gy)
+                self.grille.cellules.add((gx + dx, gy + dy))
+        self.simulation.publier()
         
         self.en_menu = False # Ferme le menu et lance le jeu
         self.page_menu = "principal" 
         self.refresh_boutons()
 
+    def action_load_fichier(self, nom_fichier):
+        """
+        Ajoute le motif d'un fichier au centre de l'écran (insertion en bloc) et ferme le menu.
+        Argument : nom_fichier (str, fichier de DOSSIER_FICHIERS)
+        Return : None
+        """
+        gx, gy = self.ecran_vers_grille(self.largeur_ecran // 2, self.hauteur_ecran // 2)
+        with self.simulation.verrou:
+            charger_fichier(self.grille, os.path.join(DOSSIER_FICHIERS, nom_fichier), (gx, gy))
+        self.simulation.publier()
+
+        self.en_menu = False
+        self.page_menu = "principal"
+        self.refresh_boutons()
+
+    def action_sauvegarder(self):
+        """
+        Sauvegarde l'univers courant au format Macrocell dans DOSSIER_FICHIERS.
+        Argument : Aucun
+        Return : None
+        """
+        os.makedirs(DOSSIER_FICHIERS, exist_ok=True)
+        with self.simulation.verrou:
+            chemin = os.path.join(DOSSIER_FICHIERS, f"sauvegarde_gen{self.grille.generation}.mc")
+            enregistrer_fichier(self.grille, chemin)
+        self.refresh_boutons() # Le nouveau fichier apparaît dans la liste
+
+    def exporter_profil(self, extension):
+        """
+        Écrit la trace du profileur (temps de chaque phase, image par image) dans DOSSIER_FICHIERS.
+        Argument : extension (str, ".csv" ou ".json")
+        Return : None
+        """
+        os.makedirs(DOSSIER_FICHIERS, exist_ok=True)
+        profileur.exporter(os.path.join(DOSSIER_FICHIERS, f"profil_gen{self.grille.generation}{extension}"))
+
+    def voyager(self, generation):
+        """
+        Se place à une génération du journal (retour en arrière) ou la calcule si elle est future.
+        Argument : generation (int)
+        Return : None
+        """
+        if self.grille.chronologie is None:
+            return
+        with self.simulation.verrou:
+            debut = self.grille.chronologie.debut
+            self.grille.aller_a(max(generation, debut if debut is not None else self.grille.generation))
+        self.simulation.publier()
+
     def recentrer_camera(self):
         """
         Réinitialise le zoom et les décalages (offset) pour centrer la vue.
@@ -244,16 +394,61 @@ class Jeu:
         self.offset_x = self.largeur_ecran // 2
         self.offset_y = self.hauteur_ecran // 2
 
+    def cadrer_camera(self):
+        """
+        Cadre tout le motif d'un coup, grâce à la boîte englobante publiée avec l'instantané
+        (tenue à jour par la grille, sans parcourir les cellules). Le zoom reste sur les paliers de rendu.zoom_suivant().
+        Argument : Aucun
+        Return : None
+        """
+        boite = self.instantane.boite
+        if boite is None:
+            self.recentrer_camera()
+            return
+        x_min, y_min, x_max, y_max = boite
+        hauteur_utile = self.hauteur_ecran - HAUTEUR_HUD
+        ajuste = MARGE_CADRAGE * min(self.largeur_ecran / (x_max - x_min + 1), hauteur_utile / (y_max - y_min + 1))
+        if ajuste >= 4:
+            self.taille_cellule = min(TAILLE_CELLULE_MAX, int(ajuste) // 2 * 2)
+        elif np is None: # La vue de densité nécessite numpy
+            self.taille_cellule = 4
+        else:
+            self.taille_cellule = max(TAILLE_CELLULE_MIN, 2.0 ** math.floor(math.log2(ajuste)))
+        t = self.taille_cellule
+        self.offset_x = round(self.largeur_ecran / 2 - (x_min + x_max + 1) / 2 * t)
+        self.offset_y = round(HAUTEUR_HUD + hauteur_utile / 2 - (y_min + y_max + 1) / 2 * t)
+
+    def basculer_releve(self, extension):
+        """
+        Commence ou arrête le relevé des statistiques de chaque génération dans DOSSIER_FICHIERS.
+        Argument : extension (str, ".csv" ou ".json")
+        Return : None
+        """
+        with self.simulation.verrou:
+            releve = self.simulation.releve
+            if releve is None:
+                os.makedirs(DOSSIER_FICHIERS, exist_ok=True)
+                chemin = os.path.join(DOSSIER_FICHIERS, f"statistiques_gen{self.grille.generation}{extension}")
+                self.simulation.releve = Releve(chemin)
+            else:
+                self.simulation.releve = None
+                releve.fermer()
+
     def reset_jeu(self):
         """
         Vide la grille, remet les compteurs à zéro et met le jeu en pause.
         Argument : Aucun
         Return : None
         """
-        self.grille.cellules = set()
-        self.grille.generation = 0
-        self.compteur_stagnation = 0
         self.en_pause = True
+        self.simulation.regler(False, self.vitesse_simulation / 1000)
+        with self.simulation.verrou:
+            self.grille.cellules = set()
+            self.grille.generation = 0
+            self.simulation.compteur_stagnation = 0
+            self.simulation.stagne = False
+        self.simulation.publier()
+        self.compteur_stagnation = 0
         self.recentrer_camera()
 
     def basculer_fullscreen(self):
@@ -296,6 +491,25 @@ class Jeu:
         py = (grille_y * self.taille_cellule) + self.offset_y
         return int(px), int(py)
 
+    def cellules_visibles(self):
+        """
+        Cellules de l'instantané comprises dans la fenêtre, via l'index spatial :
+        le coût suit le nombre de cellules visibles, pas la population totale.
+        Argument : Aucun
+        Return : list de tuples (x, y)
+        """
+        return self.instantane.cellules.dans(*rectangle_visible(
+            self.largeur_ecran, self.hauteur_ecran, self.taille_cellule, self.offset_x, self.offset_y))
+
+    def zoomer(self, sens, position):
+        """
+        Change la taille des cellules (paliers de rendu.zoom_suivant) en gardant fixe la cellule sous la souris.
+        Argument : sens (int, positif pour zoomer, négatif pour dézoomer), position (tuple, pixel de la souris)
+        Return : None
+        """
+        self.taille_cellule, self.offset_x, self.offset_y = zoomer_autour(
+            self.taille_cellule, self.offset_x, self.offset_y, sens, position)
+
     # event
     def gestion_evenements(self):
         """
@@ -307,6 +521,14 @@ class Jeu:
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                self.simulation.arreter()
+                with self.simulation.verrou:
+                    if self.simulation.releve is not None:
+                        self.simulation.releve.fermer() # Termine le tableau JSON
+                    if self.grille.chronologie is not None:
+                        self.grille.chronologie.fermer() # Supprime les segments déplacés sur le disque
+                    if hasattr(self.grille, "fermer"):
+                        self.grille.fermer() # Moteur disque : supprime les fichiers de déversement
                 pygame.quit()
                 sys.exit()
 
@@ -326,6 +548,14 @@ class Jeu:
                 
                 elif event.key == pygame.K_F11:
                     self.basculer_fullscreen()
+                elif event.key == pygame.K_F3:
+                    profileur.activer(not profileur.actif)
+                elif event.key == pygame.K_F5:
+                    self.rendu_partiel = not self.rendu_partiel
+                elif event.key == pygame.K_F4 and profileur.actif:
+                    self.exporter_profil(".json" if event.mod & pygame.KMOD_SHIFT else ".csv")
+                elif event.key == pygame.K_F6:
+                    self.basculer_releve(".json" if event.mod & pygame.KMOD_SHIFT else ".csv")
                 
                 if not self.en_menu:
                     if event.key == pygame.K_SPACE:
@@ -335,6 +565,23 @@ class Jeu:
                         self.reset_jeu()
                     elif event.key == pygame.K_r and self.en_pause:
                         self.recentrer_camera()
+                    elif event.key == pygame.K_f:
+                        if event.mod & pygame.KMOD_SHIFT:
+                            self.suivi_camera = not self.suivi_camera
+                        self.cadrer_camera()
+                    elif event.key == pygame.K_s and self.en_pause:
+                        self.action_sauvegarder()
+                    # Voyage dans le temps (en pause) : une génération, SAUT_TEMPS, ou le début du journal
+                    elif event.key == pygame.K_LEFT and self.en_pause:
+                        self.voyager(self.grille.generation - 1)
+                    elif event.key == pygame.K_RIGHT and self.en_pause:
+                        self.voyager(self.grille.generation + 1)
+                    elif event.key == pygame.K_PAGEDOWN and self.en_pause:
+                        self.voyager(self.grille.generation - SAUT_TEMPS)
+                    elif event.key == pygame.K_PAGEUP and self.en_pause:
+                        self.voyager(self.grille.generation + SAUT_TEMPS)
+                    elif event.key == pygame.K_HOME and self.en_pause:
+                        self.voyager(-1)
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1: # Clic Gauche
@@ -345,14 +592,18 @@ class Jeu:
                         if self.en_pause:
                             # Mode édition : on ajoute/supprime une cellule
                             gx, gy = self.ecran_vers_grille(mx, my)
-                            self.grille.ajouter_ou_supprimer(gx, gy)
+                            with self.simulation.verrou:
+                                self.grille.ajouter_ou_supprimer(gx, gy)
+                            self.simulation.publier()
                         else:
                             # Mode lecture : on active le déplacement de caméra (drag)
                             self.dragging = True
                 elif event.button == 4: # Molette haut (Zoom avant)
-                    self.taille_cellule = min(100, self.taille_cellule + 2)
+                    self.suivi_camera = False
+                    self.zoomer(1, (mx, my))
                 elif event.button == 5: # Molette bas (Zoom arrière)
-                    self.taille_cellule = max(4, self.taille_cellule - 2)
+                    self.suivi_camera = False
+                    self.zoomer(-1, (mx, my))
             
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1: self.dragging = False
@@ -363,47 +614,50 @@ class Jeu:
                         btn.check_hover((mx, my))
                 elif self.dragging and not self.en_pause:
                     dx, dy = event.rel # Récupère le déplacement relatif depuis la dernière frame
+                    self.suivi_camera = False
                     self.offset_x += dx
                     self.offset_y += dy
 
     def update(self):
         """
-        Met à jour la logique du jeu : fait évoluer la grille si le temps est écoulé et gère la stagnation.
+        Transmet l'état (lecture / pause, vitesse) au fil de simulation et gère la stagnation.
         Argument : Aucun
         Return : None
         """
-        if not self.en_pause and not self.en_menu:
-            maintenant = pygame.time.get_ticks()
-            # Système de délai pour contrôler la vitesse indépendamment des FPS
-            if maintenant - self.dernier_update > self.vitesse_simulation:
-                a_bouge = self.grille.evoluer()
-                self.dernier_update = maintenant
-                if not a_bouge:
-                    self.compteur_stagnation += 1
-                    if self.compteur_stagnation >= self.SEUIL_STAGNATION:
-                        self.reset_jeu() # Reset automatique si plus rien ne bouge
-                else:
-                    self.compteur_stagnation = 0
+        if self.simulation.stagne:
+            self.reset_jeu() # Reset automatique si plus rien ne bouge
+        # Le délai contrôle la vitesse indépendamment des FPS (0 = vitesse maximale)
+        self.simulation.regler(not self.en_pause and not self.en_menu, self.vitesse_simulation / 1000)
+        self.compteur_stagnation = self.simulation.compteur_stagnation
+        if self.suivi_camera:
+            self.cadrer_camera()
 
     # affichage
-    def dessiner_grillage(self):
+    def dessiner_grillage(self, cible=None):
         """
         Dessine les lignes verticales et horizontales de la grille visibles à l'écran.
-        Argument : Aucun
+        Argument : cible (pygame.Surface, l'écran par défaut)
         Return : None
         """
-        # calcule uniquement les lignes visibles à l'écran pour économiser des ressources
-        start_col = -self.offset_x // self.taille_cellule
-        end_col = start_col + (self.largeur_ecran // self.taille_cellule) + 2
-        start_row = -self.offset_y // self.taille_cellule
-        end_row = start_row + (self.hauteur_ecran // self.taille_cellule) + 2
+        if cible is None:
+            cible = self.screen
+        dessiner_grillage(cible, self.taille_cellule, self.offset_x, self.offset_y, GRIS_CLAIR)
 
-        for c in range(int(start_col), int(end_col)):
-            x = (c * self.taille_cellule) + self.offset_x
-            pygame.draw.line(self.screen, GRIS_CLAIR, (x, 0), (x, self.hauteur_ecran))
-        for r in range(int(start_row), int(end_row)):
-            y = (r * self.taille_cellule) + self.offset_y
-            pygame.draw.line(self.screen, GRIS_CLAIR, (0, y), (self.largeur_ecran, y))
+    def calque_fond(self):
+        """
+        Fond blanc et grillage, pré-rendus une fois puis réutilisés tant que la taille de l'écran,
+        le zoom et le décalage de la caméra modulo une cellule ne changent pas.
+        Argument : Aucun
+        Return : pygame.Surface
+        """
+        t = self.taille_cellule
+        cle = (self.largeur_ecran, self.hauteur_ecran, t, self.offset_x % t, self.offset_y % t)
+        if self.cle_grillage != cle:
+            self.calque_grillage = pygame.Surface((self.largeur_ecran, self.hauteur_ecran)).convert()
+            self.calque_grillage.fill(BLANC)
+            self.dessiner_grillage(self.calque_grillage)
+            self.cle_grillage = cle
+        return self.calque_grillage
 
     def afficher_hud(self):
         """
@@ -411,20 +665,84 @@ class Jeu:
         Argument : Aucun
         Return : None
         """
-        info_gen = f"Génération: {self.grille.generation}"
+        info_gen = f"Génération: {self.instantane.generation}"
         if self.compteur_stagnation > 0:
             info_gen += f" | Stagnation: {self.compteur_stagnation}/{self.SEUIL_STAGNATION}"
+        if self.instantane.cycle is not None:
+            periode, dx, dy = self.instantane.cycle
+            info_gen += f" | Période: {periode}"
+            if (dx, dy) != (0, 0):
+                info_gen += f" ({dx:+d}, {dy:+d})"
         
         txt_gen = self.font_ui.render(info_gen, True, NOIR)
         # Positionne le texte en haut à droite avec une marge de 10px
         self.screen.blit(txt_gen, (self.largeur_ecran - txt_gen.get_width() - 10, 10))
 
-        txt_speed = self.font_ui.render(f"Vitesse: {self.speed_level}/10", True, GRIS_FONCE)
+        vitesse = self.libelle_vitesse() if self.speed_level >= VITESSE_MAX else f"{self.speed_level}/10"
+        txt_speed = self.font_ui.render(f"Vitesse: {vitesse}", True, GRIS_FONCE)
         self.screen.blit(txt_speed, (self.largeur_ecran - txt_speed.get_width() - 10, 30))
 
+        # Débit simulé et fréquence d'affichage sont indépendants depuis que la simulation a son propre fil
+        debit = f"Gén/s: {self.simulation.generations_par_seconde():.0f} | FPS: {self.clock.get_fps():.0f}"
+        txt_debit = self.font_ui.render(debit, True, GRIS_FONCE)
+        self.screen.blit(txt_debit, (self.largeur_ecran - txt_debit.get_width() - 10, 50))
+
+        chronologie = self.grille.chronologie
+        if chronologie is not None and chronologie.debut is not None:
+            journal = f"Journal: {chronologie.debut} - {chronologie.fin} ({chronologie.octets_memoire // 1024} Ko)"
+            txt_journal = self.font_ui.render(journal, True, GRIS_FONCE)
+            self.screen.blit(txt_journal, (self.largeur_ecran - txt_journal.get_width() - 10, 70))
+
         txt = self.font_ui.render("ECHAP : MENU & OPTIONS", True, GRIS_FONCE)
         self.screen.blit(txt, (10, 10))
 
+        info_pop = f"Population: {len(self.instantane.cellules)}"
+        if self.instantane.boite is not None:
+            x_min, y_min, x_max, y_max = self.instantane.boite
+            info_pop += f" | Étendue: {x_max - x_min + 1} x {y_max - y_min + 1}"
+        if self.suivi_camera:
+            info_pop += " | Suivi"
+        if self.simulation.releve is not None:
+            info_pop += " | Relevé"
+        txt_pop = self.font_ui.render(info_pop, True, GRIS_FONCE)
+        self.screen.blit(txt_pop, (10, 30))
+
+        # Moteur hors mémoire : tuiles gardées en RAM et tuiles déversées sur le disque
+        if hasattr(self.grille, "statistiques_stockage"):
+            stockage = self.grille.statistiques_stockage()
+            info = f"Tuiles: {stockage['residentes']} en mémoire | {stockage['deversees']} sur disque"
+            txt_stockage = self.font_ui.render(info, True, GRIS_FONCE)
+            self.screen.blit(txt_stockage, (10, 50))
+
+    def afficher_profil(self):
+        """
+        Affiche sous le HUD le temps de chaque phase mesurée (moyenne glissante et centiles, en ms).
+        Argument : Aucun
+        Return : None
+        """
+        stats = profileur.statistiques()
+        lignes = [("phase", "moy", "p50", "p95", "p99")]
+        for nom in PHASES_PROFIL + sorted(set(stats) - set(PHASES_PROFIL)):
+            if nom in stats:
+                s = stats[nom]
+                lignes.append((nom, *(f"{s[cle]:.2f}" for cle in ("moyenne", "p50", "p95", "p99"))))
+
+        # Colonnes : le nom aligné à gauche, les durées alignées à droite
+        largeurs = [100, 50, 50, 50, 50]
+        largeur = sum(largeurs) + 10
+        x, y = self.largeur_ecran - largeur - 10, 95
+        fond = pygame.Surface((largeur, 18 * len(lignes) + 6))
+        fond.set_alpha(200)
+        fond.fill(GRIS_CLAIR)
+        self.zone_profil = self.screen.blit(fond, (x, y))
+        for i, ligne in enumerate(lignes):
+            droite = x + 5
+            for j, texte in enumerate(ligne):
+                rendu = self.font_info.render(texte, True, GRIS_FONCE)
+                droite += largeurs[j]
+                gauche = droite - largeurs[j] if j == 0 else droite - rendu.get_width()
+                self.screen.blit(rendu, (gauche, y + 3 + 18 * i))
+
     def afficher_menu(self):
         """
         Dessine l'interface du menu (fond semi-transparent, cadre, titre, boutons, instructions).
@@ -445,7 +763,7 @@ class Jeu:
         pygame.draw.rect(self.screen, NOIR, rect_menu, 3, border_radius=15)
 
         # Titre selon la page
-        titre_txt = "MENU PRINCIPAL" if self.page_menu == "principal" else "FIGURES USUELLES"
+        titre_txt = {"principal": "MENU PRINCIPAL", "motifs": "FIGURES USUELLES", "fichiers": "FICHIERS"}[self.page_menu]
         titre = self.font_titre.render(titre_txt, True, BLANC)
         self.screen.blit(titre, (cx - titre.get_width()//2, rect_menu.y + 20))
 
@@ -456,15 +774,16 @@ class Jeu:
         # page principale
         if self.page_menu == "principal":
             # Indicateurs Vitesse
-            txt_vit = self.font_menu.render(f"Vitesse: {self.speed_level}", True, BLANC)
-            txt_ms = self.font_ui.render(f"({self.vitesse_simulation} ms)", True, GRIS_CLAIR)
+            txt_vit = self.font_menu.render(f"Vitesse: {self.libelle_vitesse()}", True, BLANC)
+            delai = f"({self.vitesse_simulation} ms)" if self.vitesse_simulation else "(sans limite)"
+            txt_ms = self.font_ui.render(delai, True, GRIS_CLAIR)
             self.screen.blit(txt_vit, (cx - txt_vit.get_width()//2, cy + 160))
             self.screen.blit(txt_ms, (cx - txt_ms.get_width()//2, cy + 185))
 
             # Liste des touches (Commandes)
             x_keys = cx + 10
-            y_keys = cy - 80
-            pygame.draw.line(self.screen, BLANC, (cx, cy - 90), (cx, cy + 130), 2) 
+            y_keys = cy - 110
+            pygame.draw.line(self.screen, BLANC, (cx, cy - 120), (cx, cy + 130), 2) 
 
             commandes = [
                 ("SOURIS G", "Dessiner / Bouger"),
@@ -472,6 +791,8 @@ class Jeu:
                 ("ESPACE", "Lecture / Pause"),
                 ("C", "Vider la grille"),
                 ("R", "Recentrer Caméra"),
+                ("S", "Sauvegarder"),
+                ("< >", "Reculer / Avancer"),
                 ("F11", "Plein Écran"),
                 ("ECHAP", "Menu")
             ]
@@ -482,27 +803,121 @@ class Jeu:
                 self.screen.blit(txt_t, (x_keys + 10, y_keys + i*28))
                 self.screen.blit(txt_d, (x_keys + 100, y_keys + i*28))
 
+    def dessiner_cellules(self, cible=None):
+        """
+        Dessine les cellules visibles avec rendu.dessiner_cellules : rastérisation vectorisée
+        si numpy est disponible (densité en dessous d'1 pixel par cellule), sinon un rectangle par cellule.
+        Argument : cible (pygame.Surface, l'écran par défaut)
+        Return : None
+        """
+        if cible is None:
+            cible = self.screen
+        self.calque_cellules = dessiner_cellules(cible, self.cellules_visibles(), self.taille_cellule,
+                                                 self.offset_x, self.offset_y, self.calque_cellules)
+
+    def redessiner_case(self, gx, gy, vivante):
+        """
+        Redessine une seule case de la scène : fond et grillage repris du calque, puis la cellule.
+        Argument : gx, gy (int, coordonnées de grille), vivante (bool)
+        Return : pygame.Rect (zone de l'écran modifiée)
+        """
+        t = self.taille_cellule
+        px, py = self.grille_vers_ecran(gx, gy)
+        zone = pygame.Rect(px, py, math.ceil(t), math.ceil(t))
+        self.scene.blit(self.calque_grillage, zone, zone)
+        if vivante:
+            # Interstice d'un pixel à partir de 3 pixels par cellule, comme le rendu complet
+            pygame.draw.rect(self.scene, NOIR, (px + 1, py + 1, t - 1, t - 1) if t >= 3 else zone)
+        return zone
+
+    def mettre_a_jour_scene(self):
+        """
+        Amène la scène à l'instantané courant : seules les cases visibles nées ou mortes
+        depuis l'image précédente sont redessinées, sauf si la caméra a bougé
+        ou si trop de cases ont changé (la scène est alors redessinée en entier).
+        Argument : Aucun
+        Return : list de pygame.Rect (zones modifiées) ou None si tout l'écran a changé
+        """
+        camera = (self.largeur_ecran, self.hauteur_ecran, self.taille_cellule, self.offset_x, self.offset_y)
+        fond = self.calque_fond()
+        if self.scene is not None and self.camera_scene == camera:
+            ancien, cellules = self.instantane_scene.cellules, self.instantane.cellules
+            if ancien is cellules:
+                return []
+            gx0, gy0 = self.ecran_vers_grille(0, 0)
+            gx1, gy1 = self.ecran_vers_grille(self.largeur_ecran - 1, self.hauteur_ecran - 1)
+            apparues, disparues = cellules.differences(ancien, gx0, gy0, gx1, gy1)
+            if len(apparues) + len(disparues) <= SEUIL_RENDU_PARTIEL:
+                self.instantane_scene = self.instantane
+                return ([self.redessiner_case(gx, gy, False) for (gx, gy) in disparues]
+                        + [self.redessiner_case(gx, gy, True) for (gx, gy) in apparues])
+
+        if self.scene is None or self.scene.get_size() != fond.get_size():
+            self.scene = pygame.Surface(fond.get_size()).convert()
+        self.scene.blit(fond, (0, 0))
+        self.dessiner_cellules(self.scene)
+        self.camera_scene = camera
+        self.instantane_scene = self.instantane
+        return None
+
+    def afficher_partiel(self):
+        """
+        Affichage par zones modifiées : la scène persistante est mise à jour, puis seules
+        ses zones changées et celles du HUD sont recopiées et envoyées à l'écran.
+        Argument : Aucun
+        Return : None
+        """
+        with profileur.mesurer("cellules"):
+            zones = self.mettre_a_jour_scene()
+        if zones is None:
+            self.screen.blit(self.scene, (0, 0))
+            zones = [self.screen.get_rect()]
+        else:
+            for zone in zones:
+                self.screen.blit(self.scene, zone, zone)
+
+        with profileur.mesurer("hud"):
+            # Le HUD de l'image précédente est effacé avec la scène, puis redessiné
+            anciennes = self.zones_hud
+            self.zones_hud = [pygame.Rect(0, 0, self.largeur_ecran, HAUTEUR_HUD)]
+            for zone in anciennes + self.zones_hud:
+                self.screen.blit(self.scene, zone, zone)
+            self.afficher_hud()
+            if profileur.actif:
+                self.afficher_profil()
+                self.zones_hud.append(self.zone_profil)
+            zones.extend(anciennes + self.zones_hud)
+
+        with profileur.mesurer("flip"):
+            pygame.display.update(zones)
+
     def afficher(self):
         """
         Orchestre l'affichage complet : fond, grille, cellules vivantes, HUD et menus.
         Argument : Aucun
         Return : None
         """
-        self.screen.fill(BLANC)
-        self.dessiner_grillage()
+        self.instantane = self.simulation.instantane() # Même état pour toute l'image
+        # Le menu recouvre tout l'écran, et la vue de densité change d'aspect à chaque génération
+        if self.rendu_partiel and not self.en_menu and self.taille_cellule >= 1:
+            self.afficher_partiel()
+            return
+        self.scene = None # À redessiner entièrement au retour du rendu partiel
 
-        for (gx, gy) in self.grille.cellules:
-            px, py = self.grille_vers_ecran(gx, gy)
-            # Ne dessine pas les cellules qui sont hors de l'écran (culling)
-            if px < -self.taille_cellule or px > self.largeur_ecran or py < -self.taille_cellule or py > self.hauteur_ecran:
-                continue
-            rect = pygame.Rect(px + 1, py + 1, self.taille_cellule - 1, self.taille_cellule - 1)
-            pygame.draw.rect(self.screen, NOIR, rect)
+        with profileur.mesurer("grillage"):
+            self.screen.blit(self.calque_fond(), (0, 0))
+        with profileur.mesurer("cellules"):
+            self.dessiner_cellules()
 
-        self.afficher_hud()
-        if self.en_menu: self.afficher_menu()
+        with profileur.mesurer("hud"):
+            self.afficher_hud()
+            if profileur.actif: self.afficher_profil()
+        if self.en_menu:
+            with profileur.mesurer("menu"):
+                self.afficher_menu()
 
-        pygame.display.flip()
+        with profileur.mesurer("flip"):
+            pygame.display.flip()
 
     def run(self):
         """
@@ -511,11 +926,25 @@ class Jeu:
         Return : None
         """
         while True:
-            self.gestion_evenements()
-            self.update()
+            with profileur.mesurer("evenements"):
+                self.gestion_evenements()
+            with profileur.mesurer("update"):
+                self.update()
             self.afficher()
+            profileur.image_terminee()
             self.clock.tick(FPS)
 
 if __name__ == "__main__":
-    jeu = Jeu()
+    parser = argparse.ArgumentParser(description="Jeu de la Vie.")
+    parser.add_argument("--moteur", choices=sorted(MOTEURS), default="creux",
+                        help="moteur d'évolution (le retour en arrière n'existe qu'avec creux)")
+    parser.add_argument("--memoire", type=int, metavar="MO",
+                        help="moteur disque : mémoire maximale des tuiles, au-delà déversées sur le disque")
+    args = parser.parse_args()
+    options = {}
+    if args.memoire is not None:
+        if args.moteur != "disque":
+            parser.error("--memoire ne s'applique qu'au moteur disque")
+        options["memoire_max"] = args.memoire << 20
+    jeu = Jeu(args.moteur, **options)
     jeu.run()
\ No newline at end of file
@@ -0,0 +1,26 @@
+import importlib
+
+# Nom du moteur -> (module, classe). Les modules sont importés à la demande
+# pour que les moteurs NumPy ne soient pas requis quand on ne les utilise pas.
+MOTEURS = {
+    "creux": ("grille", "Grille"),
+    "hashlife": ("hashlife", "GrilleHashLife"),
+    "tuiles": ("tuiles", "GrilleTuiles"),
+    "bits": ("bits", "GrilleBits"),
+    "compact": ("compact", "GrilleCompacte"),
+    "parallele": ("parallele", "GrillePartagee"),
+    "disque": ("disque", "GrilleDisque"),
+}
+
+
+def creer_grille(nom="creux", **options):
+    """
+    Instancie le moteur demandé ; tous exposent la même interface que Grille
+    (cellules, generation, ajouter_ou_supprimer, evoluer).
+    Argument : nom (str, clé de MOTEURS), options (arguments du constructeur)
+    Return : instance de Grille ou d'une de ses sous-classes
+    """
+    if nom not in MOTEURS:
+        raise ValueError(f"Moteur inconnu : {nom} (choix : {', '.join(MOTEURS)})")
+    module, classe = MOTEURS[nom]
+    return getattr(importlib.import_module(module), classe)(**options)
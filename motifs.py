@@ -0,0 +1,14 @@
+# motifs connus
+MOTIFS = {
+    "Planeur": [(0, -1), (1, 0), (-1, 1), (0, 1), (1, 1)],
+    "Vaisseau (LWSS)": [(1, -1), (4, -1), (0, 0), (0, 1), (4, 1), (0, 2), (1, 2), (2, 2), (3, 2)],
+    "R-Pentomino": [(1, 0), (2, 0), (0, 1), (1, 1), (1, 2)],
+    "Le Gland (Chaos)": [(1, 0), (3, 1), (0, 2), (1, 2), (4, 2), (5, 2), (6, 2)],
+    "Ligne de 10": [(x, 0) for x in range(10)], # Génère une liste de coordonnées horizontales automatiquement
+    "Canon de Gosper": [
+        (0, 4), (0, 5), (1, 4), (1, 5), (10, 4), (10, 5), (10, 6), (11, 3), (11, 7),
+        (12, 2), (12, 8), (13, 2), (13, 8), (14, 5), (15, 3), (15, 7), (16, 4), (16, 5),
+        (16, 6), (17, 5), (20, 2), (20, 3), (20, 4), (21, 2), (21, 3), (21, 4), (22, 1),
+        (22, 5), (24, 0), (24, 1), (24, 5), (24, 6), (34, 2), (34, 3), (35, 2), (35, 3)
+    ]
+}
@@ -0,0 +1,417 @@
+import multiprocessing
+import os
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from grille import GrilleSansSuivi, VueCellules
+
+MARGE = 32 # Cellules vides gardées autour du motif ; borne la longueur d'une époque
+DESEQUILIBRE_MAX = 1.5 # Rééquilibrage si une bande dépasse 1.5x la population moyenne
+NEUF = np.uint8(9)
+# Processus lancés par "spawn" : un fork copierait les fils (affichage, simulation) et leurs verrous
+METHODE_DEMARRAGE = "spawn"
+DELAI_BARRIERE = 60.0 # Secondes d'attente des autres bandes avant de déclarer la barrière rompue
+DELAI_SONDAGE = 0.5 # Secondes entre deux vérifications qu'un processus muet est toujours vivant
+
+
+def _bandes(shm, hauteur, largeur):
+    """Vue NumPy (2 tampons x (hauteur + 2 lignes de halo) x largeur) sur un segment partagé."""
+    return np.ndarray((2, hauteur + 2, largeur), dtype=np.uint8, buffer=shm.buf)
+
+
+def _travailleur(conn, barriere):
+    """
+    Boucle d'un processus de calcul : fait évoluer sa bande de lignes et écrit
+    ses lignes de bord dans les halos des bandes voisines à chaque génération.
+    Chaque réponse est ("ok", valeur) ; une erreur (barrière rompue comprise) rompt la
+    barrière pour débloquer les autres bandes, puis est renvoyée au coordinateur.
+    Argument : conn (Connection, commandes du coordinateur), barriere (Barrier partagée)
+    Return : None
+    """
+    segments = []
+    try:
+        _executer(conn, barriere, segments)
+    except Exception as e:
+        barriere.abort()
+        try:
+            conn.send(("erreur", e))
+        except (BrokenPipeError, OSError):
+            pass
+    for shm in segments:
+        shm.close()
+
+
+def _executer(conn, barriere, segments):
+    """Traite les commandes du coordinateur jusqu'à "fin" (voir _travailleur)."""
+    while True:
+        commande, argument = conn.recv()
+        if commande == "fin":
+            break
+
+        if commande == "charger":
+            for shm in segments:
+                shm.close()
+            (nom, hauteur, largeur), haut, bas = argument
+            segments = [shared_memory.SharedMemory(name=nom)]
+            tampons = _bandes(segments[0], hauteur, largeur)
+            voisins = []
+            for voisin, ligne_halo in ((haut, -1), (bas, 0)):
+                if voisin is None:
+                    voisins.append(None)
+                    continue
+                shm = shared_memory.SharedMemory(name=voisin[0])
+                segments.append(shm)
+                voisins.append((_bandes(shm, voisin[1], voisin[2]), ligne_halo))
+            parite = 0
+            conn.send(("ok", None))
+
+        elif commande == "pas":
+            nb_generations, masque = argument
+            masque = np.uint32(masque) # Bit (9 * vivante + nb_voisins) = état suivant
+            a_change = False
+            for _ in range(nb_generations):
+                c = tampons[parite]
+                suivant = tampons[1 - parite]
+                nb_voisins = (c[:-2, :-2] + c[:-2, 1:-1] + c[:-2, 2:]
+                              + c[1:-1, :-2] + c[1:-1, 2:]
+                              + c[2:, :-2] + c[2:, 1:-1] + c[2:, 2:])
+                centre = c[1:-1, 1:-1]
+                nouvelles = (masque >> (nb_voisins + NEUF * centre)).astype(np.uint8) & 1
+                a_change = not np.array_equal(nouvelles, centre)
+                suivant[1:-1, 1:-1] = nouvelles
+
+                # Échange des halos : première ligne -> halo bas du voisin du haut, etc.
+                if voisins[0] is not None:
+                    tampons_voisin, ligne_halo = voisins[0]
+                    tampons_voisin[1 - parite, ligne_halo] = suivant[1]
+                if voisins[1] is not None:
+                    tampons_voisin, ligne_halo = voisins[1]
+                    tampons_voisin[1 - parite, ligne_halo] = suivant[-2]
+                barriere.wait(DELAI_BARRIERE)
+                parite = 1 - parite
+
+            interieur = tampons[parite, 1:-1]
+            conn.send(("ok", (a_change, interieur.sum(axis=1, dtype=np.int64), interieur.any(axis=0))))
+
+
+def _arreter(processus, connexions, segments):
+    """Arrête les processus de calcul et libère la mémoire partagée."""
+    for conn in connexions:
+        try:
+            conn.send(("fin", None))
+        except (BrokenPipeError, OSError):
+            pass
+    for p in processus:
+        p.join(timeout=5)
+        if p.is_alive(): # Bloqué dans un calcul : il ne lira plus sa commande
+            p.terminate()
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+
+class GrillePartagee(GrilleSansSuivi):
+    """
+    Moteur multi-cœurs : le plan est découpé en bandes horizontales, chacune
+    calculée par un processus dans un segment de mémoire partagée. Seules les
+    lignes de bord (halo d'une cellule) sont échangées entre bandes à chaque
+    génération, et les frontières sont redécoupées selon la population quand
+    le motif dérive. Les résultats sont identiques à ceux de Grille.
+    """
+
+    def __init__(self, nb_processus=None):
+        """
+        Initialise un univers vide ; les processus sont lancés au premier calcul.
+        Argument : nb_processus (int, par défaut le nombre de cœurs)
+        Return : None (Constructeur)
+        """
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self._processus = []
+        self._connexions = []
+        self._segments = []
+        self._bornes = None # Lignes de début de chaque bande (+ hauteur totale à la fin)
+        self._x0 = 0
+        self._y0 = 0
+        self._largeur = 0
+        self._parite = 0
+        self._pops_lignes = None
+        self._colonnes = None
+        self._desequilibre_min = 1.0
+        self._vue = None
+        self._perimees = True
+        self._fermeture = None
+        self._barriere = None
+        super().__init__()
+
+    # --- Vue ensembliste ---
+    @property
+    def cellules(self):
+        if self._vue is None:
+            self._vue = VueCellules(self._lister(), self._vue_modifiee)
+        return self._vue
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._vue = VueCellules(valeur, self._vue_modifiee)
+        self._perimees = True
+
+    def _vue_modifiee(self, cellule=None):
+        self._perimees = True
+
+    def _plan(self):
+        """
+        Rassemble les bandes en un seul tableau 0/1 couvrant la région.
+        Argument : Aucun
+        Return : np.ndarray (hauteur, largeur)
+        """
+        morceaux = []
+        for i, shm in enumerate(self._segments):
+            hauteur = self._bornes[i + 1] - self._bornes[i]
+            morceaux.append(_bandes(shm, hauteur, self._largeur)[self._parite, 1:-1])
+        return np.vstack(morceaux)
+
+    def _lister(self):
+        """
+        Liste les coordonnées absolues de toutes les cellules vivantes.
+        Argument : Aucun
+        Return : list de tuples (x, y)
+        """
+        if not self._segments:
+            return []
+        ly, lx = np.nonzero(self._plan())
+        return list(zip((lx + self._x0).tolist(), (ly + self._y0).tolist()))
+
+    # --- Gestion des processus et des bandes ---
+    def _demarrer(self):
+        """
+        Lance les processus de calcul (une seule fois).
+        Argument : Aucun
+        Return : None
+        """
+        # Les processus doivent partager le suivi des segments du coordinateur,
+        # sinon chacun détruit à sa sortie des segments qu'il n'a pas créés
+        resource_tracker.ensure_running()
+        contexte = multiprocessing.get_context(METHODE_DEMARRAGE)
+        # Gardée ici : en "spawn", les processus la retrouvent par son nom pendant leur démarrage
+        self._barriere = contexte.Barrier(self.nb_processus)
+        for _ in range(self.nb_processus):
+            parent, enfant = contexte.Pipe()
+            p = contexte.Process(target=_travailleur, args=(enfant, self._barriere), daemon=True)
+            p.start()
+            self._processus.append(p)
+            self._connexions.append(parent)
+        self._fermeture = weakref.finalize(self, _arreter, self._processus, self._connexions, self._segments)
+
+    def _envoyer(self, i, message):
+        """
+        Envoie une commande au processus i ; s'il est mort, tous les processus sont arrêtés
+        et RuntimeError est levée (voir _recevoir).
+        Argument : i (int, numéro de la bande), message (tuple (commande, argument))
+        Return : None
+        """
+        try:
+            self._connexions[i].send(message)
+        except OSError:
+            p = self._processus[i]
+            self._abandonner()
+            raise RuntimeError(f"Le processus de calcul de la bande {i} s'est arrêté (code {p.exitcode})") from None
+
+    def _recevoir(self, i):
+        """
+        Attend la réponse du processus i, en vérifiant qu'il vit toujours quand il tarde.
+        Si le processus signale une erreur ou meurt, tous les processus sont arrêtés
+        (l'état de l'univers est alors perdu) et l'erreur est levée ici.
+        Argument : i (int, numéro de la bande)
+        Return : valeur de la réponse
+        """
+        conn, p = self._connexions[i], self._processus[i]
+        try:
+            while not conn.poll(DELAI_SONDAGE):
+                if not p.is_alive():
+                    raise EOFError
+            statut, valeur = conn.recv()
+        except (EOFError, OSError):
+            self._abandonner()
+            raise RuntimeError(f"Le processus de calcul de la bande {i} s'est arrêté (code {p.exitcode})") from None
+        if statut == "erreur":
+            self._abandonner()
+            raise valeur
+        return valeur
+
+    def _abandonner(self):
+        # Après une panne, les bandes ne sont plus cohérentes : l'univers repart vide.
+        # Rompre la barrière libère les processus qui attendent la bande défaillante
+        self._barriere.abort()
+        self._fermeture()
+        self._processus.clear()
+        self._connexions.clear()
+        self._fermeture = None
+        self._vue = VueCellules((), self._vue_modifiee)
+        self._perimees = True
+
+    def _repartir(self, plan, x0, y0):
+        """
+        Recadre la région autour du motif (avec MARGE cellules vides) et la découpe
+        en bandes de population équivalente, copiées dans de nouveaux segments partagés.
+        Argument : plan (np.ndarray 0/1), x0 (int), y0 (int) coin haut-gauche du plan
+        Return : None
+        """
+        lignes = np.flatnonzero(plan.any(axis=1))
+        colonnes = np.flatnonzero(plan.any(axis=0))
+        if len(lignes):
+            plan = plan[lignes[0]:lignes[-1] + 1, colonnes[0]:colonnes[-1] + 1]
+            x0, y0 = x0 + int(colonnes[0]), y0 + int(lignes[0])
+        else:
+            plan = np.zeros((0, 0), dtype=np.uint8)
+
+        # Chaque bande doit avoir au moins une ligne
+        marge_y = max(MARGE, -(-(self.nb_processus - plan.shape[0]) // 2))
+        cadre = np.zeros((plan.shape[0] + 2 * marge_y, plan.shape[1] + 2 * MARGE), dtype=np.uint8)
+        cadre[marge_y:marge_y + plan.shape[0], MARGE:MARGE + plan.shape[1]] = plan
+        self._x0, self._y0 = x0 - MARGE, y0 - marge_y
+        hauteur, self._largeur = cadre.shape
+
+        # Frontières aux quantiles de la population cumulée
+        cumul = np.cumsum(cadre.sum(axis=1, dtype=np.int64))
+        total = int(cumul[-1])
+        bornes = [0]
+        for k in range(1, self.nb_processus):
+            b = int(np.searchsorted(cumul, total * k / self.nb_processus)) + 1 if total else hauteur * k // self.nb_processus
+            bornes.append(min(max(b, bornes[-1] + 1), hauteur - (self.nb_processus - k)))
+        bornes.append(hauteur)
+        self._bornes = bornes
+
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments.clear()
+        descripteurs = []
+        for i in range(self.nb_processus):
+            debut, fin = bornes[i], bornes[i + 1]
+            shm = shared_memory.SharedMemory(create=True, size=2 * (fin - debut + 2) * self._largeur)
+            self._segments.append(shm)
+            _bandes(shm, fin - debut, self._largeur)[:] = 0
+            descripteurs.append((shm.name, fin - debut, self._largeur))
+        for i, shm in enumerate(self._segments):
+            debut, fin = bornes[i], bornes[i + 1]
+            tampons = _bandes(shm, fin - debut, self._largeur)
+            tampons[0, 1:-1] = cadre[debut:fin]
+            if debut > 0:
+                tampons[0, 0] = cadre[debut - 1]
+            if fin < hauteur:
+                tampons[0, -1] = cadre[fin]
+
+        for i in range(self.nb_processus):
+            haut = descripteurs[i - 1] if i > 0 else None
+            bas = descripteurs[i + 1] if i < self.nb_processus - 1 else None
+            self._envoyer(i, ("charger", (descripteurs[i], haut, bas)))
+        for i in range(self.nb_processus):
+            self._recevoir(i)
+        self._parite = 0
+        self._pops_lignes = cadre.sum(axis=1, dtype=np.int64)
+        self._colonnes = cadre.any(axis=0)
+        # Un motif concentré sur peu de lignes ne peut pas être mieux réparti :
+        # on mémorise le déséquilibre atteint pour ne pas redécouper en boucle
+        self._desequilibre_min = self._desequilibre()
+
+    def _desequilibre(self):
+        """
+        Rapport entre la population de la bande la plus chargée et la moyenne.
+        Argument : Aucun
+        Return : float
+        """
+        pops = [int(self._pops_lignes[d:f].sum()) for d, f in zip(self._bornes, self._bornes[1:])]
+        moyenne = sum(pops) / len(pops)
+        return max(pops) / moyenne if moyenne else 1.0
+
+    def _doit_repartir(self, nb_generations):
+        """
+        Indique si le motif risque d'atteindre le bord de la région pendant
+        nb_generations, ou si la charge des bandes est trop déséquilibrée.
+        Argument : nb_generations (int)
+        Return : bool
+        """
+        lignes = np.flatnonzero(self._pops_lignes)
+        if not len(lignes):
+            return False
+        colonnes = np.flatnonzero(self._colonnes)
+        if (lignes[0] <= nb_generations or len(self._pops_lignes) - 1 - lignes[-1] <= nb_generations
+                or colonnes[0] <= nb_generations or self._largeur - 1 - colonnes[-1] <= nb_generations):
+            return True
+        return self._desequilibre() > DESEQUILIBRE_MAX * max(1.0, self._desequilibre_min)
+
+    def fermer(self):
+        """
+        Arrête les processus de calcul et libère la mémoire partagée.
+        Argument : Aucun
+        Return : None
+        """
+        if self._fermeture is not None:
+            self._vue = VueCellules(self._lister(), self._vue_modifiee)
+            self._perimees = True
+            self._fermeture()
+            self._processus.clear()
+            self._connexions.clear()
+            self._fermeture = None
+
+    # --- Évolution ---
+    def avancer(self, nb_generations):
+        """
+        Fait évoluer l'univers de nb_generations en limitant les allers-retours
+        avec les processus (époques d'au plus MARGE - 1 générations).
+        Argument : nb_generations (int)
+        Return : bool (True si la dernière génération a changé l'état)
+        """
+        if not self._processus:
+            self._demarrer()
+        if self._perimees:
+            cellules = np.array(list(self._vue), dtype=np.int64).reshape(-1, 2)
+            if len(cellules):
+                x0, y0 = cellules.min(axis=0)
+                plan = np.zeros(tuple(cellules.max(axis=0)[::-1] - (y0, x0) + 1), dtype=np.uint8)
+                plan[cellules[:, 1] - y0, cellules[:, 0] - x0] = 1
+            else:
+                x0 = y0 = 0
+                plan = np.zeros((0, 0), dtype=np.uint8)
+            self._repartir(plan, int(x0), int(y0))
+            self._perimees = False
+
+        a_change = False
+        restant = nb_generations
+        while restant > 0:
+            epoque = min(restant, MARGE - 1)
+            if self._doit_repartir(epoque):
+                self._repartir(self._plan(), self._x0, self._y0)
+            for i in range(self.nb_processus):
+                self._envoyer(i, ("pas", (epoque, self.regle.masque)))
+            reponses = [self._recevoir(i) for i in range(self.nb_processus)]
+            a_change = any(r[0] for r in reponses)
+            self._pops_lignes = np.concatenate([r[1] for r in reponses])
+            self._colonnes = np.logical_or.reduce([r[2] for r in reponses])
+            self._parite ^= epoque & 1
+            restant -= epoque
+
+        self.generation += nb_generations
+        self._vue = None
+        return a_change
+
+    def evoluer(self):
+        """
+        Calcule la génération suivante en parallèle.
+        Argument : Aucun
+        Return : bool (True si l'état a changé)
+        """
+        return self.avancer(1)
+
+    def population(self):
+        """
+        Nombre de cellules vivantes, d'après le dernier recensement des bandes.
+        Argument : Aucun
+        Return : int
+        """
+        if self._perimees:
+            return len(self._vue)
+        return int(self._pops_lignes.sum())
@@ -0,0 +1,169 @@
+"""
+Chronométrage des phases du calcul et de l'affichage. Un seul profileur global est partagé
+par tous les modules : désactivé, chaque point de mesure ne coûte qu'un test d'attribut.
+
+    with profileur.mesurer("recensement"):
+        ...
+    profileur.image_terminee()   # Fin d'une image (ou d'une génération sans affichage)
+    profileur.exporter("trace.csv")
+"""
+import collections
+import csv
+import json
+import threading
+import time
+
+TAILLE_FENETRE = 240 # Mesures gardées par phase pour les moyennes glissantes et centiles
+TAILLE_TRACE = 36_000 # Images gardées dans la trace (10 minutes à 60 FPS)
+
+
+class _Rien:
+    """Contexte vide renvoyé quand le profileur est désactivé."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_RIEN = _Rien()
+
+
+class _Chrono:
+    """Mesure la durée d'un bloc et l'ajoute à sa phase."""
+    __slots__ = ("profileur", "nom", "debut")
+
+    def __init__(self, profileur, nom):
+        self.profileur = profileur
+        self.nom = nom
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profileur.ajouter(self.nom, time.perf_counter() - self.debut)
+        return False
+
+
+class Profileur:
+    """
+    Collecte des durées par phase : fenêtre glissante pour l'affichage en direct
+    et trace image par image pour l'export CSV / JSON.
+    """
+
+    def __init__(self):
+        """
+        Crée un profileur désactivé.
+        Argument : Aucun
+        Return : None (Constructeur)
+        """
+        self.actif = False
+        self._fenetres = collections.defaultdict(lambda: collections.deque(maxlen=TAILLE_FENETRE))
+        self._image = collections.defaultdict(float) # Temps cumulé par phase dans l'image en cours
+        self._trace = collections.deque(maxlen=TAILLE_TRACE)
+        self._numero = 0
+        self._origine = time.perf_counter() # Instant zéro des temps de la trace
+        self._verrou = threading.Lock() # Le calcul et l'affichage tournent dans deux fils
+
+    def activer(self, actif=True):
+        """
+        Active ou désactive les mesures ; la réactivation repart de mesures vides.
+        Argument : actif (bool)
+        Return : None
+        """
+        if actif and not self.actif:
+            self.vider()
+        self.actif = actif
+
+    def vider(self):
+        """Oublie toutes les mesures et la trace."""
+        with self._verrou:
+            self._fenetres.clear()
+            self._image.clear()
+            self._trace.clear()
+            self._numero = 0
+            self._origine = time.perf_counter()
+
+    def mesurer(self, nom):
+        """
+        Contexte chronométrant un bloc sous le nom de phase donné.
+        Argument : nom (str)
+        Return : gestionnaire de contexte
+        """
+        return _Chrono(self, nom) if self.actif else _RIEN
+
+    def ajouter(self, nom, duree):
+        """
+        Enregistre une durée mesurée ailleurs.
+        Argument : nom (str), duree (float, secondes)
+        Return : None
+        """
+        with self._verrou:
+            self._fenetres[nom].append(duree)
+            self._image[nom] += duree
+
+    def image_terminee(self):
+        """
+        Clôt l'image en cours : ses temps par phase rejoignent la trace.
+        Argument : Aucun
+        Return : None
+        """
+        if not self.actif:
+            return
+        with self._verrou:
+            ligne = {"image": self._numero, "temps": time.perf_counter() - self._origine}
+            ligne.update(self._image)
+            self._trace.append(ligne)
+            self._image.clear()
+            self._numero += 1
+
+    def statistiques(self):
+        """
+        Moyenne glissante et centiles de chaque phase, en millisecondes.
+        Argument : Aucun
+        Return : dict nom -> dict (moyenne, p50, p95, p99, appels)
+        """
+        with self._verrou:
+            fenetres = {nom: sorted(d) for nom, d in self._fenetres.items() if d}
+        resultat = {}
+        for nom, durees in sorted(fenetres.items()):
+            n = len(durees)
+            resultat[nom] = {
+                "moyenne": 1000 * sum(durees) / n,
+                "p50": 1000 * durees[n // 2],
+                "p95": 1000 * durees[min(n - 1, n * 95 // 100)],
+                "p99": 1000 * durees[min(n - 1, n * 99 // 100)],
+                "appels": n,
+            }
+        return resultat
+
+    def exporter(self, chemin):
+        """
+        Écrit la trace image par image en CSV ou en JSON selon l'extension : fin de l'image
+        en secondes depuis l'activation, puis durée de chaque phase en millisecondes.
+        Argument : chemin (str, se terminant par .csv ou .json)
+        Return : int (nombre d'images écrites)
+        """
+        with self._verrou:
+            trace = list(self._trace)
+        phases = sorted({cle for ligne in trace for cle in ligne} - {"image", "temps"})
+        lignes = [{"image": l["image"], "temps": round(l["temps"], 6),
+                   **{p: round(1000 * l.get(p, 0.0), 4) for p in phases}} for l in trace]
+        if chemin.lower().endswith(".json"):
+            with open(chemin, "w", encoding="utf-8") as f:
+                json.dump({"unite": "ms", "phases": phases, "images": lignes}, f, ensure_ascii=False)
+        elif chemin.lower().endswith(".csv"):
+            with open(chemin, "w", encoding="utf-8", newline="") as f:
+                ecrivain = csv.DictWriter(f, fieldnames=["image", "temps"] + phases)
+                ecrivain.writeheader()
+                ecrivain.writerows(lignes)
+        else:
+            raise ValueError(f"Format de trace inconnu : {chemin} (attendu .csv ou .json)")
+        return len(lignes)
+
+
+# Profileur partagé par le moteur, la simulation et l'affichage
+profileur = Profileur()
@@ -0,0 +1,417 @@
+"""
+Recherche dans des soupes aléatoires, dans l'esprit d'apgsearch : chaque soupe est une
+zone de 16x16 cases tirée à partir d'une graine, évoluée jusqu'à stabilisation ; les cendres
+sont ensuite découpées en objets isolés, classés (stables, oscillateurs, vaisseaux)
+et recensés sous un code canonique au format apgcode (xs4_33 pour le bloc, xq4_153
+pour le planeur...). Les soupes sont réparties sur plusieurs processus et le recensement
+agrégé est réécrit après chaque lot.
+
+    python recherche.py -n 100000 --graine essai --sortie recensement.csv
+    python recherche.py -n 1000000 --processus 8 --regle HighLife
+"""
+import argparse
+import collections
+import csv
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from grille import VOISINS, Grille
+from regles import CONWAY, Regle, compiler_regle
+
+TAILLE_SOUPE = 16
+DENSITE_SOUPE = 0.5
+GENERATIONS_MAX = 20_000 # Au-delà, la soupe est recensée telle quelle (croissance infinie...)
+MARGE_EVASION = 32 # Un vaisseau à plus de MARGE_EVASION cases de la zone de la soupe ne reviendra plus
+INTERVALLE_EVASION = 64 # Générations entre deux recherches de vaisseaux échappés
+PERIODE_OBJET_MAX = 1000 # Générations laissées à un objet isolé pour se répéter
+PERIODE_VAISSEAU_MAX = 32 # Générations laissées à un groupe sorti de la zone pour se révéler vaisseau
+TAILLE_LOT = 200 # Soupes par tâche envoyée aux processus
+TAILLE_CACHE = 100_000 # Formes de groupes dont les codes sont gardés, par processus
+
+# Chiffres du format de Wechsler étendu (une colonne de 5 cases = une valeur de 0 à 31)
+CHIFFRES = "0123456789abcdefghijklmnopqrstuvwxyz"
+ORIENTATIONS = [(1, 0, 0, 1), (-1, 0, 0, 1), (1, 0, 0, -1), (-1, 0, 0, -1),
+                (0, 1, 1, 0), (0, -1, 1, 0), (0, 1, -1, 0), (0, -1, -1, 0)]
+
+
+def generer_soupe(graine, indice):
+    """
+    Soupe reproductible : la même graine et le même indice donnent toujours la même soupe.
+    Argument : graine (str), indice (int)
+    Return : set de tuples (x, y)
+    """
+    rng = random.Random(f"{graine}:{indice}")
+    return {(x, y) for y in range(TAILLE_SOUPE) for x in range(TAILLE_SOUPE) if rng.random() < DENSITE_SOUPE}
+
+
+def stabiliser(grille):
+    """
+    Fait évoluer la grille jusqu'à ce que son état se répète (grille.cycle, tenu à jour à chaque
+    génération par l'empreinte du motif), ou jusqu'à GENERATIONS_MAX. Tant qu'un vaisseau vole,
+    l'état ne se répète jamais : ceux qui sont sortis de la zone de la soupe sont retirés au passage.
+    Argument : grille (Grille)
+    Return : tuple (période de l'état, 0 si la soupe ne s'est pas stabilisée ; list de frozenset, vaisseaux retirés)
+    """
+    echappes = []
+    bas, haut = -MARGE_EVASION, TAILLE_SOUPE - 1 + MARGE_EVASION
+    while grille.generation < GENERATIONS_MAX:
+        grille.evoluer()
+        if grille.cycle is not None:
+            return grille.cycle[0], echappes
+        if grille.generation % INTERVALLE_EVASION:
+            continue
+        if all(bas <= x <= haut and bas <= y <= haut for (x, y) in grille.cellules):
+            continue
+        for groupe in composantes(grille.cellules):
+            if any(bas <= x <= haut and bas <= y <= haut for (x, y) in groupe):
+                continue
+            phases = evoluer_objet(groupe, grille.regle, PERIODE_VAISSEAU_MAX)
+            if phases and normaliser(phases[0])[1:] != normaliser(phases[-1])[1:]:
+                grille.cellules.difference_update(groupe)
+                echappes.append(frozenset(groupe))
+    return 0, echappes
+
+
+def composantes(cellules, distance=2):
+    """
+    Découpe un ensemble de cellules en groupes isolés : deux cellules à au plus
+    `distance` cases l'une de l'autre (dans les deux axes) sont dans le même groupe.
+    À distance 3 ou plus, deux groupes n'ont aucune voisine commune et évoluent indépendamment.
+    Argument : cellules (ensemble de tuples), distance (int)
+    Return : list de set de tuples
+    """
+    restantes = set(cellules)
+    decalages = [(dx, dy) for dx in range(-distance, distance + 1) for dy in range(-distance, distance + 1)
+                 if (dx, dy) != (0, 0)]
+    groupes = []
+    while restantes:
+        a_visiter = [restantes.pop()]
+        groupe = set(a_visiter)
+        while a_visiter:
+            x, y = a_visiter.pop()
+            for dx, dy in decalages:
+                voisine = (x + dx, y + dy)
+                if voisine in restantes:
+                    restantes.remove(voisine)
+                    groupe.add(voisine)
+                    a_visiter.append(voisine)
+        groupes.append(groupe)
+    return groupes
+
+
+def pas(cellules, regle):
+    """
+    Génération suivante d'un petit motif, sans Grille : pour les objets des cendres,
+    qui n'ont que quelques dizaines de cellules, un simple recensement suffit.
+    Argument : cellules (ensemble de tuples), regle (Regle)
+    Return : frozenset de tuples
+    """
+    voisins = collections.Counter((x + dx, y + dy) for (x, y) in cellules for dx, dy in VOISINS)
+    naissance, survie = regle.naissance, regle.survie
+    suivantes = {c for c, n in voisins.items() if (survie[n] if c in cellules else naissance[n])}
+    if survie[0]:
+        suivantes.update(c for c in cellules if c not in voisins)
+    return frozenset(suivantes)
+
+
+def normaliser(cellules):
+    """
+    Ramène un motif non vide à l'origine (coin haut-gauche de sa boîte en (0, 0)).
+    Argument : cellules (ensemble non vide de tuples)
+    Return : tuple (frozenset de tuples, x0, y0 : décalage retiré)
+    """
+    x0 = min(x for x, _ in cellules)
+    y0 = min(y for _, y in cellules)
+    return frozenset((x - x0, y - y0) for (x, y) in cellules), x0, y0
+
+
+def code_wechsler(cellules):
+    """
+    Code de Wechsler étendu d'un motif dans son orientation actuelle : bandes de 5 lignes
+    séparées par "z", une colonne de 5 cases par chiffre, les suites de colonnes vides
+    abrégées en "0", "w", "x" ou "y" suivi de leur nombre moins 4.
+    Argument : cellules (ensemble non vide de tuples)
+    Return : str
+    """
+    x0 = min(x for x, _ in cellules)
+    y0 = min(y for _, y in cellules)
+    largeur = max(x for x, _ in cellules) - x0 + 1
+    hauteur = max(y for _, y in cellules) - y0 + 1
+    colonnes = collections.defaultdict(int) # (bande, colonne) -> valeur sur 5 bits
+    for (x, y) in cellules:
+        bande, ligne = divmod(y - y0, 5)
+        colonnes[(bande, x - x0)] |= 1 << ligne
+
+    bandes = []
+    for bande in range((hauteur + 4) // 5):
+        texte = []
+        vides = 0
+        for colonne in range(largeur):
+            valeur = colonnes.get((bande, colonne), 0)
+            if not valeur:
+                vides += 1
+                continue
+            while vides > 39:
+                texte.append("yz")
+                vides -= 39
+            if vides:
+                texte.append({1: "0", 2: "w", 3: "x"}.get(vides) or "y" + CHIFFRES[vides - 4])
+                vides = 0
+            texte.append(CHIFFRES[valeur])
+        bandes.append("".join(texte))
+    return "z".join(bandes)
+
+
+def canoniser(phases):
+    """
+    Représentation canonique d'un objet : parmi toutes ses phases et ses 8 orientations,
+    le code de Wechsler le plus court, puis le plus petit dans l'ordre alphabétique.
+    Argument : phases (list d'ensembles de tuples)
+    Return : str
+    """
+    meilleur = None
+    for cellules in phases:
+        for (a, b, c, d) in ORIENTATIONS:
+            code = code_wechsler({(a * x + b * y, c * x + d * y) for (x, y) in cellules})
+            if meilleur is None or (len(code), code) < (len(meilleur), meilleur):
+                meilleur = code
+    return meilleur
+
+
+def coder(phases):
+    """
+    Code d'un objet dont on connaît une période complète : xs<population> pour un objet stable,
+    xp<période> pour un oscillateur, xq<période> pour un vaisseau, suivi de sa forme canonique.
+    Argument : phases (list d'ensembles non vides : états successifs, le dernier égal au premier à une translation près)
+    Return : str ("pathologique" si les phases ne se répètent pas)
+    """
+    forme0, x0, y0 = normaliser(phases[0])
+    for periode in range(1, len(phases)):
+        forme, x, y = normaliser(phases[periode])
+        if forme == forme0:
+            break
+    else:
+        return "pathologique"
+    forme = canoniser(phases[:periode])
+    if (x, y) != (x0, y0):
+        return f"xq{periode}_{forme}"
+    if periode == 1:
+        return f"xs{len(phases[0])}_{forme}"
+    return f"xp{periode}_{forme}"
+
+
+def evoluer_objet(cellules, regle, generations_max=PERIODE_OBJET_MAX):
+    """
+    Fait évoluer un objet isolé jusqu'à ce qu'il se répète (à une translation près).
+    Argument : cellules (ensemble de tuples), regle (Regle), generations_max (int)
+    Return : list de frozenset (une période complète, dernier état compris), vide s'il meurt,
+             None s'il ne se répète pas en generations_max générations
+    """
+    phases = [frozenset(cellules)]
+    if not phases[0]:
+        return []
+    vues = {normaliser(phases[0])[0]: 0} # Forme -> indice de sa première apparition
+    for _ in range(generations_max):
+        suivante = pas(phases[-1], regle)
+        if not suivante:
+            return []
+        phases.append(suivante)
+        forme = normaliser(suivante)[0]
+        if forme in vues:
+            return phases[vues[forme]:]
+        vues[forme] = len(phases) - 1
+    return None
+
+
+def classer(cellules, regle=None):
+    """
+    Fait évoluer un objet isolé jusqu'à ce qu'il se répète et en déduit son code (voir coder).
+    Argument : cellules (ensemble de tuples), regle (Regle, str ou None pour B3/S23)
+    Return : str ("vide" s'il meurt, "pathologique" s'il ne se répète pas assez vite)
+    """
+    if regle is None:
+        regle = CONWAY
+    elif not isinstance(regle, Regle):
+        regle = compiler_regle(regle)
+    phases = evoluer_objet(cellules, regle)
+    if phases is None:
+        return "pathologique"
+    if not phases:
+        return "vide"
+    return coder(phases)
+
+
+def separer(phases, regle):
+    """
+    Découpe un groupe isolé des cendres en objets qui évoluent chacun pour son compte : le
+    groupement à distance 2 réunit aussi des objets voisins mais indépendants (deux clignotants
+    côte à côte...). On part des morceaux connexes de la réunion des phases, que l'on fait évoluer
+    séparément ; dès que leur réunion s'écarte de l'évolution du groupe, les morceaux voisins
+    de l'écart interagissent et sont fusionnés.
+    Argument : phases (list de frozenset, une période complète du groupe), regle (Regle)
+    Return : list des phases de chaque objet (list de frozenset)
+    """
+    morceaux = composantes(frozenset().union(*phases), distance=1)
+    while True:
+        evolutions = []
+        for morceau in morceaux:
+            etats = [phases[0] & morceau]
+            for _ in range(len(phases) - 1):
+                etats.append(pas(etats[-1], regle))
+            evolutions.append(etats)
+        for g in range(1, len(phases)):
+            ecarts = phases[g].symmetric_difference(frozenset().union(*(etats[g] for etats in evolutions)))
+            if ecarts:
+                break
+        else:
+            return evolutions
+        # Une case qui diffère avait, à la génération précédente, des voisines dans plusieurs morceaux
+        zone = {(x + dx, y + dy) for (x, y) in ecarts for dx, dy in VOISINS}
+        proches = {i for i, etats in enumerate(evolutions) if not zone.isdisjoint(etats[g - 1])}
+        if len(proches) < 2:
+            proches = set(range(len(morceaux)))
+        fusion = set().union(*(morceaux[i] for i in proches))
+        morceaux = [morceau for i, morceau in enumerate(morceaux) if i not in proches] + [fusion]
+
+
+_codes_groupes = {} # (masque de la règle, forme du groupe) -> codes de ses objets
+
+
+def recenser_groupe(phases, regle):
+    """
+    Codes des objets d'un groupe isolé. Les cendres répètent sans cesse les mêmes formes
+    (blocs, ruches, clignotants...) : chacune n'est découpée et classée qu'une fois par processus.
+    Argument : phases (list de frozenset, une période complète du groupe), regle (Regle)
+    Return : list de str
+    """
+    cle = (regle.masque, normaliser(phases[0])[0])
+    codes = _codes_groupes.get(cle)
+    if codes is None:
+        codes = [coder(etats) for etats in separer(phases, regle)]
+        if len(_codes_groupes) >= TAILLE_CACHE:
+            _codes_groupes.clear()
+        _codes_groupes[cle] = codes
+    return codes
+
+
+def rechercher_lot(graine, debut, nombre, regle=None):
+    """
+    Traite les soupes debut à debut + nombre - 1 ; exécutée dans un processus du pool.
+    Argument : graine (str), debut (int), nombre (int), regle (str ou None)
+    Return : tuple (nombre, Counter code -> objets, dict code -> première soupe, soupes non stabilisées)
+    """
+    recensement = collections.Counter()
+    exemples = {}
+    non_stabilisees = 0
+    for indice in range(debut, debut + nombre):
+        grille = Grille()
+        if regle is not None:
+            grille.regle = regle
+        grille.cellules = generer_soupe(graine, indice)
+        periode, echappes = stabiliser(grille)
+        codes = []
+        for vaisseau in echappes:
+            codes.extend(recenser_groupe(evoluer_objet(vaisseau, grille.regle), grille.regle))
+        if periode:
+            # Les groupes sont séparés sur la réunion des phases d'une période complète :
+            # un oscillateur n'est jamais coupé en deux par une phase plus étroite
+            phases = [frozenset(grille.cellules)]
+            for _ in range(periode):
+                grille.evoluer()
+                phases.append(frozenset(grille.cellules))
+            for groupe in composantes(frozenset().union(*phases)):
+                codes.extend(recenser_groupe([phase & groupe for phase in phases], grille.regle))
+        else:
+            non_stabilisees += 1
+            codes.extend(classer(groupe, grille.regle) for groupe in composantes(grille.cellules))
+        for code in codes:
+            if code == "vide":
+                continue
+            recensement[code] += 1
+            exemples.setdefault(code, indice)
+    return nombre, recensement, exemples, non_stabilisees
+
+
+def _rechercher_lot(lot):
+    # imap_unordered ne transmet qu'un argument
+    return rechercher_lot(*lot)
+
+
+def ecrire_recensement(chemin, recensement, exemples, infos):
+    """
+    Réécrit le recensement agrégé en CSV (code, nombre, part, première soupe),
+    via un fichier temporaire pour ne jamais laisser un fichier à moitié écrit.
+    Argument : chemin (str), recensement (Counter), exemples (dict), infos (dict, lignes d'en-tête)
+    Return : None
+    """
+    total = sum(recensement.values())
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8", newline="") as f:
+        for cle, valeur in infos.items():
+            f.write(f"# {cle}: {valeur}\n")
+        ecrivain = csv.writer(f)
+        ecrivain.writerow(["code", "nombre", "part", "exemple"])
+        for code, nombre in sorted(recensement.items(), key=lambda e: (-e[1], e[0])):
+            ecrivain.writerow([code, nombre, f"{nombre / total:.6g}", f"{infos['graine']}:{exemples[code]}"])
+    os.replace(temporaire, chemin)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche et recensement d'objets dans des soupes aléatoires.")
+    parser.add_argument("-n", "--soupes", type=int, default=10_000, help="nombre de soupes à examiner")
+    parser.add_argument("--graine", default="0", help="graine des soupes (la soupe i est « graine:i »)")
+    parser.add_argument("--debut", type=int, default=0, help="indice de la première soupe (pour reprendre)")
+    parser.add_argument("--processus", type=int, default=os.cpu_count(), help="nombre de processus de calcul")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="soupes par tâche")
+    parser.add_argument("--regle", help="règle B/S ou nom connu (par défaut B3/S23)")
+    parser.add_argument("--sortie", default="recensement.csv", help="fichier CSV du recensement agrégé")
+    args = parser.parse_args(argv)
+
+    if args.regle:
+        try:
+            Grille().regle = args.regle
+        except ValueError as e:
+            parser.error(str(e))
+
+    lots = [(args.graine, debut, min(args.lot, args.debut + args.soupes - debut), args.regle)
+            for debut in range(args.debut, args.debut + args.soupes, args.lot)]
+    recensement = collections.Counter()
+    exemples = {}
+    soupes = non_stabilisees = 0
+    debut_chrono = time.perf_counter()
+    # Les lots se terminent dans le désordre : le recensement agrégé est réécrit après chacun
+    with multiprocessing.Pool(processes=args.processus) as pool:
+        for nombre, compte, premiers, instables in pool.imap_unordered(_rechercher_lot, lots):
+            soupes += nombre
+            non_stabilisees += instables
+            recensement.update(compte)
+            for code, indice in premiers.items():
+                exemples[code] = min(indice, exemples.get(code, indice))
+            duree = time.perf_counter() - debut_chrono
+            ecrire_recensement(args.sortie, recensement, exemples, {
+                "graine": args.graine,
+                "regle": args.regle or "B3/S23",
+                "soupes": soupes,
+                "non_stabilisees": non_stabilisees,
+                "objets": sum(recensement.values()),
+                "soupes_par_s": f"{soupes / duree:.1f}",
+            })
+            print(f"{soupes:>10} soupes  {soupes / duree:8.1f} soupes/s  {len(recensement):6} objets distincts",
+                  file=sys.stderr)
+
+    duree = time.perf_counter() - debut_chrono
+    print(f"Soupes           : {soupes}" + (f" ({non_stabilisees} non stabilisées)" if non_stabilisees else ""))
+    print(f"Objets recensés  : {sum(recensement.values())} ({len(recensement)} distincts)")
+    print(f"Temps écoulé     : {duree:.3f} s")
+    print(f"Soupes/s         : {soupes / duree:,.1f} ({args.processus} processus)")
+    for code, nombre in recensement.most_common(10):
+        print(f"  {code:<20} {nombre}")
+    print(f"Recensement      : {args.sortie}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
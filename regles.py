@@ -0,0 +1,58 @@
+"""
+Règles « Life-like » en notation B/S (naissance / survie), par exemple B3/S23 pour
+le Jeu de la Vie de Conway ou B36/S23 pour HighLife. Une règle est compilée une seule
+fois en tables indexées par le nombre de voisins : les moteurs n'ont plus qu'à lire
+la table dans leur boucle de calcul, sans test propre à une règle.
+"""
+import collections
+import functools
+import re
+
+# naissance[n] / survie[n] : la cellule est vivante à la génération suivante si elle
+# est morte (resp. vivante) et a n voisines vivantes. masque réunit les deux tables
+# dans un entier : son bit (9 * vivante + n) donne l'état suivant, ce qui permet aux
+# moteurs NumPy de décider de toutes les cellules d'un seul décalage de bits.
+Regle = collections.namedtuple("Regle", ["texte", "naissance", "survie", "masque"])
+
+REGLES_CONNUES = {
+    "Conway": "B3/S23",
+    "HighLife": "B36/S23",
+    "Day & Night": "B3678/S34678",
+    "Seeds": "B2/S",
+    "Vie sans mort": "B3/S012345678", # Life without Death
+    "Maze": "B3/S12345",
+    "2x2": "B36/S125",
+}
+
+_NOTATION_BS = re.compile(r"B([0-8]*)/S([0-8]*)", re.I)
+_NOTATION_SB = re.compile(r"([0-8]*)/([0-8]*)") # Ancienne notation survie/naissance (23/3)
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_regle(texte):
+    """
+    Compile une règle B/S (ou S/B, ou un nom de REGLES_CONNUES) en tables de décision.
+    Les règles avec B0 sont refusées : elles font naître tout le fond infini à chaque génération.
+    Argument : texte (str, ex : "B36/S23", "23/36", "HighLife")
+    Return : Regle
+    """
+    texte = REGLES_CONNUES.get(texte, texte).strip()
+    m = _NOTATION_BS.fullmatch(texte)
+    if m:
+        naissances, survies = m[1], m[2]
+    else:
+        m = _NOTATION_SB.fullmatch(texte)
+        if m is None:
+            raise ValueError(f"Règle invalide : {texte!r} (notation attendue : B3/S23)")
+        survies, naissances = m[1], m[2]
+    if "0" in naissances:
+        raise ValueError(f"Règle {texte!r} non prise en charge : B0 ferait naître l'univers infini entier")
+    naissance = tuple(str(n) in naissances for n in range(9))
+    survie = tuple(str(n) in survies for n in range(9))
+    canonique = ("B" + "".join(str(n) for n in range(9) if naissance[n])
+                 + "/S" + "".join(str(n) for n in range(9) if survie[n]))
+    masque = sum(1 << n for n in range(9) if naissance[n]) + sum(1 << (9 + n) for n in range(9) if survie[n])
+    return Regle(canonique, naissance, survie, masque)
+
+
+CONWAY = compiler_regle("B3/S23")
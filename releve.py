@@ -0,0 +1,65 @@
+"""
+Relevé des statistiques de chaque génération (Grille.statistiques) dans un fichier CSV
+ou JSON écrit au fil du calcul : on peut suivre le fichier pendant une longue simulation.
+
+    releve = Releve("stats.csv")
+    releve.ecrire(grille.statistiques())   # après chaque génération
+    releve.fermer()
+"""
+import csv
+import json
+import os
+
+CHAMPS = ["generation", "population", "naissances", "morts", "x_min", "y_min", "x_max", "y_max"]
+
+
+class Releve:
+    """
+    Une ligne par génération. En CSV, chaque ligne est écrite aussitôt (valeur absente = case vide) ;
+    en JSON, le fichier est un tableau d'objets qui n'est complet qu'après fermer().
+    """
+
+    def __init__(self, chemin):
+        """
+        Crée (ou écrase) le fichier du relevé.
+        Argument : chemin (str, se terminant par .csv ou .json)
+        Return : None (Constructeur)
+        """
+        extension = os.path.splitext(chemin)[1].lower()
+        if extension not in (".csv", ".json"):
+            raise ValueError(f"Format de relevé inconnu : {chemin} (attendu .csv ou .json)")
+        self.chemin = chemin
+        self.nb_lignes = 0
+        self._json = extension == ".json"
+        # Tampon par ligne : le fichier reste lisible pendant le calcul
+        self._fichier = open(chemin, "w", encoding="utf-8", newline="", buffering=1)
+        if self._json:
+            self._fichier.write("[")
+        else:
+            self._csv = csv.writer(self._fichier, lineterminator="\n")
+            self._csv.writerow(CHAMPS)
+
+    def ecrire(self, statistiques):
+        """
+        Ajoute les statistiques d'une génération.
+        Argument : statistiques (dict, clés de CHAMPS)
+        Return : None
+        """
+        if self._json:
+            separateur = ",\n" if self.nb_lignes else "\n"
+            self._fichier.write(separateur + json.dumps({cle: statistiques[cle] for cle in CHAMPS}))
+        else:
+            self._csv.writerow([statistiques[cle] for cle in CHAMPS])
+        self.nb_lignes += 1
+
+    def fermer(self):
+        """
+        Termine le fichier (fin du tableau JSON) et le ferme.
+        Argument : Aucun
+        Return : None
+        """
+        if self._fichier.closed:
+            return
+        if self._json:
+            self._fichier.write("\n]\n")
+        self._fichier.close()
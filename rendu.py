@@ -0,0 +1,158 @@
+"""
+Dessin des cellules et du grillage sur une surface quelconque (l'écran, une scène
+en mémoire ou une image hors écran), et caméra commune aux deux fenêtres : partagé
+par main.py, spectateur.py et enregistrer.py.
+"""
+import itertools
+import math
+
+import pygame
+
+try:
+    import numpy as np # Optionnel : rastérisation vectorisée des cellules
+except ImportError:
+    np = None
+
+# Couleurs
+BLANC = (255, 255, 255)
+NOIR = (0, 0, 0)
+GRIS_CLAIR = (230, 230, 230)
+GRIS_FONCE = (50, 50, 50)
+
+TAILLE_CELLULE_MIN = 1 / 16 # En dessous d'1 pixel par cellule, on affiche une carte de densité
+TAILLE_CELLULE_MAX = 100
+
+
+def zoom_suivant(taille_cellule, sens):
+    """
+    Palier de zoom voisin : par pas de 2 pixels au-dessus de 4 pixels, puis par moitiés
+    jusqu'à TAILLE_CELLULE_MIN (plusieurs cellules par pixel, seulement avec numpy).
+    Argument : taille_cellule (float, pixels), sens (int, positif pour zoomer, négatif pour dézoomer)
+    Return : float (nouvelle taille de cellule)
+    """
+    t = taille_cellule
+    if sens > 0:
+        return t * 2 if t < 4 else min(TAILLE_CELLULE_MAX, t + 2)
+    if t > 4:
+        return t - 2
+    if np is not None: # La vue de densité nécessite numpy
+        return max(TAILLE_CELLULE_MIN, t / 2)
+    return t
+
+
+def zoomer_autour(taille_cellule, offset_x, offset_y, sens, position):
+    """
+    Passe au palier de zoom voisin en gardant fixe la cellule sous un pixel (la souris).
+    Argument : taille_cellule (float), offset_x, offset_y (int, caméra), sens (int),
+               position (tuple (x, y), pixel fixe)
+    Return : tuple (taille_cellule, offset_x, offset_y)
+    """
+    nouvelle = zoom_suivant(taille_cellule, sens)
+    mx, my = position
+    return (nouvelle, round(mx - (mx - offset_x) * nouvelle / taille_cellule),
+            round(my - (my - offset_y) * nouvelle / taille_cellule))
+
+
+def rectangle_visible(largeur, hauteur, taille_cellule, offset_x, offset_y):
+    """
+    Cellules couvertes par une surface de largeur x hauteur pixels.
+    Argument : largeur, hauteur (int, pixels), taille_cellule (float), offset_x, offset_y (int, caméra)
+    Return : tuple (x_min, y_min, x_max, y_max), bornes incluses
+    """
+    t = taille_cellule
+    return (int(-offset_x // t), int(-offset_y // t),
+            int((largeur - 1 - offset_x) // t), int((hauteur - 1 - offset_y) // t))
+
+
+def dessiner_grillage(cible, taille_cellule, offset_x, offset_y, couleur):
+    """
+    Dessine les lignes verticales et horizontales de la grille visibles sur la cible.
+    Argument : cible (pygame.Surface), taille_cellule (float, pixels), offset_x, offset_y (int, caméra),
+               couleur (tuple RGB)
+    Return : None
+    """
+    # En dessous de 4 pixels par cellule, les lignes recouvriraient tout l'écran
+    if taille_cellule < 4:
+        return
+    largeur, hauteur = cible.get_size()
+    # calcule uniquement les lignes visibles à l'écran pour économiser des ressources
+    start_col = -offset_x // taille_cellule
+    end_col = start_col + (largeur // taille_cellule) + 2
+    start_row = -offset_y // taille_cellule
+    end_row = start_row + (hauteur // taille_cellule) + 2
+
+    for c in range(int(start_col), int(end_col)):
+        x = (c * taille_cellule) + offset_x
+        pygame.draw.line(cible, couleur, (x, 0), (x, hauteur))
+    for r in range(int(start_row), int(end_row)):
+        y = (r * taille_cellule) + offset_y
+        pygame.draw.line(cible, couleur, (0, y), (largeur, y))
+
+
+def rasteriser(alpha, coords, taille_cellule, offset_x, offset_y):
+    """
+    Rastérise des cellules dans un canal alpha en une passe numpy (255 = cellule, 0 = vide).
+    En dessous d'1 pixel par cellule, chaque pixel reçoit la densité de cellules qu'il couvre.
+    Argument : alpha (np.ndarray uint8 de forme (largeur, hauteur), ex : pygame.surfarray.pixels_alpha),
+               coords (np.ndarray int64 de forme (n, 2)), taille_cellule (float), offset_x, offset_y (int)
+    Return : None
+    """
+    largeur, hauteur = alpha.shape
+    t = taille_cellule
+    if t >= 1:
+        # Grille booléenne des cellules visibles, puis agrandissement à l'échelle des pixels
+        col0 = math.floor(-offset_x / t)
+        lig0 = math.floor(-offset_y / t)
+        nb_col = int(largeur / t) + 2
+        nb_lig = int(hauteur / t) + 2
+        cx = coords[:, 0] - col0
+        cy = coords[:, 1] - lig0
+        visibles = (cx >= 0) & (cx < nb_col) & (cy >= 0) & (cy < nb_lig)
+        vivantes = np.zeros((nb_col, nb_lig), dtype=bool)
+        vivantes[cx[visibles], cy[visibles]] = True
+
+        dx = np.arange(largeur) - offset_x
+        dy = np.arange(hauteur) - offset_y
+        masque = vivantes[np.ix_((dx // t).astype(np.int64) - col0, (dy // t).astype(np.int64) - lig0)]
+        if t >= 3:
+            # Interstice d'un pixel entre les cellules, comme pygame.draw.rect(px + 1, ..., t - 1)
+            masque &= (dx % t != 0)[:, None] & (dy % t != 0)[None, :]
+        alpha[:] = masque * np.uint8(255)
+    else:
+        # Vue de densité : nombre de cellules vivantes couvertes par chaque pixel
+        px = np.floor(coords[:, 0] * t + offset_x).astype(np.int64)
+        py = np.floor(coords[:, 1] * t + offset_y).astype(np.int64)
+        visibles = (px >= 0) & (px < largeur) & (py >= 0) & (py < hauteur)
+        compte = np.bincount(px[visibles] * hauteur + py[visibles], minlength=largeur * hauteur)
+        densite = np.minimum(compte.reshape(largeur, hauteur) * (t * t), 1.0)
+        alpha[:] = (np.sqrt(densite) * 255).astype(np.uint8)
+
+
+def dessiner_cellules(cible, cellules, taille_cellule, offset_x, offset_y, calque=None):
+    """
+    Dessine des cellules sur la cible : avec numpy, elles sont rastérisées dans le canal alpha
+    d'un calque noir collé en un seul blit ; sans numpy, un rectangle par cellule.
+    Argument : cible (pygame.Surface), cellules (list de tuples (x, y), de préférence les seules visibles),
+               taille_cellule (float), offset_x, offset_y (int, caméra),
+               calque (pygame.Surface ou None, celui rendu par l'appel précédent)
+    Return : pygame.Surface ou None (calque à repasser à l'appel suivant)
+    """
+    t = taille_cellule
+    if np is None:
+        for (x, y) in cellules:
+            pygame.draw.rect(cible, NOIR, (x * t + offset_x + 1, y * t + offset_y + 1, max(1, t - 1), max(1, t - 1)))
+        return calque
+
+    if calque is None or calque.get_size() != cible.get_size():
+        calque = pygame.Surface(cible.get_size(), pygame.SRCALPHA)
+        calque.fill((*NOIR, 0))
+    n = len(cellules)
+    if not n:
+        return calque
+    coords = np.fromiter(itertools.chain.from_iterable(cellules), dtype=np.int64, count=2 * n).reshape(n, 2)
+
+    alpha = pygame.surfarray.pixels_alpha(calque) # Vue (largeur, hauteur) sur le calque
+    rasteriser(alpha, coords, t, offset_x, offset_y)
+    del alpha # Libère le verrou sur la surface avant le blit
+    cible.blit(calque, (0, 0))
+    return calque
@@ -0,0 +1,273 @@
+"""
+Serveur de simulation : une seule grille calcule, plusieurs spectateurs regardent.
+Chaque client s'abonne à un rectangle de l'univers et ne reçoit, à chaque nouvel état,
+que les naissances et les morts de ce rectangle, en binaire. Un client lent n'est jamais
+attendu : pendant qu'il vide son tampon, les états intermédiaires sont sautés, et le
+message suivant cumule tous les changements depuis le dernier état qu'il a reçu.
+
+    python serveur.py "Canon de Gosper" --port 8765
+    python serveur.py breeder.mc --moteur hashlife --unix /tmp/vie.sock --delai 0 --stats 5
+
+Protocole : chaque message est un type (1 octet), la longueur du contenu (uint32) puis le contenu,
+entiers en petit-boutiste.
+    Client -> serveur  b"V" : rectangle suivi, x_min, y_min, x_max, y_max (int64, bornes incluses)
+    Serveur -> client  b"I" : image clé (le client vide sa vue), b"D" : changements depuis le message précédent.
+                        Contenu : generation, population, x0, y0 (int64), nb_apparues, nb_disparues (uint32),
+                        puis les cellules apparues et disparues en paires (x - x0, y - y0) (uint32).
+"""
+import argparse
+import array
+import asyncio
+import struct
+import sys
+import time
+
+from moteurs import MOTEURS, creer_grille
+from simulation import Simulateur
+from simuler import charger_motif
+
+ENTETE = struct.Struct("<cI") # Type, longueur du contenu
+VISEE = struct.Struct("<qqqq")
+IMAGE = struct.Struct("<qqqqII")
+VISER, IMAGE_CLE, DELTA = b"V", b"I", b"D"
+LARGEUR_MAX = (1 << 32) - 1 # Les coordonnées relatives au coin du rectangle tiennent sur 32 bits
+LIMITE_TAMPON = 1 << 20 # Octets en attente d'envoi au-delà desquels un client est jugé lent
+FREQUENCE = 30 # États diffusés par seconde au plus
+PORT = 8765
+
+
+def encoder_image(type_message, generation, population, x0, y0, apparues, disparues):
+    """
+    Construit un message b"I" ou b"D".
+    Argument : type_message (bytes), generation, population, x0, y0 (int),
+               apparues, disparues (list de tuples (x, y), tous dans le rectangle de coin (x0, y0))
+    Return : bytes
+    """
+    coords = array.array("I", [v for (x, y) in apparues for v in (x - x0, y - y0)])
+    coords.extend([v for (x, y) in disparues for v in (x - x0, y - y0)])
+    if sys.byteorder == "big":
+        coords.byteswap()
+    contenu = IMAGE.pack(generation, population, x0, y0, len(apparues), len(disparues)) + coords.tobytes()
+    return ENTETE.pack(type_message, len(contenu)) + contenu
+
+
+def decoder_image(contenu):
+    """
+    Lit le contenu d'un message b"I" ou b"D".
+    Argument : contenu (bytes)
+    Return : tuple (generation, population, list des apparues, list des disparues)
+    """
+    generation, population, x0, y0, nb_apparues, nb_disparues = IMAGE.unpack_from(contenu)
+    coords = array.array("I", contenu[IMAGE.size:])
+    if sys.byteorder == "big":
+        coords.byteswap()
+    xs = [x + x0 for x in coords[0::2]]
+    ys = [y + y0 for y in coords[1::2]]
+    cellules = list(zip(xs, ys))
+    return generation, population, cellules[:nb_apparues], cellules[nb_apparues:]
+
+
+def encoder_visee(x_min, y_min, x_max, y_max):
+    """Message b"V" : le client suit désormais ce rectangle."""
+    return ENTETE.pack(VISER, VISEE.size) + VISEE.pack(x_min, y_min, x_max, y_max)
+
+
+async def lire_message(lecteur):
+    """
+    Attend le message suivant.
+    Argument : lecteur (asyncio.StreamReader)
+    Return : tuple (type (bytes), contenu (bytes)) ; lève asyncio.IncompleteReadError à la déconnexion
+    """
+    type_message, longueur = ENTETE.unpack(await lecteur.readexactly(ENTETE.size))
+    return type_message, await lecteur.readexactly(longueur)
+
+
+class Abonne:
+    """Un client connecté : son rectangle et le dernier état qui lui a été envoyé."""
+
+    def __init__(self, ecrivain):
+        self.ecrivain = ecrivain
+        self.rectangle = None # Pas d'envoi avant le premier message b"V"
+        self.envoye = None # IndexFige du dernier état envoyé ; None = prochain envoi en image clé
+        self.numero = 0 # Numéro de diffusion du dernier état envoyé
+        self.en_attente = False # True tant que son tampon d'envoi est plein
+        self.signal = asyncio.Event() # Nouvel état ou nouveau rectangle
+
+
+class ServeurSimulation:
+    """
+    Diffuse les instantanés d'un Simulateur aux abonnés. Chaque abonné a sa tâche d'envoi,
+    qui attend que son tampon se vide (drain) : un client lent ne ralentit ni les autres ni le calcul.
+    """
+
+    def __init__(self, simulateur, frequence=FREQUENCE):
+        """
+        Argument : simulateur (Simulateur, déjà démarré), frequence (int, états diffusés par seconde au plus)
+        Return : None (Constructeur)
+        """
+        self.simulateur = simulateur
+        self.frequence = frequence
+        self.instantane = simulateur.instantane()
+        self.numero = 0 # Incrémenté à chaque nouvel état diffusé
+        self.abonnes = set()
+        # Compteurs cumulés pour mesurer le débit
+        self.octets = 0
+        self.messages = 0
+        self.sautes = 0 # États non envoyés à un client encore occupé avec un envoi précédent
+
+    async def diffuser(self):
+        """
+        Relève le dernier instantané du simulateur et réveille les abonnés s'il a changé.
+        Argument : Aucun
+        Return : None (ne se termine pas)
+        """
+        while True:
+            instantane = self.simulateur.instantane()
+            if instantane is not self.instantane:
+                self.instantane = instantane
+                self.numero += 1
+                for abonne in self.abonnes:
+                    abonne.signal.set()
+            await asyncio.sleep(1 / self.frequence)
+
+    async def servir(self, lecteur, ecrivain):
+        """
+        Gère une connexion : lit les messages du client pendant qu'une tâche lui envoie les états.
+        Argument : lecteur (asyncio.StreamReader), ecrivain (asyncio.StreamWriter)
+        Return : None
+        """
+        ecrivain.transport.set_write_buffer_limits(high=LIMITE_TAMPON)
+        abonne = Abonne(ecrivain)
+        self.abonnes.add(abonne)
+        envoi = asyncio.create_task(self._envoyer(abonne))
+        try:
+            while True:
+                type_message, contenu = await lire_message(lecteur)
+                if type_message == VISER:
+                    x_min, y_min, x_max, y_max = VISEE.unpack(contenu)
+                    abonne.rectangle = (x_min, y_min, min(x_max, x_min + LARGEUR_MAX), min(y_max, y_min + LARGEUR_MAX))
+                    abonne.envoye = None # Le client ne connaît pas le reste du nouveau rectangle
+                    abonne.signal.set()
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error, asyncio.CancelledError):
+            pass # Déconnexion, message invalide ou arrêt du serveur
+        finally:
+            envoi.cancel()
+            self.abonnes.discard(abonne)
+            ecrivain.close()
+
+    async def _envoyer(self, abonne):
+        """
+        Envoie à un abonné, chaque fois qu'il est prêt, les changements entre le dernier état
+        qu'il a reçu et l'état courant, limités à son rectangle.
+        Argument : abonne (Abonne)
+        Return : None (jusqu'à l'annulation)
+        """
+        try:
+            while True:
+                await abonne.signal.wait()
+                abonne.signal.clear()
+                instantane = self.instantane
+                if abonne.rectangle is None or instantane.cellules is abonne.envoye:
+                    continue
+                x_min, y_min, x_max, y_max = abonne.rectangle
+                if abonne.envoye is None:
+                    type_message = IMAGE_CLE
+                    apparues, disparues = instantane.cellules.dans(x_min, y_min, x_max, y_max), []
+                else:
+                    type_message = DELTA
+                    apparues, disparues = instantane.cellules.differences(abonne.envoye, x_min, y_min, x_max, y_max)
+                    self.sautes += max(0, self.numero - abonne.numero - 1)
+                message = encoder_image(type_message, instantane.generation, len(instantane.cellules),
+                                        x_min, y_min, apparues, disparues)
+                abonne.envoye = instantane.cellules
+                abonne.numero = self.numero
+                abonne.ecrivain.write(message)
+                self.octets += len(message)
+                self.messages += 1
+                # Contre-pression : tant que le tampon du client est plein, les nouveaux états s'accumulent
+                # dans l'index courant et partiront ensemble dans le message suivant
+                abonne.en_attente = True
+                await abonne.ecrivain.drain()
+                abonne.en_attente = False
+        except ConnectionError:
+            pass
+
+    async def rapporter(self, periode):
+        """
+        Affiche régulièrement le nombre de clients et le débit des changements envoyés.
+        Argument : periode (float, secondes)
+        Return : None (ne se termine pas)
+        """
+        debut, octets, messages, sautes = time.perf_counter(), self.octets, self.messages, self.sautes
+        while True:
+            await asyncio.sleep(periode)
+            maintenant = time.perf_counter()
+            duree = maintenant - debut
+            print(f"Génération {self.instantane.generation} | clients: {len(self.abonnes)}"
+                  f" | {(self.messages - messages) / duree:,.0f} messages/s"
+                  f" | {(self.octets - octets) / duree / 1024:,.1f} Ko/s"
+                  f" | états sautés: {self.sautes - sautes}"
+                  f" | clients en attente: {sum(abonne.en_attente for abonne in self.abonnes)}"
+                  f" | gén/s: {self.simulateur.generations_par_seconde():,.0f}", flush=True)
+            debut, octets, messages, sautes = maintenant, self.octets, self.messages, self.sautes
+
+
+async def lancer(serveur, hote=None, port=PORT, unix=None, stats=None):
+    """
+    Ouvre le serveur sur un port TCP local ou sur une socket Unix et diffuse jusqu'à l'interruption.
+    Argument : serveur (ServeurSimulation), hote (str), port (int), unix (str ou None, chemin de socket),
+               stats (float ou None, période du rapport de débit en secondes)
+    Return : None
+    """
+    if unix is not None:
+        ecoute = await asyncio.start_unix_server(serveur.servir, path=unix)
+    else:
+        ecoute = await asyncio.start_server(serveur.servir, hote, port)
+    taches = [asyncio.create_task(serveur.diffuser())] # Références gardées pendant toute la diffusion
+    if stats:
+        taches.append(asyncio.create_task(serveur.rapporter(stats)))
+    async with ecoute:
+        await ecoute.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur de simulation : diffuse les changements à plusieurs spectateurs.")
+    parser.add_argument("motif", help="nom d'un motif de MOTIFS ou chemin d'un fichier (.cells, Life 1.06, .rle, .mc)")
+    parser.add_argument("--moteur", choices=sorted(MOTEURS), default="creux", help="moteur d'évolution")
+    parser.add_argument("--regle", help="règle B/S (ex : B36/S23) ou nom connu (HighLife, Seeds...)")
+    parser.add_argument("--hote", default="127.0.0.1", help="adresse d'écoute (par défaut la machine locale seulement)")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", metavar="CHEMIN", help="écoute sur une socket Unix plutôt qu'en TCP")
+    parser.add_argument("--delai", type=float, default=0.05, help="secondes entre deux générations (0 = maximum)")
+    parser.add_argument("--frequence", type=int, default=FREQUENCE, help="états diffusés par seconde au plus")
+    parser.add_argument("--stagnation", type=int, default=10,
+                        help="pause après ce nombre de générations sans changement (0 = désactivé)")
+    parser.add_argument("--stats", type=float, metavar="SECONDES", help="affiche le débit à cette période")
+    args = parser.parse_args(argv)
+
+    grille = creer_grille(args.moteur)
+    try:
+        charger_motif(grille, args.motif)
+        if args.regle:
+            grille.regle = args.regle
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    simulateur = Simulateur(grille, args.stagnation or float("inf"))
+    simulateur.start()
+    simulateur.regler(True, args.delai)
+    adresse = args.unix or f"{args.hote}:{args.port}"
+    print(f"Serveur sur {adresse} ({args.moteur}, {grille.regle.texte})", flush=True)
+    try:
+        asyncio.run(lancer(ServeurSimulation(simulateur, args.frequence), args.hote, args.port, args.unix, args.stats))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulateur.arreter()
+        if hasattr(grille, "fermer"):
+            grille.fermer()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
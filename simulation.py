@@ -0,0 +1,138 @@
+import collections
+import threading
+import time
+
+from profilage import profileur
+
+# État publié pour l'affichage : immuable, il peut être lu sans verrou.
+# cellules est un index_spatial.IndexFige (ensemble de cellules rangées par tuiles),
+# boite la boîte englobante (x_min, y_min, x_max, y_max) ou None si l'univers est vide
+Instantane = collections.namedtuple("Instantane", ["generation", "cellules", "cycle", "boite"])
+
+
+class Simulateur(threading.Thread):
+    """
+    Fait évoluer une grille dans un fil d'exécution séparé de la boucle d'affichage.
+    Après chaque calcul, il publie un instantané immuable dans un double tampon :
+    l'affichage lit le tampon avant pendant que le suivant est préparé à l'arrière.
+    Toute modification de la grille depuis l'extérieur doit se faire sous self.verrou.
+    """
+
+    def __init__(self, grille, seuil_stagnation=10):
+        """
+        Prépare le simulateur (en pause) ; il faut appeler start() pour lancer le fil.
+        Argument : grille (Grille), seuil_stagnation (int, générations figées avant de s'arrêter)
+        Return : None (Constructeur)
+        """
+        super().__init__(daemon=True)
+        self.grille = grille
+        self.verrou = threading.RLock()
+        self.seuil_stagnation = seuil_stagnation
+        self.compteur_stagnation = 0
+        self.stagne = False # Passe à True quand le seuil est atteint (la simulation se met en pause)
+
+        self.en_marche = False
+        self.delai = 0.07 # Secondes entre deux générations ; 0 = vitesse maximale
+        self.releve = None # releve.Releve qui reçoit les statistiques de chaque génération
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+
+        self._tampons = [None, None]
+        self._avant = 0 # Index du tampon lu par l'affichage
+        self._demande = True # L'affichage attend un nouvel instantané
+        self.publier()
+
+        # Mesure du débit (générations par seconde) sur une fenêtre glissante
+        self._mesures = collections.deque(maxlen=120)
+
+    def regler(self, en_marche, delai):
+        """
+        Met en marche / en pause et règle la vitesse.
+        Argument : en_marche (bool), delai (float, secondes entre deux générations, 0 = maximum)
+        Return : None
+        """
+        if en_marche and not self.en_marche:
+            self.compteur_stagnation = 0
+            self.stagne = False
+        self.en_marche = en_marche
+        self.delai = delai
+        self._reveil.set()
+
+    def arreter(self):
+        """
+        Termine le fil de simulation.
+        Argument : Aucun
+        Return : None
+        """
+        self._arret.set()
+        self._reveil.set()
+
+    def publier(self):
+        """
+        Copie l'état courant dans le tampon arrière puis l'échange avec le tampon avant.
+        Argument : Aucun
+        Return : None
+        """
+        with self.verrou, profileur.mesurer("publication"):
+            arriere = 1 - self._avant
+            # Copie figée de l'index spatial : seules les tuiles modifiées sont recopiées
+            self._tampons[arriere] = Instantane(self.grille.generation, self.grille.index_spatial().figer(),
+                                                getattr(self.grille, "cycle", None), self.grille.boite_englobante())
+            self._avant = arriere
+            self._demande = False
+
+    def instantane(self):
+        """
+        Dernier état publié ; signale en même temps qu'un nouvel instantané est attendu.
+        Argument : Aucun
+        Return : Instantane
+        """
+        self._demande = True
+        return self._tampons[self._avant]
+
+    def generations_par_seconde(self):
+        """
+        Débit de la simulation sur la dernière seconde environ.
+        Argument : Aucun
+        Return : float
+        """
+        maintenant = time.perf_counter()
+        recentes = [(t, n) for (t, n) in self._mesures if maintenant - t <= 1.0]
+        if not self.en_marche or len(recentes) < 2:
+            return 0.0
+        (t0, n0), (t1, n1) = recentes[0], recentes[-1]
+        return (n1 - n0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def run(self):
+        generations = 0
+        while not self._arret.is_set():
+            if not self.en_marche:
+                self._reveil.wait(0.1)
+                self._reveil.clear()
+                continue
+
+            debut = time.perf_counter()
+            with self.verrou:
+                a_bouge = self.grille.evoluer()
+                if self.releve is not None:
+                    self.releve.ecrire(self.grille.statistiques())
+                # Seul un état inchangé compte comme une stagnation : un oscillateur continue,
+                # son cycle est seulement publié avec l'instantané (HUD) ; simuler.py peut s'y arrêter
+                if not a_bouge:
+                    self.compteur_stagnation += 1
+                    if self.compteur_stagnation >= self.seuil_stagnation:
+                        self.stagne = True
+                        self.en_marche = False
+                else:
+                    self.compteur_stagnation = 0
+                # À vitesse maximale, on ne copie l'état que lorsque l'affichage l'a consommé
+                if self.delai or self._demande or not self.en_marche:
+                    self.publier()
+            generations += 1
+            self._mesures.append((time.perf_counter(), generations))
+
+            if self.delai:
+                restant = self.delai - (time.perf_counter() - debut)
+                if restant > 0:
+                    self._reveil.wait(restant)
+                    self._reveil.clear()
@@ -0,0 +1,216 @@
+"""
+Simulation en ligne de commande, sans pygame ni fenêtre.
+
+    python simuler.py "Canon de Gosper" -n 10000
+    python simuler.py motif.cells --moteur tuiles --stagnation 0
+    python simuler.py breeder.mc --moteur hashlife -n 100000 --sauvegarde suite.mc
+    python simuler.py "Canon de Gosper" -n 2000 --profil trace.csv
+    python simuler.py soupe.rle -n 100000 --releve stats.csv
+    python simuler.py breeder.rle --moteur disque --memoire 512 --dossier-tuiles /var/tmp
+"""
+import argparse
+import os
+import sys
+import time
+
+from formats import charger_fichier, enregistrer_fichier
+from moteurs import MOTEURS, creer_grille
+from motifs import MOTIFS
+from profilage import profileur
+from releve import Releve
+
+
+def charger_motif(grille, nom_ou_chemin):
+    """
+    Remplace le contenu de la grille par un motif de MOTIFS ou par celui d'un fichier
+    (.cells, Life 1.06, RLE, Macrocell) ; un fichier RLE ou Macrocell peut aussi fixer la génération.
+    Argument : grille (Grille), nom_ou_chemin (str, clé de MOTIFS ou chemin de fichier)
+    Return : None
+    """
+    if nom_ou_chemin in MOTIFS:
+        grille.cellules = set(MOTIFS[nom_ou_chemin])
+        return
+    if os.path.isfile(nom_ou_chemin):
+        charger_fichier(grille, nom_ou_chemin)
+        return
+    raise ValueError(f"Motif introuvable : {nom_ou_chemin} (ni dans MOTIFS, ni un fichier)")
+
+
+def simuler(grille, nb_generations, seuil_stagnation=10, duree_max=None, cycles="ignorer", releve=None):
+    """
+    Fait évoluer la grille à pleine vitesse jusqu'à nb_generations, jusqu'à la stagnation
+    ou jusqu'à ce que duree_max secondes soient écoulées.
+    Quand la grille détecte un cycle (période, dx, dy), cycles vaut "arret" pour s'arrêter,
+    "avance" pour sauter directement au bout du calcul par translation, ou "ignorer".
+    Un moteur qui sait sauter 2^k générations (HashLife) avance par les plus grands sauts
+    possibles ; le relevé reçoit alors une ligne par saut au lieu d'une par génération,
+    et mises_a_jour vaut None : les générations sautées ne calculent pas leurs cellules une à une.
+    Argument : grille (Grille), nb_generations (int), seuil_stagnation (int, 0 = jamais d'arrêt),
+               duree_max (float ou None), cycles (str), releve (Releve ou None)
+    Return : dict (generations : calculées, sautees : franchies par translation d'un cycle,
+                   mises_a_jour, population, duree, stagne, cycle)
+    """
+    generations = 0
+    sautees = 0
+    mises_a_jour = 0 # Somme des populations traitées à chaque génération
+    par_sauts = False # Au moins un saut de plus d'une génération
+    compteur_stagnation = 0
+    debut = time.perf_counter()
+    cycle = None
+    sauter = getattr(grille, "sauter", None)
+    immobile = True # Dernier pas sans changement (au départ, on vérifie avant de sauter)
+    while generations + sautees < nb_generations:
+        # Un état inchangé après un saut de 2^k peut être un oscillateur : la stagnation
+        # se vérifie génération par génération
+        if sauter is not None and not (seuil_stagnation and immobile):
+            saut = (nb_generations - generations - sautees).bit_length() - 1
+        else:
+            saut = 0
+        if saut:
+            par_sauts = True
+        else:
+            mises_a_jour += grille.population()
+        a_change = sauter(saut) if sauter is not None else grille.evoluer()
+        immobile = not a_change
+        if releve is not None:
+            releve.ecrire(grille.statistiques())
+        profileur.image_terminee() # Sans affichage, une ligne de trace par génération (ou par saut)
+        generations += 1 << saut
+
+        if cycles != "ignorer" and getattr(grille, "cycle", None) is not None:
+            cycle = grille.cycle
+            if cycles == "arret":
+                break
+            # L'état se répète à une translation près : on saute les périodes restantes
+            periode, dx, dy = cycle
+            k = (nb_generations - generations - sautees) // periode
+            if k:
+                grille.cellules = {(x + k * dx, y + k * dy) for (x, y) in grille.cellules}
+                grille.generation += k * periode
+                sautees += k * periode
+        if a_change:
+            compteur_stagnation = 0
+        elif not saut:
+            compteur_stagnation += 1
+            if seuil_stagnation and compteur_stagnation >= seuil_stagnation:
+                break
+        if duree_max is not None and time.perf_counter() - debut >= duree_max:
+            break
+    duree = time.perf_counter() - debut
+    return {
+        "generations": generations,
+        "sautees": sautees,
+        "mises_a_jour": None if par_sauts else mises_a_jour,
+        "population": grille.population(),
+        "duree": duree,
+        "stagne": bool(seuil_stagnation) and compteur_stagnation >= seuil_stagnation,
+        "cycle": cycle,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jeu de la Vie sans affichage (serveurs de calcul).")
+    parser.add_argument("motif", help="nom d'un motif de MOTIFS ou chemin d'un fichier (.cells, Life 1.06, .rle, .mc)")
+    parser.add_argument("-n", "--generations", type=int, default=1000, help="nombre maximal de générations")
+    parser.add_argument("--stagnation", type=int, default=10,
+                        help="arrêt après ce nombre de générations sans changement (0 = désactivé)")
+    parser.add_argument("--moteur", choices=sorted(MOTEURS), default="creux", help="moteur d'évolution")
+    parser.add_argument("--cycles", choices=["arret", "avance", "ignorer"], default="ignorer",
+                        help="que faire d'un cycle détecté (oscillateur, vaisseau) : s'arrêter, "
+                             "sauter au bout du calcul, ou continuer (par défaut)")
+    parser.add_argument("--regle", help="règle B/S (ex : B36/S23) ou nom connu (HighLife, Seeds...) ; "
+                                        "par défaut celle du fichier, sinon B3/S23")
+    parser.add_argument("--sauvegarde", metavar="FICHIER",
+                        help="enregistre l'état final (.rle ou .mc) pour reprendre le calcul plus tard")
+    parser.add_argument("--memoire", type=int, metavar="MO",
+                        help="moteur disque : mémoire maximale des tuiles, au-delà déversées sur le disque")
+    parser.add_argument("--dossier-tuiles", metavar="DOSSIER",
+                        help="moteur disque : dossier du fichier de déversement (éviter un /tmp en RAM)")
+    parser.add_argument("--releve", metavar="FICHIER",
+                        help="écrit population, naissances, morts et boîte englobante de chaque génération (.csv ou .json)")
+    parser.add_argument("--profil", metavar="FICHIER",
+                        help="chronomètre les phases de chaque génération et écrit la trace (.csv ou .json)")
+    args = parser.parse_args(argv)
+
+    if args.sauvegarde and not args.sauvegarde.lower().endswith((".rle", ".mc")):
+        parser.error("--sauvegarde : extension .rle ou .mc attendue")
+    if args.profil and not args.profil.lower().endswith((".csv", ".json")):
+        parser.error("--profil : extension .csv ou .json attendue")
+    if args.releve and not args.releve.lower().endswith((".csv", ".json")):
+        parser.error("--releve : extension .csv ou .json attendue")
+
+    options = {}
+    if args.memoire is not None or args.dossier_tuiles is not None:
+        if args.moteur != "disque":
+            parser.error("--memoire et --dossier-tuiles ne s'appliquent qu'au moteur disque")
+        if args.memoire is not None:
+            options["memoire_max"] = args.memoire << 20
+        if args.dossier_tuiles is not None:
+            options["dossier"] = args.dossier_tuiles
+
+    grille = creer_grille(args.moteur, **options)
+    try:
+        if args.cycles != "ignorer" and not grille.detection_cycles:
+            raise ValueError(f"--cycles : le moteur {args.moteur} ne détecte pas les cycles (seul creux le fait)")
+        charger_motif(grille, args.motif)
+        if args.regle:
+            grille.regle = args.regle
+    except (ValueError, OSError) as e:
+        if hasattr(grille, "fermer"):
+            grille.fermer()
+        parser.error(str(e))
+
+    profileur.activer(bool(args.profil))
+    releve = Releve(args.releve) if args.releve else None
+    try:
+        resultat = simuler(grille, args.generations, args.stagnation, cycles=args.cycles, releve=releve)
+    finally:
+        if releve is not None:
+            releve.fermer()
+    boite = grille.boite_englobante()
+    if args.profil:
+        profileur.exporter(args.profil)
+        profileur.activer(False)
+    if args.sauvegarde:
+        enregistrer_fichier(grille, args.sauvegarde)
+    stockage = grille.statistiques_stockage() if hasattr(grille, "statistiques_stockage") else None
+    if hasattr(grille, "fermer"):
+        grille.fermer()
+
+    duree = resultat["duree"]
+    print(f"Moteur           : {args.moteur}")
+    print(f"Règle            : {grille.regle.texte}")
+    print(f"Générations      : {resultat['generations']}" + (" (stagnation)" if resultat["stagne"] else ""))
+    if resultat["sautees"]:
+        print(f"Sautées          : {resultat['sautees']} (translation du cycle, non calculées)")
+    if grille.generation != resultat["generations"]:
+        print(f"Génération finale: {grille.generation}")
+    if resultat["cycle"] is not None:
+        periode, dx, dy = resultat["cycle"]
+        print(f"Cycle détecté    : période {periode}, déplacement ({dx}, {dy})")
+    print(f"Population finale: {resultat['population']}")
+    if boite is not None:
+        x_min, y_min, x_max, y_max = boite
+        print(f"Étendue          : {x_max - x_min + 1} x {y_max - y_min + 1} (x {x_min}..{x_max}, y {y_min}..{y_max})")
+    print(f"Temps écoulé     : {duree:.3f} s")
+    if duree > 0:
+        print(f"Générations/s    : {resultat['generations'] / duree:,.1f}")
+        if resultat["mises_a_jour"] is not None:
+            print(f"Cellules/s       : {resultat['mises_a_jour'] / duree:,.0f}")
+        else:
+            print("Cellules/s       : - (sauts de 2^k générations : seul le débit en générations a un sens)")
+    if stockage is not None:
+        print(f"Tuiles           : {stockage['residentes']} en mémoire ({stockage['octets_memoire'] >> 10} Ko), "
+              f"{stockage['deversees']} sur disque ({stockage['octets_disque'] >> 10} Ko)")
+        print(f"Échanges disque  : {stockage['lectures']} lectures, {stockage['ecritures']} écritures")
+    if releve is not None:
+        print(f"Relevé           : {args.releve} ({releve.nb_lignes} générations)")
+    if args.profil:
+        print(f"Trace            : {args.profil}")
+        for nom, stats in profileur.statistiques().items():
+            print(f"  {nom:<15}: moy {stats['moyenne']:.3f} ms, p95 {stats['p95']:.3f} ms, p99 {stats['p99']:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
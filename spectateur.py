@@ -0,0 +1,262 @@
+"""
+Client léger du serveur de simulation (serveur.py) : ne calcule rien, reçoit seulement
+les naissances et les morts de la zone affichée et les reporte dans un index local.
+
+    python spectateur.py --port 8765
+    python spectateur.py --unix /tmp/vie.sock
+    python spectateur.py --banc 50 --duree 10  # débit soutenu avec 50 clients sans fenêtre
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+
+import pygame
+
+from index_spatial import IndexTuiles
+from main import FPS, HAUTEUR_INIT, LARGEUR_INIT
+from rendu import BLANC, GRIS_CLAIR, GRIS_FONCE, dessiner_cellules, dessiner_grillage, rectangle_visible, zoomer_autour
+from serveur import DELTA, IMAGE_CLE, PORT, decoder_image, encoder_visee, lire_message
+
+
+class Abonnement:
+    """
+    Connexion à un serveur de simulation et copie locale des cellules du rectangle suivi.
+    Après chaque message, un IndexFige est publié dans self.cellules : l'affichage peut
+    le lire depuis un autre fil sans verrou.
+    """
+
+    def __init__(self):
+        self.index = IndexTuiles()
+        self.cellules = self.index.figer()
+        self.generation = 0
+        self.population = 0
+        self.octets = 0 # Octets reçus depuis la connexion
+        self.messages = 0
+        self._lecteur = None
+        self._ecrivain = None
+
+    async def connecter(self, hote="127.0.0.1", port=PORT, unix=None):
+        """
+        Ouvre la connexion (TCP local ou socket Unix).
+        Argument : hote (str), port (int), unix (str ou None)
+        Return : None
+        """
+        if unix is not None:
+            self._lecteur, self._ecrivain = await asyncio.open_unix_connection(unix)
+        else:
+            self._lecteur, self._ecrivain = await asyncio.open_connection(hote, port)
+
+    def viser(self, x_min, y_min, x_max, y_max):
+        """
+        Demande les cellules d'un autre rectangle (bornes incluses) ; le serveur répond par une image clé.
+        À appeler depuis la boucle asyncio de la connexion.
+        Argument : x_min, y_min, x_max, y_max (int)
+        Return : None
+        """
+        self._ecrivain.write(encoder_visee(x_min, y_min, x_max, y_max))
+
+    async def recevoir(self):
+        """
+        Applique les messages du serveur jusqu'à la déconnexion.
+        Argument : Aucun
+        Return : None
+        """
+        try:
+            while True:
+                type_message, contenu = await lire_message(self._lecteur)
+                if type_message not in (IMAGE_CLE, DELTA):
+                    continue
+                self.generation, self.population, apparues, disparues = decoder_image(contenu)
+                if type_message == IMAGE_CLE:
+                    self.index = IndexTuiles(apparues)
+                else:
+                    self.index.appliquer(apparues, disparues)
+                self.cellules = self.index.figer()
+                self.octets += len(contenu) + 5
+                self.messages += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def fermer(self):
+        if self._ecrivain is not None:
+            self._ecrivain.close()
+
+
+class Spectateur:
+    """
+    Fenêtre pygame qui affiche un Abonnement : glisser pour se déplacer, molette pour zoomer.
+    La connexion tourne dans sa propre boucle asyncio, dans un fil séparé.
+    """
+
+    def __init__(self, hote="127.0.0.1", port=PORT, unix=None):
+        """
+        Ouvre la fenêtre et se connecte au serveur.
+        Argument : hote (str), port (int), unix (str ou None)
+        Return : None (Constructeur)
+        """
+        pygame.init()
+        self.screen = pygame.display.set_mode((LARGEUR_INIT, HAUTEUR_INIT), pygame.RESIZABLE)
+        pygame.display.set_caption("Jeu de la Vie - spectateur")
+        self.clock = pygame.time.Clock()
+        self.font_ui = pygame.font.Font("assets/font.ttf", 18)
+        self.calque = None
+
+        self.taille_cellule = 10
+        self.offset_x = LARGEUR_INIT // 2
+        self.offset_y = HAUTEUR_INIT // 2
+        self.rectangle = None # Dernier rectangle demandé au serveur
+        self.dragging = False
+
+        self.abonnement = Abonnement()
+        self.boucle = asyncio.new_event_loop()
+        self.boucle.run_until_complete(self.abonnement.connecter(hote, port, unix))
+        threading.Thread(target=self.boucle.run_until_complete, args=(self.abonnement.recevoir(),),
+                         daemon=True).start()
+
+    def rectangle_visible(self):
+        """
+        Cellules couvertes par la fenêtre.
+        Argument : Aucun
+        Return : tuple (x_min, y_min, x_max, y_max)
+        """
+        return rectangle_visible(*self.screen.get_size(), self.taille_cellule, self.offset_x, self.offset_y)
+
+    def suivre_camera(self):
+        # Le serveur n'envoie que ce qui est visible : chaque mouvement de caméra change l'abonnement
+        rectangle = self.rectangle_visible()
+        if rectangle != self.rectangle:
+            self.rectangle = rectangle
+            self.boucle.call_soon_threadsafe(self.abonnement.viser, *rectangle)
+
+    def zoomer(self, sens, position):
+        """
+        Change la taille des cellules (mêmes paliers que main.py) en gardant fixe la cellule sous la souris.
+        Argument : sens (int, positif pour zoomer), position (tuple, pixel de la souris)
+        Return : None
+        """
+        self.taille_cellule, self.offset_x, self.offset_y = zoomer_autour(
+            self.taille_cellule, self.offset_x, self.offset_y, sens, position)
+
+    def gestion_evenements(self):
+        """
+        Gère la fermeture, le déplacement et le zoom.
+        Argument : Aucun
+        Return : bool (False quand la fenêtre est fermée)
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return False
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.dragging = True
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                self.dragging = False
+            elif event.type == pygame.MOUSEMOTION and self.dragging:
+                self.offset_x += event.rel[0]
+                self.offset_y += event.rel[1]
+            elif event.type == pygame.MOUSEWHEEL:
+                self.zoomer(event.y, pygame.mouse.get_pos())
+        return True
+
+    def dessiner_cellules(self, cellules):
+        """
+        Dessine les cellules reçues, comme main.py (rendu.dessiner_cellules).
+        Argument : cellules (IndexFige)
+        Return : None
+        """
+        self.calque = dessiner_cellules(self.screen, cellules.dans(*self.rectangle_visible()), self.taille_cellule,
+                                        self.offset_x, self.offset_y, self.calque)
+
+    def afficher(self):
+        """
+        Dessine le fond, les cellules et le bandeau d'informations.
+        Argument : Aucun
+        Return : None
+        """
+        abonnement = self.abonnement
+        self.screen.fill(BLANC)
+        dessiner_grillage(self.screen, self.taille_cellule, self.offset_x, self.offset_y, GRIS_CLAIR)
+        self.dessiner_cellules(abonnement.cellules)
+        infos = (f"Génération: {abonnement.generation} | Population: {abonnement.population}"
+                 f" | Reçu: {abonnement.octets // 1024} Ko")
+        txt = self.font_ui.render(infos, True, GRIS_FONCE)
+        self.screen.blit(txt, (10, 10))
+        pygame.display.flip()
+
+    def run(self):
+        """
+        Boucle d'affichage jusqu'à la fermeture de la fenêtre.
+        Argument : Aucun
+        Return : None
+        """
+        while self.gestion_evenements():
+            self.suivre_camera()
+            self.afficher()
+            self.clock.tick(FPS)
+        self.boucle.call_soon_threadsafe(self.abonnement.fermer)
+        pygame.quit()
+
+
+async def banc(nb_clients, duree, largeur, hauteur, hote="127.0.0.1", port=PORT, unix=None):
+    """
+    Connecte nb_clients abonnements sans fenêtre et mesure ce qu'ils reçoivent pendant duree secondes.
+    Les rectangles sont décalés d'un client à l'autre pour que le serveur calcule des changements différents.
+    Argument : nb_clients (int), duree (float), largeur, hauteur (int, taille des rectangles en cellules),
+               hote (str), port (int), unix (str ou None)
+    Return : dict (clients, messages_par_seconde, octets_par_seconde, generations_par_seconde)
+    """
+    abonnements = [Abonnement() for _ in range(nb_clients)]
+    for i, abonnement in enumerate(abonnements):
+        await abonnement.connecter(hote, port, unix)
+        x0, y0 = -largeur // 2 + (i % 8) * 16, -hauteur // 2 + (i // 8 % 8) * 16
+        abonnement.viser(x0, y0, x0 + largeur - 1, y0 + hauteur - 1)
+    receptions = [asyncio.create_task(a.recevoir()) for a in abonnements]
+    await asyncio.sleep(1.0) # Images clés et montée en charge hors mesure
+    octets = sum(a.octets for a in abonnements)
+    messages = sum(a.messages for a in abonnements)
+    generations = [a.generation for a in abonnements]
+    debut = time.perf_counter()
+    await asyncio.sleep(duree)
+    ecoule = time.perf_counter() - debut
+    resultat = {
+        "clients": nb_clients,
+        "messages_par_seconde": (sum(a.messages for a in abonnements) - messages) / ecoule,
+        "octets_par_seconde": (sum(a.octets for a in abonnements) - octets) / ecoule,
+        # Générations vues par un client moyen : plus basse que celle du serveur si les clients sautent des états
+        "generations_par_seconde": sum(a.generation - g for a, g in zip(abonnements, generations)) / nb_clients / ecoule,
+    }
+    for abonnement in abonnements:
+        abonnement.fermer()
+    for reception in receptions:
+        reception.cancel()
+    return resultat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spectateur d'un serveur de simulation (serveur.py).")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", metavar="CHEMIN", help="socket Unix du serveur")
+    parser.add_argument("--banc", type=int, metavar="CLIENTS", help="mesure le débit avec ce nombre de clients sans fenêtre")
+    parser.add_argument("--duree", type=float, default=10.0, help="durée de la mesure (--banc), en secondes")
+    parser.add_argument("--taille", type=int, nargs=2, default=[200, 150], metavar=("LARGEUR", "HAUTEUR"),
+                        help="rectangle suivi par chaque client (--banc), en cellules")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.banc:
+            r = asyncio.run(banc(args.banc, args.duree, *args.taille, args.hote, args.port, args.unix))
+            print(f"Clients          : {r['clients']}")
+            print(f"Messages/s       : {r['messages_par_seconde']:,.1f}")
+            print(f"Débit            : {r['octets_par_seconde'] / 1024:,.1f} Ko/s")
+            print(f"Générations/s    : {r['generations_par_seconde']:,.1f} (par client)")
+        else:
+            Spectateur(args.hote, args.port, args.unix).run()
+    except OSError as e:
+        parser.error(f"connexion impossible : {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import itertools
+
+import numpy as np
+
+from grille import GrilleSansSuivi, VueCellules
+
+TAILLE_TUILE = 64
+TUILES_PAR_LOT = 512 # Tuiles recalculées à la fois (borne la mémoire temporaire)
+CELLULES_PAR_LOT = 1 << 20 # Cellules chargées à la fois
+
+# (dx, dy) des 8 tuiles voisines et de la tuile elle-même
+VOISINAGE_TUILES = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+NEUF = np.uint8(9)
+
+
+class GrilleTuiles(GrilleSansSuivi):
+    """
+    Moteur par tuiles NumPy : l'univers infini est découpé en tuiles de
+    TAILLE_TUILE x TAILLE_TUILE cellules stockées dans un dictionnaire.
+    Les voisins sont comptés par sommes de tableaux décalés, et seules les
+    tuiles dont le voisinage a changé à la génération précédente sont recalculées.
+    """
+
+    def __init__(self):
+        """
+        Initialise un univers vide.
+        Argument : Aucun
+        Return : None (Constructeur)
+        """
+        self._tuiles = self._creer_tuiles() # (tx, ty) -> tableau uint8 [y, x] de 0 et de 1
+        self._calculees = self._creer_tampon() # Tuiles de la génération suivante, en attente d'écriture
+        self._actives = set() # Tuiles modifiées à la dernière génération
+        self._vue = None
+        self._perimees = False # True si la vue a été modifiée depuis la dernière synchro
+        super().__init__()
+
+    def _creer_tuiles(self):
+        """Conteneur des tuiles : un dictionnaire, ou tout objet qui en a l'interface."""
+        return {}
+
+    def _creer_tampon(self):
+        """Conteneur des tuiles calculées pendant une génération, de même interface."""
+        return self._creer_tuiles()
+
+    # --- Vue ensembliste ---
+    @property
+    def cellules(self):
+        if self._vue is None:
+            self._vue = VueCellules(self._lister(), self._vue_modifiee)
+        return self._vue
+
+    @cellules.setter
+    def cellules(self, valeur):
+        self._charger(valeur)
+        self._vue = None
+        self._perimees = False
+
+    def _regle_changee(self):
+        # Une autre règle peut réveiller les zones figées : toutes les tuiles sont à recalculer
+        super()._regle_changee()
+        self._actives = set(self._tuiles)
+
+    def _vue_modifiee(self, cellule=None):
+        # On ne recharge les tuiles qu'au prochain calcul : les ajouts en rafale restent en O(1)
+        self._perimees = True
+
+    def _synchroniser(self):
+        """
+        Reconstruit les tuiles depuis la vue si celle-ci a été modifiée directement.
+        Argument : Aucun
+        Return : None
+        """
+        if self._perimees:
+            self._charger(self._vue)
+            self._perimees = False
+
+    def _charger(self, cellules):
+        """
+        Remplace le contenu des tuiles par les cellules données ; toutes deviennent actives.
+        Les cellules sont lues par lots de CELLULES_PAR_LOT, sans liste complète en mémoire.
+        Argument : cellules (itérable de tuples (x, y))
+        Return : None
+        """
+        self._tuiles.clear()
+        cellules = iter(cellules)
+        while True:
+            coords = np.array(list(itertools.islice(cellules, CELLULES_PAR_LOT)), dtype=np.int64).reshape(-1, 2)
+            if not len(coords):
+                break
+            tx, ty = coords[:, 0] // TAILLE_TUILE, coords[:, 1] // TAILLE_TUILE
+            lx, ly = coords[:, 0] % TAILLE_TUILE, coords[:, 1] % TAILLE_TUILE
+            # Tri par tuile pour remplir chaque tableau en une seule affectation
+            ordre = np.lexsort((ty, tx))
+            tx, ty, lx, ly = tx[ordre], ty[ordre], lx[ordre], ly[ordre]
+            debuts = np.flatnonzero(np.r_[True, (tx[1:] != tx[:-1]) | (ty[1:] != ty[:-1])])
+            fins = np.r_[debuts[1:], len(tx)]
+            for d, f in zip(debuts, fins):
+                cle = (int(tx[d]), int(ty[d]))
+                tuile = self._tuiles.get(cle) # Déjà entamée par un lot précédent ?
+                if tuile is None:
+                    tuile = np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.uint8)
+                tuile[ly[d:f], lx[d:f]] = 1
+                self._tuiles[cle] = tuile
+        self._actives = set(self._tuiles)
+
+    def _lister(self):
+        """
+        Liste les coordonnées absolues de toutes les cellules vivantes.
+        Argument : Aucun
+        Return : list de tuples (x, y)
+        """
+        cellules = []
+        for (tx, ty), tuile in self._tuiles.items():
+            ly, lx = np.nonzero(tuile)
+            cellules.extend(zip((lx + tx * TAILLE_TUILE).tolist(), (ly + ty * TAILLE_TUILE).tolist()))
+        return cellules
+
+    # --- Évolution ---
+    def ajouter_ou_supprimer(self, x, y):
+        self._synchroniser()
+        cle = (x // TAILLE_TUILE, y // TAILLE_TUILE)
+        tuile = self._tuiles.get(cle)
+        if tuile is None:
+            tuile = self._tuiles[cle] = np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.uint8)
+        tuile[y % TAILLE_TUILE, x % TAILLE_TUILE] ^= 1
+        if tuile.any():
+            self._tuiles[cle] = tuile # Réécrite pour les conteneurs qui n'en gardent qu'une copie
+        else:
+            del self._tuiles[cle]
+        self._actives.add(cle)
+        self._vue = None
+
+    def evoluer(self):
+        """
+        Calcule la génération suivante sur les seules tuiles dont le voisinage a bougé,
+        par lots de TUILES_PAR_LOT tuiles.
+        Argument : Aucun
+        Return : bool (True si l'état a changé)
+        """
+        self._synchroniser()
+        self.generation += 1
+
+        # Une tuile ne peut changer que si elle ou une de ses voisines a changé
+        candidates = list({(tx + dx, ty + dy) for (tx, ty) in self._actives for dx, dy in VOISINAGE_TUILES})
+        if not candidates:
+            return False
+
+        # Les lots suivants lisent encore l'état courant : les tuiles calculées attendent dans
+        # self._calculees (qui peut lui-même déverser) et ne sont écrites qu'à la fin
+        calculees, videes = self._calculees, []
+        for debut in range(0, len(candidates), TUILES_PAR_LOT):
+            lot = candidates[debut:debut + TUILES_PAR_LOT]
+            nouvelles, changees, occupees = self._calculer_lot(lot)
+            for i in np.flatnonzero(changees):
+                if occupees[i]:
+                    calculees[lot[i]] = nouvelles[i].copy()
+                else:
+                    videes.append(lot[i])
+
+        # Création / libération automatique des tuiles
+        self._actives = set(videes)
+        for cle, tuile in calculees.items():
+            self._tuiles[cle] = tuile
+            self._actives.add(cle)
+        calculees.clear()
+        for cle in videes:
+            if cle in self._tuiles:
+                del self._tuiles[cle]
+
+        if self._actives:
+            self._vue = None
+        return bool(self._actives)
+
+    def _calculer_lot(self, candidates):
+        """
+        Calcule l'état suivant d'un lot de tuiles à partir de l'état courant.
+        Argument : candidates (list de clés (tx, ty))
+        Return : tuple (tableau uint8 des nouvelles tuiles, bool par tuile : changée, bool par tuile : occupée)
+        """
+        # Empile toutes les tuiles utiles ; la dernière entrée est une tuile vide
+        index = {}
+        blocs = []
+        for (tx, ty) in candidates:
+            for dx, dy in VOISINAGE_TUILES:
+                cle = (tx + dx, ty + dy)
+                if cle not in index and cle in self._tuiles:
+                    index[cle] = len(blocs)
+                    blocs.append(self._tuiles[cle])
+        vide = len(blocs)
+        blocs.append(np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.uint8))
+        pile = np.stack(blocs)
+
+        def voisines(dx, dy):
+            return np.array([index.get((tx + dx, ty + dy), vide) for (tx, ty) in candidates])
+
+        # Tuiles bordées d'une cellule empruntée aux 8 voisines
+        t = TAILLE_TUILE
+        bord = np.empty((len(candidates), t + 2, t + 2), dtype=np.uint8)
+        bord[:, 1:-1, 1:-1] = pile[voisines(0, 0)]
+        bord[:, 0, 1:-1] = pile[voisines(0, -1), -1, :]
+        bord[:, -1, 1:-1] = pile[voisines(0, 1), 0, :]
+        bord[:, 1:-1, 0] = pile[voisines(-1, 0), :, -1]
+        bord[:, 1:-1, -1] = pile[voisines(1, 0), :, 0]
+        bord[:, 0, 0] = pile[voisines(-1, -1), -1, -1]
+        bord[:, 0, -1] = pile[voisines(1, -1), -1, 0]
+        bord[:, -1, 0] = pile[voisines(-1, 1), 0, -1]
+        bord[:, -1, -1] = pile[voisines(1, 1), 0, 0]
+
+        # --- PHASE A : RECENSEMENT (sommes de 8 tableaux décalés) ---
+        nb_voisins = (bord[:, :-2, :-2] + bord[:, :-2, 1:-1] + bord[:, :-2, 2:]
+                      + bord[:, 1:-1, :-2] + bord[:, 1:-1, 2:]
+                      + bord[:, 2:, :-2] + bord[:, 2:, 1:-1] + bord[:, 2:, 2:])
+
+        # --- PHASE B : SÉLECTION (bit 9 * vivante + nb_voisins du masque de la règle) ---
+        centre = bord[:, 1:-1, 1:-1]
+        nouvelles = (np.uint32(self.regle.masque) >> (nb_voisins + NEUF * centre)).astype(np.uint8) & 1
+
+        changees = (nouvelles != centre).any(axis=(1, 2))
+        occupees = nouvelles.any(axis=(1, 2))
+        return nouvelles, changees, occupees
+
+    def population(self):
+        """
+        Nombre de cellules vivantes, calculé sur les tuiles.
+        Argument : Aucun
+        Return : int
+        """
+        self._synchroniser()
+        return int(sum(int(tuile.sum()) for tuile in self._tuiles.values()))
@@ -0,0 +1,159 @@
+"""
+Vérification croisée des moteurs et des formats de fichier : chaque moteur de MOTEURS
+est comparé génération par génération à Grille(mode="reference") sous plusieurs règles,
+sur tous les MOTIFS et sur des soupes aléatoires, puis chaque état est sauvegardé en RLE
+et en Macrocell et relu. Le code de sortie vaut 1 dès qu'un écart est trouvé.
+
+    python verifier.py
+    python verifier.py --moteurs tuiles bits --regles Conway HighLife -n 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmark import soupe
+from formats import charger_fichier, enregistrer_fichier
+from grille import Grille
+from moteurs import MOTEURS, creer_grille
+from motifs import MOTIFS
+from regles import REGLES_CONNUES, compiler_regle
+
+TAILLES_SOUPES = [200, 2000]
+DECALAGE_SOUPES = (-1037, -211) # Coordonnées négatives et non alignées sur les tuiles
+FORMATS = (".rle", ".mc")
+
+
+def cas_de_test(tailles_soupes, graine):
+    """
+    Motifs de départ : tous les MOTIFS et une soupe par taille demandée.
+    Argument : tailles_soupes (list d'int, cellules vivantes par soupe), graine (int)
+    Return : list de tuples (nom, set de tuples (x, y))
+    """
+    cas = [(nom, set(cellules)) for nom, cellules in MOTIFS.items()]
+    dx, dy = DECALAGE_SOUPES
+    for n in tailles_soupes:
+        cas.append((f"soupe:{n}", {(x + dx, y + dy) for (x, y) in soupe(n, graine)}))
+    return cas
+
+
+def comparer(grille, regle, cellules, nb_generations):
+    """
+    Fait évoluer le moteur et la grille de référence côte à côte et compare leurs
+    cellules, leur population et leur boîte englobante à chaque génération.
+    Un moteur qui sait sauter 2^k générations (HashLife) est aussi vérifié par sauts.
+    Argument : grille (Grille ou sous-classe, réutilisée d'un cas à l'autre), regle (Regle),
+               cellules (set de tuples), nb_generations (int)
+    Return : str décrivant le premier écart, ou None
+    """
+    reference = Grille(mode="reference")
+    reference.regle = regle
+    reference.cellules = set(cellules)
+    grille.regle = regle
+    grille.cellules = set(cellules)
+    grille.generation = 0
+    etats = {0: set(cellules)}
+    for generation in range(1, nb_generations + 1):
+        reference.evoluer()
+        grille.evoluer()
+        attendues = etats[generation] = set(reference.cellules)
+        obtenues = set(grille.cellules)
+        if obtenues != attendues:
+            return (f"génération {generation} : {len(obtenues - attendues)} cellules en trop,"
+                    f" {len(attendues - obtenues)} manquantes")
+        if grille.population() != len(attendues):
+            return f"génération {generation} : population {grille.population()} au lieu de {len(attendues)}"
+        if grille.boite_englobante() != reference.boite_englobante():
+            return (f"génération {generation} : boîte englobante {grille.boite_englobante()}"
+                    f" au lieu de {reference.boite_englobante()}")
+
+    sauter = getattr(grille, "sauter", None)
+    if sauter is not None:
+        grille.cellules = set(cellules)
+        grille.generation = 0
+        saut = 0
+        # Sauts successifs de 1, 2, 4... : après sauter(saut), l'univers est à la génération 2^(saut+1) - 1
+        while (2 << saut) - 1 <= nb_generations:
+            sauter(saut)
+            if set(grille.cellules) != etats[grille.generation]:
+                return f"sauter({saut}) : état faux à la génération {grille.generation}"
+            saut += 1
+    return None
+
+
+def aller_retour(grille, regle, cellules, dossier):
+    """
+    Sauvegarde un état dans chaque format de FORMATS puis le recharge dans le même moteur :
+    cellules, génération et règle doivent revenir à l'identique.
+    Argument : grille (Grille ou sous-classe), regle (Regle), cellules (set de tuples),
+               dossier (str, dossier temporaire des fichiers)
+    Return : list de str (un écart par format fautif)
+    """
+    ecarts = []
+    for extension in FORMATS:
+        grille.regle = regle
+        grille.cellules = set(cellules)
+        grille.generation = 1234
+        chemin = os.path.join(dossier, "aller_retour" + extension)
+        enregistrer_fichier(grille, chemin)
+        grille.cellules = set()
+        grille.generation = 0
+        grille.regle = "B3/S23"
+        charger_fichier(grille, chemin)
+        relues = set(grille.cellules)
+        if relues != cellules:
+            ecarts.append(f"{extension} : {len(relues - cellules)} cellules en trop, {len(cellules - relues)} manquantes")
+        elif grille.generation != 1234 or grille.regle != regle:
+            ecarts.append(f"{extension} : relu génération {grille.generation}, règle {grille.regle.texte}")
+    return ecarts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare chaque moteur à la grille de référence et vérifie les formats de fichier.")
+    parser.add_argument("--moteurs", nargs="+", choices=sorted(MOTEURS), default=list(MOTEURS))
+    parser.add_argument("--regles", nargs="+", default=list(REGLES_CONNUES),
+                        help="règles à vérifier (noms de REGLES_CONNUES ou notation B/S)")
+    parser.add_argument("-n", "--generations", type=int, default=100, help="générations par cas")
+    parser.add_argument("--soupes", nargs="*", type=int, default=TAILLES_SOUPES,
+                        help="tailles des soupes en nombre de cellules vivantes")
+    parser.add_argument("--graine", type=int, default=0, help="graine des soupes aléatoires")
+    args = parser.parse_args(argv)
+
+    try:
+        regles = [compiler_regle(r) for r in args.regles]
+    except ValueError as e:
+        parser.error(str(e))
+    cas = cas_de_test(args.soupes, args.graine)
+
+    nb_ecarts = 0
+    with tempfile.TemporaryDirectory(prefix="verifier_") as dossier:
+        for moteur in args.moteurs:
+            # Une seule grille par moteur : remplacer l'état d'un cas à l'autre fait partie du test
+            grille = creer_grille(moteur)
+            debut = time.perf_counter()
+            ecarts = []
+            try:
+                for regle in regles:
+                    for nom, cellules in cas:
+                        try:
+                            ecart = comparer(grille, regle, cellules, args.generations)
+                            if ecart is not None:
+                                ecarts.append(f"{regle.texte} {nom} : {ecart}")
+                            ecarts.extend(f"{regle.texte} {nom} : {e}"
+                                          for e in aller_retour(grille, regle, cellules, dossier))
+                        except Exception as e: # Un plantage est un écart comme un autre
+                            ecarts.append(f"{regle.texte} {nom} : {type(e).__name__} : {e}")
+            finally:
+                if hasattr(grille, "fermer"):
+                    grille.fermer()
+            statut = "OK" if not ecarts else f"{len(ecarts)} écart(s)"
+            print(f"{moteur:10} {len(regles) * len(cas):4} cas  {time.perf_counter() - debut:8.1f} s  {statut}")
+            for ecart in ecarts:
+                print(f"    {ecart}")
+            nb_ecarts += len(ecarts)
+    return 1 if nb_ecarts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())